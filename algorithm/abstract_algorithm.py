@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from detail.detail import Detail
+from detail.placed_details import PlacedDetails
 
 
 class Algorithm(ABC):
@@ -9,7 +9,7 @@ class Algorithm(ABC):
     """
 
     @abstractmethod
-    def place_next(self, detail: tuple[float, float], placed_details: list[Detail]) -> None:
+    def place_next(self, detail: tuple[float, float], placed_details: PlacedDetails) -> None:
         """
         Place the next detail on the sheet.
         This method must be implemented by subclasses to define how a detail is placed
@@ -21,6 +21,42 @@ class Algorithm(ABC):
         """
         pass
 
+    def place_batch(self, details: list[tuple[float, float]], placed_details: PlacedDetails) -> None:
+        """
+        Place several consecutive details on the sheet.
+        By default, the details are placed one by one with `place_next`. Subclasses may override this method
+        with a faster implementation that produces the same result.
+
+        :param details: The details to be placed, in order. Each tuple represents the width and height of a detail.
+            The width here means the side on which the detail will be placed.
+        :param placed_details: List of details that have been placed so far.
+        """
+        for detail in details:
+            self.place_next(detail, placed_details)
+
+    def flush_statistics(self, placed_details: PlacedDetails) -> None:
+        """
+        Deliver the statistics the algorithm has buffered to its statistic listeners. Called when the placement
+        stops, so the listeners see all the placed details also if fewer than the maximum number have been placed.
+        Does nothing by default.
+
+        :param placed_details: List of details that have been placed so far.
+        """
+        pass
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Bring the algorithm to a state that can be saved in a checkpoint. Called right before the algorithm is pickled.
+        Does nothing by default.
+        """
+        pass
+
+    def complete_checkpoint(self) -> None:
+        """
+        Release resources that are no longer needed once a checkpoint has been saved. Does nothing by default.
+        """
+        pass
+
 
 class AlgorithmExecutionException(Exception):
     """
@@ -1,9 +1,18 @@
+from typing import Any, Callable
+
+import numpy as np
+
 from algorithm.abstract_algorithm import Algorithm, AlgorithmExecutionException
 from detail.detail import Detail
-from statistic.event.abstract_event import Event
+from detail.placed_details import PlacedDetails
+from detail.fixed_point import FixedPoint
 from statistic.event.gamma_algorithm_events import GammaAlgorithmBeforeLRPCutEvent, GammaAlgorithmAfterLRPCutEvent, \
-    GammaAlgorithmAfterDetailPlacedEvent, GammaAlgorithmEndEvent
+    GammaAlgorithmAfterDetailPlacedEvent, GammaAlgorithmEndEvent, GammaAlgorithmAfterDetailPlacedEventView, \
+    GammaAlgorithmBeforeLRPCutEventView, GammaAlgorithmAfterLRPCutEventView, GammaAlgorithmEndEventView, \
+    GammaAlgorithmStateView, GammaAlgorithmDetailsPlacedBatchEvent, GammaAlgorithmDetailsPlacedBatchEventView
 from statistic.listener.abstract_listener import StatisticListener
+from statistic.listener_cost_tracker import ListenerCostTracker
+from statistic.phase_profiler import PhaseProfiler
 from storage.abstract_box_storage import BoxStorage
 
 
@@ -19,10 +28,47 @@ class GammaAlgorithm(Algorithm):
         max_placed (int): The maximum number of details to place.
         box_storage (BoxStorage): BoxStorage object for storing available boxes for placing details.
         statistic_listeners (list[StatisticListener]): List of statistic listeners to track during the execution.
+        after_detail_placed_listeners (list[StatisticListener]): The statistic listeners of the event that occurs
+            after a detail is placed.
+        before_lrp_cut_listeners (list[StatisticListener]): The statistic listeners of the event that occurs
+            before a stripe is cut from the LRP.
+        after_lrp_cut_listeners (list[StatisticListener]): The statistic listeners of the event that occurs
+            after a stripe is cut from the LRP.
+        end_listeners (list[StatisticListener]): The statistic listeners of the event that occurs at the end
+            of the algorithm.
+        details_placed_batch_listeners (list[StatisticListener]): The statistic listeners of the event that occurs
+            after a batch of details is placed.
+        after_detail_placed_event (GammaAlgorithmAfterDetailPlacedEventView): The view delivered to the listeners
+            after a detail is placed.
+        before_lrp_cut_event (GammaAlgorithmBeforeLRPCutEventView): The view delivered to the listeners before
+            a stripe is cut from the LRP.
+        after_lrp_cut_event (GammaAlgorithmAfterLRPCutEventView): The view delivered to the listeners after
+            a stripe is cut from the LRP.
+        end_event (GammaAlgorithmEndEventView): The view delivered to the listeners at the end of the algorithm.
+        details_placed_batch_event (GammaAlgorithmDetailsPlacedBatchEventView): The view delivered to the listeners
+            after a batch of details is placed.
+        listener_batch_size (int): The number of placed details after which they are delivered to the listeners
+            of batches. A batch is delivered only between stripes in `place_batch`, so it may be larger.
+            It is smaller when it ends at a detail required by `batch_periods`.
+        batch_periods (list[int]): The periods of the indices after which batches must end, required by listeners
+            of batches (see `DetailsPlacedBatchListener.get_batch_period`). In `place_batch`, the details of
+            a stripe are split at these indices.
         update_placed_details (bool): A flag indicating whether the list of placed details should be updated.
             If set to True, the list of placed details will be updated, allowing visualization of the layout
             and calculations based on the state of all placed details. Setting it to False can expedite the
             calculating process by bypassing the need for continuous updates of placed details.
+        exact (bool): A flag indicating whether coordinates are computed exactly. If set to True, the sizes of details,
+            the required gaps and the base sheet are converted to FixedPoint numbers, so coordinates are exact sums
+            of them and do not drift over long runs. The box storage must keep Detail objects as they are
+            (see `BoxStorage.keeps_details`: InMemoryBoxStorage, HeapBoxStorage, or PruningBoxStorage with
+            a FixedPoint minimum size or InstrumentedBoxStorage over them).
+        phase_profiler (PhaseProfiler): The profiler measuring the time of the phases of the algorithm, or None.
+            The phases are the steps of placing a detail (named after the methods performing them), calls
+            of the box storage and the delivery of events to statistic listeners.
+        listener_cost_tracker (ListenerCostTracker): The tracker measuring the time spent in each statistic
+            listener, or None.
+        batch_rows (list[tuple]): The placed details not yet delivered to the listeners of batches. Each tuple
+            contains the width and height of a detail, of its normal box and of its endpoint.
         lrp (Detail): The Large Rectangular Piece (LRP).
         stripe (Detail): The current stripe, or None if there is no current stripe.
         stripe_first_detail_index (int): The index of the first detail in the current stripe.
@@ -31,6 +77,11 @@ class GammaAlgorithm(Algorithm):
         last_placed_index (int): The index of the last placed detail.
         endpoints_placed (int): The number of endpoints placed.
         stripe_from (str): Type of the detail from which the current stripe was formed.
+        free_area_sum (float): The running sum of the free area of the sheet, or None before the first detail.
+        free_area_compensation (float): The compensation of the rounding errors of the running sum of the free area.
+
+    Properties:
+        free_area (float): The area of the sheet not covered by placed details.
     """
 
     DETAIL_PREFIX = 'S'
@@ -43,9 +94,19 @@ class GammaAlgorithm(Algorithm):
     ENDPOINT_TYPE_2_NAME = 'endpoint_2'
     LRP_PREFIX = 'LRP'
     LRP_NAME = 'lrp'
+    PHASE_CHECK_STRIPE_SIZE = 'check_stripe_size'
+    PHASE_CHOOSE_STRIP = 'choose_strip'
+    PHASE_CUT_NEW_STRIP = 'cut_new_strip'
+    PHASE_PLACE_DETAIL_IN_STRIPE = 'place_detail_in_stripe'
+    PHASE_COUNT_DETAILS_FITTING_IN_STRIPE = 'count_details_fitting_in_stripe'
+    PHASE_PLACE_DETAILS_IN_STRIPE = 'place_details_in_stripe'
+    PHASE_STORAGE = 'storage'
+    PHASE_LISTENERS = 'listeners'
 
     def __init__(self, gamma: float, n0: int, max_placed: int, box_storage: BoxStorage,
-                 statistic_listeners: list[StatisticListener] = None, update_placed_details: bool = True):
+                 statistic_listeners: list[StatisticListener] = None, update_placed_details: bool = True,
+                 exact: bool = False, phase_profiler: PhaseProfiler = None,
+                 listener_cost_tracker: ListenerCostTracker = None, listener_batch_size: int = 1000):
         """
         Initialize the GammaAlgorithm with the specified parameters.
 
@@ -53,20 +114,51 @@ class GammaAlgorithm(Algorithm):
         :param n0: The index of the first detail to be placed.
         :param max_placed: The maximum number of details to place.
         :param box_storage: BoxStorage object for storing available boxes for placing details.
-        :param statistic_listeners: List of statistic listeners (optional).
+        :param statistic_listeners: List of statistic listeners (optional). The listeners are grouped by
+            the type of their events once, so listeners added to the list later are not notified.
         :param update_placed_details: A flag indicating whether the list of placed details should be updated.
             If set to True, the list of placed details will be updated, allowing visualization of the layout
             and calculations based on the state of all placed details. Setting it to False can expedite the
             calculating process by bypassing the need for continuous updates of placed details.
+        :param exact: A flag indicating whether coordinates are computed exactly with FixedPoint numbers
+            (default is False).
+        :param phase_profiler: The profiler measuring the time of the phases of the algorithm (optional). Without
+            a profiler, the phases are not measured and no time is spent on measuring.
+        :param listener_cost_tracker: The tracker measuring the time spent in each statistic listener (optional).
+        :param listener_batch_size: The number of placed details delivered at once to the listeners of batches
+            (default is 1000). The last batch is delivered when the last detail is placed, or when the placement
+            is interrupted and `flush_statistics` is called.
+        :raises ValueError: If exact is True and the box storage does not keep Detail objects as they are.
         """
+        if exact and not box_storage.keeps_details():
+            raise ValueError(f'The exact mode requires a box storage that keeps Detail objects as they are, '
+                             f'got {type(box_storage).__name__}')
         if statistic_listeners is None:
             statistic_listeners = []
         self.statistic_listeners = statistic_listeners
+        self.after_detail_placed_listeners = self._get_listeners(GammaAlgorithmAfterDetailPlacedEvent.EVENT_TYPE)
+        self.before_lrp_cut_listeners = self._get_listeners(GammaAlgorithmBeforeLRPCutEvent.EVENT_TYPE)
+        self.after_lrp_cut_listeners = self._get_listeners(GammaAlgorithmAfterLRPCutEvent.EVENT_TYPE)
+        self.end_listeners = self._get_listeners(GammaAlgorithmEndEvent.EVENT_TYPE)
+        self.details_placed_batch_listeners = self._get_listeners(GammaAlgorithmDetailsPlacedBatchEvent.EVENT_TYPE)
+        self.after_detail_placed_event = GammaAlgorithmAfterDetailPlacedEventView(self)
+        self.before_lrp_cut_event = GammaAlgorithmBeforeLRPCutEventView(self)
+        self.after_lrp_cut_event = GammaAlgorithmAfterLRPCutEventView(self)
+        self.end_event = GammaAlgorithmEndEventView(self)
+        self.details_placed_batch_event = GammaAlgorithmDetailsPlacedBatchEventView(self)
+        self.listener_batch_size = listener_batch_size
+        self.batch_periods = [period for period in (listener.get_batch_period()
+                                                    for listener in self.details_placed_batch_listeners)
+                              if period is not None]
         self.gamma = gamma
         self.n0 = n0
         self.max_placed = max_placed
         self.box_storage = box_storage
         self.update_placed_details = update_placed_details
+        self.exact = exact
+        self.phase_profiler = phase_profiler
+        self.listener_cost_tracker = listener_cost_tracker
+        self.batch_rows = []
         self.lrp = None
         self.stripe = None
         self.stripe_first_detail_index = n0 - 1
@@ -74,8 +166,28 @@ class GammaAlgorithm(Algorithm):
         self.last_placed_index = n0 - 1
         self.endpoints_placed = 1
         self.stripe_from = None
+        self.free_area_sum = None
+        self.free_area_compensation = 0.0
+
+    @property
+    def free_area(self) -> float:
+        """
+        Get the area of the sheet not covered by placed details, which is the total area of the LRP, the stripe,
+        normal boxes and endpoints.
+
+        The free area starts as the area of the sheet. Cutting stripes and turning boxes into stripes only split
+        free pieces, so the free area changes only when a detail is placed into a stripe: the stripe is replaced by
+        the detail, its normal box and the new endpoint, and the free area decreases by the area of the detail.
+        The sum is maintained with Kahan compensated summation, so rounding errors do not accumulate over long runs,
+        and it does not depend on the placed details being updated.
 
-    def place_next(self, detail: tuple[float, float], placed_details: list[Detail]) -> None:
+        :return: The free area, or None before the first detail.
+        """
+        if self.free_area_sum is None:
+            return None
+        return self.free_area_sum - self.free_area_compensation
+
+    def place_next(self, detail: tuple[float, float], placed_details: PlacedDetails) -> None:
         """
         Place the next detail on the sheet using the gamma algorithm.
 
@@ -83,21 +195,224 @@ class GammaAlgorithm(Algorithm):
             The width here means the side on which the detail will be placed.
         :param placed_details: List of details that have been placed so far.
         """
+        if self.exact:
+            detail = (FixedPoint.from_float(detail[0]), FixedPoint.from_float(detail[1]))
         self._check_if_lrp_none(placed_details)
-        self._check_stripe_size(detail)
-        self._choose_strip(detail, placed_details)
-        self._place_detail_in_stripe(detail, placed_details)
+        profiler = self.phase_profiler
+        if profiler is None:
+            self._check_stripe_size(detail)
+            self._choose_strip(detail, placed_details)
+            self._place_detail_in_stripe(detail, placed_details)
+        else:
+            profiler.measure(self.PHASE_CHECK_STRIPE_SIZE, self._check_stripe_size, detail)
+            profiler.measure(self.PHASE_CHOOSE_STRIP, self._choose_strip, detail, placed_details)
+            profiler.measure(self.PHASE_PLACE_DETAIL_IN_STRIPE, self._place_detail_in_stripe, detail, placed_details)
+            profiler.count_details(1)
+
+    def place_batch(self, details: list[tuple[float, float]], placed_details: PlacedDetails) -> None:
+        """
+        Place several consecutive details on the sheet using the gamma algorithm, a stripe at a time.
+
+        For every stripe, the number of consecutive details that fit into it is found by accumulating their widths,
+        and all of them are placed in one step: their normal boxes are added to the box storage at once, and only
+        the final endpoint of the stripe is created, unless listeners of placed details need the intermediate ones.
+        The result is the same as placing the details one by one with `place_next`.
+
+        :param details: The details to be placed, in order. Each tuple represents the width and height of a detail.
+            The width here means the side on which the detail will be placed.
+        :param placed_details: List of details that have been placed so far.
+        """
+        if self.exact:
+            details = [(FixedPoint.from_float(detail[0]), FixedPoint.from_float(detail[1])) for detail in details]
+        profiler = self.phase_profiler
+        index = 0
+        while index < len(details):
+            detail = details[index]
+            self._check_if_lrp_none(placed_details)
+            if profiler is None:
+                self._check_stripe_size(detail)
+                self._choose_strip(detail, placed_details)
+                count = self._count_details_fitting_in_stripe(details, index)
+                self._place_details_in_stripe(details[index:index + count], placed_details)
+            else:
+                profiler.measure(self.PHASE_CHECK_STRIPE_SIZE, self._check_stripe_size, detail)
+                profiler.measure(self.PHASE_CHOOSE_STRIP, self._choose_strip, detail, placed_details)
+                count = profiler.measure(self.PHASE_COUNT_DETAILS_FITTING_IN_STRIPE,
+                                         self._count_details_fitting_in_stripe, details, index)
+                profiler.measure(self.PHASE_PLACE_DETAILS_IN_STRIPE, self._place_details_in_stripe,
+                                 details[index:index + count], placed_details)
+                profiler.count_details(count)
+            index += count
+
+    def _count_details_fitting_in_stripe(self, details: list[tuple[float, float]], start: int) -> int:
+        """
+        Count the consecutive details that fit into the current stripe, starting with the detail that is placed
+        into it next. The lengths are accumulated in the same order as in `_check_stripe_size`, so the result is
+        exactly the same as when the details are placed one by one. The count never goes past the last detail
+        of the algorithm or past a detail after which a batch must end for the listeners of batches.
+
+        :param details: The details to be placed.
+        :param start: The index of the detail that is placed into the stripe next. It always fits.
+        :return: The number of details that fit into the stripe.
+        """
+        required_gap = self._get_required_gap(self.stripe_first_detail_index)
+        if self.is_stripe_horizontal:
+            position, end = self.stripe.bottom_left[0], self.stripe.top_right[0]
+        else:
+            position, end = self.stripe.bottom_left[1], self.stripe.top_right[1]
+        max_count = min(len(details) - start, self.n0 + self.max_placed - 1 - self.last_placed_index)
+        if self.batch_periods:
+            max_count = min(max_count, self._count_details_to_batch_boundary())
+        position += details[start][0]
+        count = 1
+        while count < max_count:
+            detail_width = details[start + count][0]
+            if detail_width + required_gap > end - position:
+                break
+            position += detail_width
+            count += 1
+        return count
+
+    def _place_details_in_stripe(self, details: list[tuple[float, float]], placed_details: PlacedDetails) -> None:
+        """
+        Place consecutive details into the current stripe.
+        Called only when all the details fit into the stripe. If placed details are updated and there are listeners
+        of placed details, the details are placed one by one, so that the listeners see the same list of placed
+        details as with `place_next`.
+
+        :param details: The details to be placed. Each tuple represents the width and height of a detail.
+            The width here means the side on which the detail will be placed.
+        :param placed_details: List of details that have been placed so far.
+        """
+        notify = len(self.after_detail_placed_listeners) > 0
+        if notify and self.update_placed_details:
+            for detail in details:
+                self._place_detail_in_stripe(detail, placed_details)
+            return
+        normal_box_type = self._get_normal_box_type()
+        endpoint_type = self._get_endpoint_type()
+        endpoint_name = f'{self.ENDPOINT_PREFIX}{self.endpoints_placed}'
+        stripe = self.stripe
+        stripe_bottom_left = stripe.bottom_left
+        stripe_top_right = stripe.top_right
+        new_details = []
+        normal_boxes = []
+        free_area_sum = self.free_area_sum
+        free_area_compensation = self.free_area_compensation
+        batch_rows = self.batch_rows if self.details_placed_batch_listeners else None
+        for detail in details:
+            self.last_placed_index += 1
+            decrement = -(detail[0] * detail[1]) - free_area_compensation
+            new_free_area_sum = free_area_sum + decrement
+            free_area_compensation = (new_free_area_sum - free_area_sum) - decrement
+            free_area_sum = new_free_area_sum
+            if self.is_stripe_horizontal:
+                placed_detail_bottom_left = stripe_bottom_left
+                placed_detail_top_right = (stripe_bottom_left[0] + detail[0], stripe_bottom_left[1] + detail[1])
+                normal_box_bottom_left = (stripe_bottom_left[0], stripe_bottom_left[1] + detail[1])
+                normal_box_top_right = (stripe_bottom_left[0] + detail[0], stripe_top_right[1])
+                stripe_bottom_left = (stripe_bottom_left[0] + detail[0], stripe_bottom_left[1])
+            else:
+                placed_detail_bottom_left = (stripe_top_right[0] - detail[1], stripe_bottom_left[1])
+                placed_detail_top_right = (stripe_top_right[0], stripe_bottom_left[1] + detail[0])
+                normal_box_bottom_left = stripe_bottom_left
+                normal_box_top_right = (stripe_top_right[0] - detail[1], stripe_bottom_left[1] + detail[0])
+                stripe_bottom_left = (stripe_bottom_left[0], stripe_bottom_left[1] + detail[0])
+            placed_detail = Detail(placed_detail_bottom_left, placed_detail_top_right,
+                                   f'{self.DETAIL_PREFIX}{self.last_placed_index}', self.DETAIL_NAME)
+            normal_box = Detail(normal_box_bottom_left, normal_box_top_right,
+                                f'{self.NORMAL_BOX_PREFIX}{self.last_placed_index}', normal_box_type)
+            new_details.append(placed_detail)
+            new_details.append(normal_box)
+            normal_boxes.append(normal_box)
+            if batch_rows is not None:
+                batch_rows.append((detail[0], detail[1], normal_box.width, normal_box.height,
+                                   stripe_top_right[0] - stripe_bottom_left[0],
+                                   stripe_top_right[1] - stripe_bottom_left[1]))
+            if notify:
+                self.free_area_sum = free_area_sum
+                self.free_area_compensation = free_area_compensation
+                self.stripe = Detail(stripe_bottom_left, stripe_top_right, endpoint_name, endpoint_type)
+                self._notify_after_detail_placed(detail, placed_details, placed_detail, normal_box, self.stripe)
+        self.free_area_sum = free_area_sum
+        self.free_area_compensation = free_area_compensation
+        if not notify:
+            self.stripe = Detail(stripe_bottom_left, stripe_top_right, endpoint_name, endpoint_type)
+        if self.update_placed_details:
+            placed_details.remove(stripe)
+            placed_details.extend(new_details)
+            placed_details.append(self.stripe)
+        self._measure(self.PHASE_STORAGE, self.box_storage.add_boxes, normal_boxes)
+        if batch_rows is not None:
+            self._check_details_placed_batch(placed_details)
+        if self.last_placed_index == self.n0 + self.max_placed - 1 and self.end_listeners:
+            self._measure(self.PHASE_LISTENERS, self._notify, self.end_listeners, self.end_event, details[-1],
+                          placed_details)
+
+    def flush_statistics(self, placed_details: PlacedDetails) -> None:
+        """
+        Deliver the placed details not yet delivered to the listeners of batches.
+
+        :param placed_details: List of details that have been placed so far.
+        """
+        if self.batch_rows:
+            self._notify_details_placed_batch(placed_details)
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Bring the box storage to a state that can be saved in a checkpoint.
+        """
+        self.box_storage.prepare_checkpoint()
+
+    def complete_checkpoint(self) -> None:
+        """
+        Let the box storage release resources that are no longer needed once a checkpoint has been saved.
+        """
+        self.box_storage.complete_checkpoint()
 
-    def _check_if_lrp_none(self, placed_details: list[Detail]) -> None:
+    def _check_if_lrp_none(self, placed_details: PlacedDetails) -> None:
         """
         Check if LRP is None and initialize it if necessary.
-        If LRP is None, it initializes LRP as the first element of the placed_details list, which initially contains
+        If LRP is None, it initializes LRP as the first of the placed details, which initially contain
         only an empty sheet. During other stages of the algorithm, situations where LRP is None should not occur.
+        In the exact mode, the sheet is replaced in the placed details with a copy with FixedPoint coordinates.
 
         :param placed_details: List of details that have been placed so far.
         """
         if self.lrp is None:
-            self.lrp = placed_details[0]
+            self.lrp = next(iter(placed_details))
+            if self.exact:
+                base_detail = self.lrp
+                self.lrp = Detail(tuple(FixedPoint.from_float(value) for value in base_detail.bottom_left),
+                                  tuple(FixedPoint.from_float(value) for value in base_detail.top_right),
+                                  base_detail.name, base_detail.detail_type)
+                placed_details.remove(base_detail)
+                placed_details.append(self.lrp)
+            self.free_area_sum = float(self.lrp.area)
+            self.free_area_compensation = 0.0
+
+    def _subtract_free_area(self, area: float) -> None:
+        """
+        Subtract an area from the free area using Kahan compensated summation.
+
+        :param area: The area to be subtracted.
+        """
+        decrement = -area - self.free_area_compensation
+        free_area_sum = self.free_area_sum + decrement
+        self.free_area_compensation = (free_area_sum - self.free_area_sum) - decrement
+        self.free_area_sum = free_area_sum
+
+    def _get_required_gap(self, stripe_first_detail_index: int) -> float:
+        """
+        Calculate the gap required in a stripe whose first detail has the given index.
+
+        :param stripe_first_detail_index: The index of the first detail in the stripe.
+        :return: The required gap, as a FixedPoint number in the exact mode.
+        """
+        required_gap = pow(1 / stripe_first_detail_index, self.gamma)
+        if self.exact:
+            return FixedPoint.from_float(required_gap)
+        return required_gap
 
     def _check_stripe_size(self, detail: tuple[float, float]) -> None:
         """
@@ -109,15 +424,15 @@ class GammaAlgorithm(Algorithm):
             The width here means the side on which the detail will be placed.
         """
         if self.stripe is not None:
-            required_gap = pow(1 / self.stripe_first_detail_index, self.gamma)
+            required_gap = self._get_required_gap(self.stripe_first_detail_index)
             total_length = detail[0] + required_gap
             if (self.is_stripe_horizontal and total_length > self.stripe.width) or \
                     (not self.is_stripe_horizontal and total_length > self.stripe.height):
-                self.box_storage.add_box(self.stripe)
+                self._measure(self.PHASE_STORAGE, self.box_storage.add_box, self.stripe)
                 self.stripe = None
                 self.endpoints_placed += 1
 
-    def _choose_strip(self, detail: tuple[float, float], placed_details: list[Detail]) -> None:
+    def _choose_strip(self, detail: tuple[float, float], placed_details: PlacedDetails) -> None:
         """
         Choose a new stripe for placing details if the current stripe is None.
         If suitable boxes exist, the widest one is chosen; otherwise, a stripe is cut from LRP. If it's impossible
@@ -129,34 +444,30 @@ class GammaAlgorithm(Algorithm):
         """
         if self.stripe is None:
             self.stripe_first_detail_index = self.last_placed_index + 1
-            max_box = self.box_storage.get_max_box()
-            max_box_size = min(max_box.width, max_box.height) if max_box else -1
-            required_gap = pow(1 / self.stripe_first_detail_index, self.gamma)
+            max_box = self._measure(self.PHASE_STORAGE, self.box_storage.get_max_box)
+            max_box_size = max_box.min_size if max_box else -1
+            required_gap = self._get_required_gap(self.stripe_first_detail_index)
             total_length = detail[1] + required_gap
             if total_length <= max_box_size:
                 self._choose_strip_from_box()
             else:
-                event = GammaAlgorithmBeforeLRPCutEvent(self.gamma, self.n0, self.max_placed, self.lrp, self.stripe,
-                                                        self.stripe_first_detail_index, self.is_stripe_horizontal,
-                                                        self.last_placed_index, self.endpoints_placed,
-                                                        self.stripe_from, detail, placed_details)
-                self._notify_statistic_listeners(event)
-                self._cut_new_strip(detail, placed_details)
-                event = GammaAlgorithmAfterLRPCutEvent(self.gamma, self.n0, self.max_placed, self.lrp, self.stripe,
-                                                       self.stripe_first_detail_index, self.is_stripe_horizontal,
-                                                       self.last_placed_index, self.endpoints_placed,
-                                                       self.stripe_from, detail, placed_details)
-                self._notify_statistic_listeners(event)
+                if self.before_lrp_cut_listeners:
+                    self._measure(self.PHASE_LISTENERS, self._notify, self.before_lrp_cut_listeners,
+                                  self.before_lrp_cut_event, detail, placed_details)
+                self._measure(self.PHASE_CUT_NEW_STRIP, self._cut_new_strip, detail, placed_details)
+                if self.after_lrp_cut_listeners:
+                    self._measure(self.PHASE_LISTENERS, self._notify, self.after_lrp_cut_listeners,
+                                  self.after_lrp_cut_event, detail, placed_details)
 
     def _choose_strip_from_box(self) -> None:
         """
         Choose the widest available box as the new stripe for placing details. Called only when a suitable box exists.
         """
-        self.stripe = self.box_storage.pop_max_box()
+        self.stripe = self._measure(self.PHASE_STORAGE, self.box_storage.pop_max_box)
         self.stripe_from = self.stripe.detail_type
         self.is_stripe_horizontal = self.stripe.width >= self.stripe.height
 
-    def _cut_new_strip(self, detail: tuple[float, float], placed_details: list[Detail]) -> None:
+    def _cut_new_strip(self, detail: tuple[float, float], placed_details: PlacedDetails) -> None:
         """
         Cut a new stripe from LRP if no suitable box exists.
         Called only when there is no suitable box for placing a new detail. Raises an exception if it's impossible
@@ -167,9 +478,9 @@ class GammaAlgorithm(Algorithm):
         :param placed_details: List of details that have been placed so far.
         """
         self.stripe_from = self.lrp.detail_type
-        required_gap = pow(1 / (self.last_placed_index + 1), self.gamma)
+        required_gap = self._get_required_gap(self.last_placed_index + 1)
         if detail[1] + required_gap > max(self.lrp.width, self.lrp.height) or \
-                detail[0] + required_gap > min(self.lrp.width, self.lrp.height):
+                detail[0] + required_gap > self.lrp.min_size:
             raise AlgorithmExecutionException("Unable to cut a new strip, LRP is too small")
         if self.lrp.width <= self.lrp.height:
             self.is_stripe_horizontal = True
@@ -193,7 +504,7 @@ class GammaAlgorithm(Algorithm):
         self.stripe = stripe
         self.lrp = new_lrp
 
-    def _place_detail_in_stripe(self, detail: tuple[float, float], placed_details: list[Detail]) -> None:
+    def _place_detail_in_stripe(self, detail: tuple[float, float], placed_details: PlacedDetails) -> None:
         """
         Place a detail into the stripe.
         Called only when the necessary stripe has already been chosen and there is enough space in it to place
@@ -207,6 +518,7 @@ class GammaAlgorithm(Algorithm):
         endpoint_type = self._get_endpoint_type()
 
         self.last_placed_index += 1
+        self._subtract_free_area(detail[0] * detail[1])
         if self.is_stripe_horizontal:
             placed_detail_bottom_left = self.stripe.bottom_left
             placed_detail_top_right = (self.stripe.bottom_left[0] + detail[0], self.stripe.bottom_left[1] + detail[1])
@@ -233,19 +545,19 @@ class GammaAlgorithm(Algorithm):
             placed_details.append(normal_box)
             placed_details.append(endpoint)
         self.stripe = endpoint
-        self.box_storage.add_box(normal_box)
-        event = GammaAlgorithmAfterDetailPlacedEvent(self.gamma, self.n0, self.max_placed, self.lrp, self.stripe,
-                                                     self.stripe_first_detail_index, self.is_stripe_horizontal,
-                                                     self.last_placed_index, self.endpoints_placed,
-                                                     self.stripe_from, detail, placed_details, placed_detail,
-                                                     normal_box, endpoint)
-        self._notify_statistic_listeners(event)
-        if self.last_placed_index == self.n0 + self.max_placed - 1:
-            event = GammaAlgorithmEndEvent(self.gamma, self.n0, self.max_placed, self.lrp, self.stripe,
-                                           self.stripe_first_detail_index, self.is_stripe_horizontal,
-                                           self.last_placed_index, self.endpoints_placed,
-                                           self.stripe_from, detail, placed_details)
-            self._notify_statistic_listeners(event)
+        if self.phase_profiler is None:
+            self.box_storage.add_box(normal_box)
+        else:
+            self.phase_profiler.measure(self.PHASE_STORAGE, self.box_storage.add_box, normal_box)
+        if self.after_detail_placed_listeners:
+            self._notify_after_detail_placed(detail, placed_details, placed_detail, normal_box, endpoint)
+        if self.details_placed_batch_listeners:
+            self.batch_rows.append((detail[0], detail[1], normal_box.width, normal_box.height, endpoint.width,
+                                    endpoint.height))
+            self._check_details_placed_batch(placed_details)
+        if self.last_placed_index == self.n0 + self.max_placed - 1 and self.end_listeners:
+            self._measure(self.PHASE_LISTENERS, self._notify, self.end_listeners, self.end_event, detail,
+                          placed_details)
 
     def _get_normal_box_type(self) -> str:
         """
@@ -272,12 +584,117 @@ class GammaAlgorithm(Algorithm):
         else:
             return self.ENDPOINT_TYPE_2_NAME
 
-    def _notify_statistic_listeners(self, event: Event):
+    def _get_listeners(self, event_type: str) -> list[StatisticListener]:
+        """
+        Get the statistic listeners of the given event type, in the order they were given.
+
+        :param event_type: The type of the event.
+        :return: List of the statistic listeners of the event type.
+        """
+        return [statistic for statistic in self.statistic_listeners if statistic.get_event_type() == event_type]
+
+    def _notify(self, listeners: list[StatisticListener], event: GammaAlgorithmStateView, detail: tuple[float, float],
+                placed_details: PlacedDetails) -> None:
         """
-        Notify statistic listeners after event occurred.
+        Deliver the view of an event to its statistic listeners, measuring each call if there is a listener cost
+        tracker. Called only when there are listeners of the event, so no work is done for events nobody listens to.
 
-        :param event: The event to be processed.
+        :param listeners: The statistic listeners of the event.
+        :param event: The view of the event over the state of the algorithm.
+        :param detail: The current detail.
+        :param placed_details: List of details that have been placed so far.
         """
-        for statistic in self.statistic_listeners:
-            if statistic.get_event_type() == event.get_event_type():
+        event.detail = detail
+        event.placed_details = placed_details
+        if self.listener_cost_tracker is None:
+            for statistic in listeners:
                 statistic.handle(event)
+        else:
+            for statistic in listeners:
+                self.listener_cost_tracker.measure(statistic, event)
+
+    def _notify_after_detail_placed(self, detail: tuple[float, float], placed_details: PlacedDetails,
+                                    placed_detail: Detail, normal_box: Detail, endpoint: Detail) -> None:
+        """
+        Deliver the view of the event that occurs after a detail is placed to its statistic listeners.
+        Called only when there are listeners of the event.
+
+        :param detail: The placed detail. A tuple represents the width and height of the detail.
+        :param placed_details: List of details that have been placed so far.
+        :param placed_detail: The new placed detail.
+        :param normal_box: The normal box created after placing the detail.
+        :param endpoint: The endpoint created after placing the detail.
+        """
+        event = self.after_detail_placed_event
+        event.placed_detail = placed_detail
+        event.normal_box = normal_box
+        event.endpoint = endpoint
+        self._measure(self.PHASE_LISTENERS, self._notify, self.after_detail_placed_listeners, event, detail,
+                      placed_details)
+
+    def _check_details_placed_batch(self, placed_details: PlacedDetails) -> None:
+        """
+        Deliver the current batch of placed details to the listeners of batches if it is full, the last detail
+        has been placed or a batch must end after the last placed detail (see `_is_batch_boundary`). Called only
+        when there are listeners of batches.
+
+        :param placed_details: List of details that have been placed so far.
+        """
+        if len(self.batch_rows) >= self.listener_batch_size or \
+                self.last_placed_index == self.n0 + self.max_placed - 1 or \
+                self._is_batch_boundary():
+            self._notify_details_placed_batch(placed_details)
+
+    def _is_batch_boundary(self) -> bool:
+        """
+        Check whether a batch must end after the last placed detail for the listeners of batches that require
+        a period: the last placed detail is the first detail of the algorithm or its index is a multiple
+        of a period.
+
+        :return: True if a batch must end after the last placed detail, False otherwise.
+        """
+        return bool(self.batch_periods) and (self.last_placed_index == self.n0 or
+                                             any(self.last_placed_index % period == 0
+                                                 for period in self.batch_periods))
+
+    def _count_details_to_batch_boundary(self) -> int:
+        """
+        Count the details to be placed up to and including the next detail after which a batch must end
+        for the listeners of batches that require a period. Called only when there are such listeners.
+
+        :return: The number of details to the next batch boundary.
+        """
+        if self.last_placed_index < self.n0:
+            return 1
+        return min(period - self.last_placed_index % period for period in self.batch_periods)
+
+    def _notify_details_placed_batch(self, placed_details: PlacedDetails) -> None:
+        """
+        Deliver the view of the event that occurs after a batch of details is placed to its statistic listeners
+        and start a new batch. The sizes of the batch are converted to float arrays, also in the exact mode.
+
+        :param placed_details: List of details that have been placed so far.
+        """
+        rows = self.batch_rows
+        columns = np.array(rows if not self.exact else [tuple(map(float, row)) for row in rows], dtype=np.float64).T
+        event = self.details_placed_batch_event
+        event.indices = np.arange(self.last_placed_index - len(rows) + 1, self.last_placed_index + 1)
+        (event.detail_widths, event.detail_heights, event.normal_box_widths, event.normal_box_heights,
+         event.endpoint_widths, event.endpoint_heights) = columns
+        detail = rows[-1][:2]
+        self.batch_rows = []
+        self._measure(self.PHASE_LISTENERS, self._notify, self.details_placed_batch_listeners, event, detail,
+                      placed_details)
+
+    def _measure(self, phase: str, function: Callable, *args) -> Any:
+        """
+        Call a function, measuring its time as a phase if there is a phase profiler.
+
+        :param phase: The name of the phase.
+        :param function: The function to be called.
+        :param args: The arguments of the function.
+        :return: The result of the function.
+        """
+        if self.phase_profiler is None:
+            return function(*args)
+        return self.phase_profiler.measure(phase, function, *args)
@@ -0,0 +1,201 @@
+import heapq
+import math
+
+from algorithm.abstract_algorithm import Algorithm, AlgorithmExecutionException
+from detail.placed_details import PlacedDetails
+
+
+class HeadlessGammaAlgorithm(Algorithm):
+    """
+    HeadlessGammaAlgorithm is a high-throughput version of GammaAlgorithm for experiments that only need
+    the statistics of a run, not the layout.
+
+    It places details exactly as GammaAlgorithm does, with the same floating-point operations in the same order,
+    but it keeps the LRP, the stripe and the boxes as plain tuples of coordinates instead of Detail objects,
+    keeps the boxes in an inlined binary heap of `(-min_size, seq, x1, y1, x2, y2)` entries instead of a box storage,
+    and does not name details, update placed details or create events. Instead of statistic listeners, it computes
+    the statistics of NormalBoxFinalMaxRatioTracker and LrpOccupancyRatioTracker directly, with the same results.
+
+    Boxes with equal minimum sides are taken in the order they were added, as in the box storages, so the sequence
+    of placements, the statistics, the final LRP and stripe, and the boxes left are the same as with GammaAlgorithm.
+    Exact coordinates are not supported.
+
+    Attributes:
+        gamma (float): The gamma parameter.
+        n0 (int): The index of the first detail to be placed.
+        max_placed (int): The maximum number of details to place.
+        lrp (tuple[float, float, float, float]): The coordinates (x1, y1, x2, y2) of the LRP, or None before
+            the first detail.
+        stripe (tuple[float, float, float, float]): The coordinates of the current stripe, or None if there is
+            no current stripe.
+        is_stripe_horizontal (bool): Whether the stripe is horizontal (the size along the x-axis is greater than
+            along the y-axis).
+        required_gap (float): The gap required in the current stripe.
+        boxes (list[tuple[float, int, float, float, float, float]]): A binary heap of the normal boxes and endpoints
+            available for placing details.
+        next_sequence_number (int): The sequence number of the next box added to the heap.
+        last_placed_index (int): The index of the last placed detail.
+        endpoints_placed (int): The number of endpoints placed.
+        free_area_sum (float): The running sum of the free area of the sheet, or None before the first detail.
+        free_area_compensation (float): The compensation of the rounding errors of the running sum of the free area.
+        max_ratio (float): The maximum ratio of min_size / max_size^gamma over the normal boxes.
+        min_lrp_ratio (float): The smallest proportion of the free area occupied by the LRP before a stripe is cut
+            from it, or None if no stripe has been cut yet.
+        last_lrp_ratio (float): The last proportion of the free area occupied by the LRP before a stripe is cut
+            from it, or None if no stripe has been cut yet.
+
+    Properties:
+        free_area (float): The area of the sheet not covered by placed details.
+    """
+
+    def __init__(self, gamma: float, n0: int, max_placed: int):
+        """
+        Initialize the HeadlessGammaAlgorithm with the specified parameters.
+
+        :param gamma: The gamma parameter.
+        :param n0: The index of the first detail to be placed.
+        :param max_placed: The maximum number of details to place.
+        """
+        self.gamma = gamma
+        self.n0 = n0
+        self.max_placed = max_placed
+        self.lrp = None
+        self.stripe = None
+        self.is_stripe_horizontal = False
+        self.required_gap = None
+        self.boxes = []
+        self.next_sequence_number = 0
+        self.last_placed_index = n0 - 1
+        self.endpoints_placed = 1
+        self.free_area_sum = None
+        self.free_area_compensation = 0.0
+        self.max_ratio = -math.inf
+        self.min_lrp_ratio = None
+        self.last_lrp_ratio = None
+
+    @property
+    def free_area(self) -> float:
+        """
+        Get the area of the sheet not covered by placed details, maintained as in GammaAlgorithm.
+
+        :return: The free area, or None before the first detail.
+        """
+        if self.free_area_sum is None:
+            return None
+        return self.free_area_sum - self.free_area_compensation
+
+    def place_next(self, detail: tuple[float, float], placed_details: PlacedDetails) -> None:
+        """
+        Place the next detail on the sheet using the gamma algorithm.
+
+        :param detail: The current detail to be placed. A tuple represents the width and height of the detail.
+            The width here means the side on which the detail will be placed.
+        :param placed_details: List of details that have been placed so far. Only the sheet is read from it before
+            the first detail; it is never updated.
+        """
+        self.place_batch([detail], placed_details)
+
+    def place_batch(self, details: list[tuple[float, float]], placed_details: PlacedDetails) -> None:
+        """
+        Place several consecutive details on the sheet using the gamma algorithm.
+
+        The state of the algorithm is loaded into local variables, all the details are placed in one loop, and
+        the state is stored back, also when the LRP is too small to cut a stripe.
+
+        :param details: The details to be placed, in order. Each tuple represents the width and height of a detail.
+            The width here means the side on which the detail will be placed.
+        :param placed_details: List of details that have been placed so far. Only the sheet is read from it before
+            the first detail; it is never updated.
+        :raises AlgorithmExecutionException: If it's impossible to cut a stripe from the LRP.
+        """
+        if self.lrp is None:
+            base_detail = next(iter(placed_details))
+            self.lrp = (*base_detail.bottom_left, *base_detail.top_right)
+            self.free_area_sum = base_detail.area
+            self.free_area_compensation = 0.0
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        gamma = self.gamma
+        boxes = self.boxes
+        sequence_number = self.next_sequence_number
+        last_placed_index = self.last_placed_index
+        endpoints_placed = self.endpoints_placed
+        lrp_x1, lrp_y1, lrp_x2, lrp_y2 = self.lrp
+        has_stripe = self.stripe is not None
+        x1, y1, x2, y2 = self.stripe if has_stripe else (0.0, 0.0, 0.0, 0.0)
+        is_stripe_horizontal = self.is_stripe_horizontal
+        required_gap = self.required_gap
+        free_area_sum = self.free_area_sum
+        free_area_compensation = self.free_area_compensation
+        max_ratio = self.max_ratio
+        min_lrp_ratio = self.min_lrp_ratio
+        last_lrp_ratio = self.last_lrp_ratio
+        try:
+            for width, height in details:
+                if has_stripe and width + required_gap > (x2 - x1 if is_stripe_horizontal else y2 - y1):
+                    stripe_width = x2 - x1
+                    stripe_height = y2 - y1
+                    heappush(boxes, (-(stripe_width if stripe_width <= stripe_height else stripe_height),
+                                     sequence_number, x1, y1, x2, y2))
+                    sequence_number += 1
+                    has_stripe = False
+                    endpoints_placed += 1
+                if not has_stripe:
+                    required_gap = pow(1 / (last_placed_index + 1), gamma)
+                    if boxes and height + required_gap <= -boxes[0][0]:
+                        x1, y1, x2, y2 = heappop(boxes)[2:]
+                        is_stripe_horizontal = x2 - x1 >= y2 - y1
+                    else:
+                        lrp_width = lrp_x2 - lrp_x1
+                        lrp_height = lrp_y2 - lrp_y1
+                        lrp_ratio = lrp_width * lrp_height / (free_area_sum - free_area_compensation)
+                        if min_lrp_ratio is None or lrp_ratio < min_lrp_ratio:
+                            min_lrp_ratio = lrp_ratio
+                        last_lrp_ratio = lrp_ratio
+                        if height + required_gap > max(lrp_width, lrp_height) or \
+                                width + required_gap > (lrp_width if lrp_width <= lrp_height else lrp_height):
+                            raise AlgorithmExecutionException("Unable to cut a new strip, LRP is too small")
+                        if lrp_width <= lrp_height:
+                            is_stripe_horizontal = True
+                            x1, y1, x2, y2 = lrp_x1, lrp_y1, lrp_x2, lrp_y1 + height + required_gap
+                            lrp_y1 = y2
+                        else:
+                            is_stripe_horizontal = False
+                            x1, y1, x2, y2 = lrp_x2 - height - required_gap, lrp_y1, lrp_x2, lrp_y2
+                            lrp_x2 = x1
+                    has_stripe = True
+                last_placed_index += 1
+                decrement = -(width * height) - free_area_compensation
+                new_free_area_sum = free_area_sum + decrement
+                free_area_compensation = (new_free_area_sum - free_area_sum) - decrement
+                free_area_sum = new_free_area_sum
+                if is_stripe_horizontal:
+                    box_x1, box_y1, box_x2, box_y2 = x1, y1 + height, x1 + width, y2
+                    x1 = x1 + width
+                else:
+                    box_x1, box_y1, box_x2, box_y2 = x1, y1, x2 - height, y1 + width
+                    y1 = y1 + width
+                box_width = box_x2 - box_x1
+                box_height = box_y2 - box_y1
+                if box_width <= box_height:
+                    ratio = box_width / pow(box_height, gamma)
+                    heappush(boxes, (-box_width, sequence_number, box_x1, box_y1, box_x2, box_y2))
+                else:
+                    ratio = box_height / pow(box_width, gamma)
+                    heappush(boxes, (-box_height, sequence_number, box_x1, box_y1, box_x2, box_y2))
+                sequence_number += 1
+                if ratio > max_ratio:
+                    max_ratio = ratio
+        finally:
+            self.next_sequence_number = sequence_number
+            self.last_placed_index = last_placed_index
+            self.endpoints_placed = endpoints_placed
+            self.lrp = (lrp_x1, lrp_y1, lrp_x2, lrp_y2)
+            self.stripe = (x1, y1, x2, y2) if has_stripe else None
+            self.is_stripe_horizontal = is_stripe_horizontal
+            self.required_gap = required_gap
+            self.free_area_sum = free_area_sum
+            self.free_area_compensation = free_area_compensation
+            self.max_ratio = max_ratio
+            self.min_lrp_ratio = min_lrp_ratio
+            self.last_lrp_ratio = last_lrp_ratio
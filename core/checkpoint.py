@@ -0,0 +1,83 @@
+import os
+import pickle
+
+
+class CheckpointManager:
+    """
+    A class that saves and loads checkpoints of a long-running placement to a file.
+
+    A checkpoint is written with pickle to a temporary file next to the checkpoint file, which then atomically
+    replaces the checkpoint file, so a crash while saving never damages the previous checkpoint.
+
+    The placed details are not pickled with the checkpoint: DetailPlacer keeps them in CheckpointedPlacedDetails,
+    which appends the changes since the previous checkpoint to a delta file at `details_path`, and a detail log
+    saves only its file offset. The boxes of in-memory storages are still pickled in full each time, so for long runs
+    use a storage that keeps most boxes outside of the process (ExternalMemoryBoxStorage or a hybrid storage),
+    whose checkpoints save only the in-memory part.
+
+    Attributes:
+        path (str): The path to the checkpoint file.
+        details_path (str): The path to the delta file of the placed details saved with the checkpoints.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the CheckpointManager.
+
+        :param path: The path to the checkpoint file.
+        """
+        self.path = path
+        self.details_path = f'{path}.details'
+
+    def exists(self) -> bool:
+        """
+        Check if a checkpoint has been saved.
+
+        :return: True if the checkpoint file exists, False otherwise.
+        """
+        return os.path.isfile(self.path)
+
+    def save(self, state: object) -> None:
+        """
+        Save a checkpoint, replacing the previous one.
+
+        :param state: The object to be saved. It must be picklable.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+    def load(self) -> object:
+        """
+        Load the latest checkpoint.
+
+        :return: The saved object, or None if no checkpoint has been saved.
+        """
+        if not self.exists():
+            return None
+        with open(self.path, 'rb') as file:
+            return pickle.load(file)
+
+
+class CheckpointException(Exception):
+    """
+    Exception raised when a checkpoint cannot be saved or resumed consistently.
+
+    Attributes:
+        message (str): Explanation of the error.
+    """
+
+    def __init__(self, message='Checkpoint is inconsistent'):
+        """
+        Initialize the exception with an error message.
+
+        :param message: Explanation of the error.
+        """
+        self.message = message
+        super().__init__(self.message)
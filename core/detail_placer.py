@@ -1,6 +1,16 @@
+import time
+
 from algorithm.abstract_algorithm import Algorithm
+from core.checkpoint import CheckpointManager
+from core.resource_budget import ResourceBudget, get_peak_rss
 from detail.detail_generator import DetailGenerator
 from detail.detail import Detail
+from detail.detail_log import DetailLogWriter
+from detail.placed_details import PlacedDetails, CheckpointedPlacedDetails
+from storage.array_box_storage import ArrayBoxStorage
+from storage.external_memory_box_storage import ExternalMemoryBoxStorage
+from storage.heap_box_storage import HeapBoxStorage
+from storage.in_memory_box_storage import InMemoryBoxStorage
 
 
 class DetailPlacer:
@@ -12,9 +22,37 @@ class DetailPlacer:
         detail_generator (DetailGenerator): The detail generator used to create details.
         base_detail (Detail): The initial detail serving as the base for placement.
         max_placed (int): The maximum number of details to place.
+        batch_size (int): The number of details passed to the algorithm at once. If it is 1, details are placed
+            one by one with `place_next`; otherwise, chunks of details are generated
+            with `get_chunk` and placed with `place_batch`.
+        checkpoint_manager (CheckpointManager): The manager used to save checkpoints, or None.
+        checkpoint_interval (int): The number of placed details between checkpoints, or None if checkpoints
+            are not saved.
+        detail_log (DetailLogWriter): The log the layout is streamed to instead of being kept in memory, or None.
+        resource_budget (ResourceBudget): The limits on the resources of the placement, or None.
+        num_placed (int): The number of details placed so far.
+        placed_details (PlacedDetails | DetailLogWriter): The details that have been placed so far (the detail log if
+            it is set), or None if the placement has not started.
+        detail_iterator (Iterator): The iterator over the details of the generator, or None if the placement
+            has not started.
+        elapsed_time (float): The wall-clock time of the placement in seconds, measured at the last check
+            of the resource budget.
+        budget_actions (list[dict]): The actions taken because of exceeded budgets.
+        summary (dict): The summary of the last run, or None if the placement has not run.
     """
 
-    def __init__(self, algorithm: Algorithm, detail_generator: DetailGenerator, base_detail: Detail, max_placed: int):
+    COMPLETED = 'completed'
+    EXHAUSTED = 'exhausted'
+    STOPPED = 'stopped'
+    FAILED = 'failed'
+
+    # The box storages whose boxes are kept in memory and can be spilled to disk because of a resource budget.
+    SPILLABLE_STORAGE_CLASSES = (InMemoryBoxStorage, HeapBoxStorage, ArrayBoxStorage)
+
+    def __init__(self, algorithm: Algorithm, detail_generator: DetailGenerator, base_detail: Detail, max_placed: int,
+                 batch_size: int = 1, checkpoint_manager: CheckpointManager = None,
+                 checkpoint_interval: int = None, detail_log: DetailLogWriter = None,
+                 resource_budget: ResourceBudget = None):
         """
         Initialize the DetailPlacer.
 
@@ -22,32 +60,233 @@ class DetailPlacer:
         :param detail_generator: The detail generator used to create details.
         :param base_detail: The initial detail serving as the base for placement.
         :param max_placed: The maximum number of details to place.
+        :param batch_size: The number of details passed to the algorithm at once (default is 1, which places
+            details one by one).
+        :param checkpoint_manager: The manager used to save checkpoints (optional).
+        :param checkpoint_interval: The number of placed details between checkpoints. Required if
+            a checkpoint manager is given. The placed details are saved incrementally (see CheckpointManager).
+        :param detail_log: The log to stream the layout to instead of keeping it in memory (optional). It is closed
+            when the placement ends. The algorithm must update placed details.
+        :param resource_budget: The limits on the resources of the placement and the actions taken when they are
+            exceeded (optional).
         """
         self.algorithm = algorithm
         self.detail_generator = detail_generator
         self.base_detail = base_detail
         self.max_placed = max_placed
+        self.batch_size = batch_size
+        self.checkpoint_manager = checkpoint_manager
+        self.checkpoint_interval = checkpoint_interval if checkpoint_manager is not None else None
+        self.detail_log = detail_log
+        self.resource_budget = resource_budget
+        self.num_placed = 0
+        self.placed_details = None
+        self.detail_iterator = None
+        self.elapsed_time = 0.0
+        self.budget_actions = []
+        self.summary = None
 
-    def run_algorithm(self) -> list[Detail]:
+    def run_algorithm(self) -> PlacedDetails | DetailLogWriter:
         """
-        Places details using the specified algorithm and generator, and returns the list of placed details.
+        Places details using the specified algorithm and generator, and returns the placed details.
 
         This method coordinates the generation of details from the detail generator, places them using
-        the specified algorithm, and stops once the maximum number of details has been placed.
+        the specified algorithm, and stops once the maximum number of details has been placed. If a checkpoint
+        manager is set, a checkpoint is saved every `checkpoint_interval` placed details. A placer loaded from
+        a checkpoint continues from the saved state. If a detail log is set, it is closed at the end, and the layout
+        can be read from it with `read`. When the placement stops, the statistics buffered by the algorithm are
+        delivered to its listeners with `flush_statistics`. If the algorithm has a listener cost tracker, the start
+        and the end of the run are marked on it.
+
+        If a resource budget is set, it is checked every `check_interval` placed details, and the actions of
+        the exceeded budgets are taken. Whatever stops the placement, the details placed so far are returned, and
+        `summary` describes the run: the status ('completed', 'exhausted' if the generator ran out of details,
+        'stopped' by a budget or 'failed'), the error if the run failed, the number of placed details, the elapsed
+        time, the peak resident set size, the sizes of the box storage and the actions taken because of budgets.
 
-        :return: List of placed details.
+        :return: The placed details, in the order they would have in a list that is appended to and removed from,
+            or the closed detail log if it is set.
         """
-        num_placed = 0
-        placed_details = [self.base_detail]
-        detail_iterator = iter(self.detail_generator)
+        if self.placed_details is None:
+            if self.detail_log is not None:
+                self.placed_details = self.detail_log
+                self.placed_details.append(self.base_detail)
+            elif self.checkpoint_manager is not None:
+                self.placed_details = CheckpointedPlacedDetails(self.checkpoint_manager.details_path,
+                                                                [self.base_detail])
+            else:
+                self.placed_details = PlacedDetails([self.base_detail])
+            self.detail_iterator = iter(self.detail_generator)
+            self.num_placed = 0
+        run_start_time = time.perf_counter() - self.elapsed_time
+        listener_cost_tracker = getattr(self.algorithm, 'listener_cost_tracker', None)
+        if listener_cost_tracker is not None:
+            listener_cost_tracker.start_run()
+        status = None
+        error = None
         try:
-            for detail in detail_iterator:
-                if num_placed < self.max_placed:
-                    self.algorithm.place_next(detail, placed_details)
-                    num_placed += 1
+            while self.num_placed < self.max_placed:
+                count = min(self.batch_size, self.max_placed - self.num_placed)
+                if self.checkpoint_interval is not None:
+                    count = min(count, self.checkpoint_interval - self.num_placed % self.checkpoint_interval)
+                if self.resource_budget is not None:
+                    check_interval = self.resource_budget.check_interval
+                    count = min(count, check_interval - self.num_placed % check_interval)
+                if self.batch_size > 1:
+                    widths, heights = self.detail_generator.get_chunk(count)
+                    details = list(zip(widths.tolist(), heights.tolist()))
+                    if len(details) == 0:
+                        break
+                    last_placed_index = getattr(self.algorithm, 'last_placed_index', None)
+                    try:
+                        self.algorithm.place_batch(details, self.placed_details)
+                    except Exception:
+                        if last_placed_index is not None:
+                            self.num_placed += self.algorithm.last_placed_index - last_placed_index
+                        raise
+                    self.num_placed += len(details)
                 else:
-                    break
+                    detail = next(self.detail_iterator, None)
+                    if detail is None:
+                        break
+                    self.algorithm.place_next(detail, self.placed_details)
+                    self.num_placed += 1
+                if self.checkpoint_interval is not None and self.num_placed % self.checkpoint_interval == 0:
+                    self.elapsed_time = time.perf_counter() - run_start_time
+                    self.save_checkpoint()
+                if self.resource_budget is not None and \
+                        self.num_placed % self.resource_budget.check_interval == 0:
+                    self.elapsed_time = time.perf_counter() - run_start_time
+                    if not self._check_resource_budget():
+                        status = self.STOPPED
+                        break
         except Exception as e:
+            status = self.FAILED
+            error = str(e)
             print(f"An error occurred during algorithm execution: {e}")
         finally:
-            return placed_details
+            self.algorithm.flush_statistics(self.placed_details)
+            if listener_cost_tracker is not None:
+                listener_cost_tracker.end_run()
+            if self.detail_log is not None:
+                self.detail_log.close()
+            self.elapsed_time = time.perf_counter() - run_start_time
+            if status is None:
+                status = self.COMPLETED if self.num_placed >= self.max_placed else self.EXHAUSTED
+            self.summary = self._get_summary(status, error)
+            return self.placed_details
+
+    def _check_resource_budget(self) -> bool:
+        """
+        Check the resource budget and take the next action of every exceeded budget.
+
+        :return: False if the placement has to stop, True otherwise.
+        """
+        box_storage = getattr(self.algorithm, 'box_storage', None)
+        for budget, value in self.resource_budget.get_exceeded_budgets(self.elapsed_time, box_storage):
+            action = self.resource_budget.next_action(budget)
+            while action is not None and not self._apply_budget_action(action):
+                action = self.resource_budget.next_action(budget)
+            if action is None:
+                continue
+            self.budget_actions.append({'placed': self.num_placed, 'budget': budget, 'value': value,
+                                        'action': action})
+            if action == ResourceBudget.STOP:
+                return False
+        return True
+
+    def _apply_budget_action(self, action: str) -> bool:
+        """
+        Take an action because of an exceeded budget.
+
+        :param action: The action to be taken.
+        :return: True if the action has been taken, False if it cannot be applied.
+        """
+        if action == ResourceBudget.STOP:
+            return True
+        if action == ResourceBudget.DISABLE_PLACED_DETAILS:
+            if self.detail_log is not None or not getattr(self.algorithm, 'update_placed_details', False):
+                return False
+            self.algorithm.update_placed_details = False
+            return True
+        if action == ResourceBudget.SPILL_STORAGE:
+            return self._spill_storage()
+        raise ValueError(f'Unknown budget action: {action}')
+
+    def _spill_storage(self) -> bool:
+        """
+        Move the boxes of the in-memory box storage of the algorithm to an ExternalMemoryBoxStorage and use it
+        instead. If the storage is wrapped by storages that keep it in their `box_storage` attribute
+        (PruningBoxStorage, InstrumentedBoxStorage), it is replaced inside the innermost wrapper, so pruning and
+        metrics go on. The boxes are moved from the largest one, so boxes with equal minimum sides keep their order.
+        The temporary directory of the new storage is removed when the storage is garbage collected.
+
+        :return: True if the storage has been spilled, False if the algorithm has no box storage, its storage is not
+            one of SPILLABLE_STORAGE_CLASSES (for example a database, hybrid or external memory storage)
+            or coordinates are exact.
+        """
+        if getattr(self.algorithm, 'exact', False):
+            return False
+        owner = self.algorithm
+        box_storage = getattr(owner, 'box_storage', None)
+        while box_storage is not None and not isinstance(box_storage, self.SPILLABLE_STORAGE_CLASSES):
+            owner = box_storage
+            box_storage = getattr(owner, 'box_storage', None)
+        if box_storage is None:
+            return False
+        spill_storage = ExternalMemoryBoxStorage(memory_size=self.resource_budget.get_spill_memory_size(),
+                                                 directory=self.resource_budget.spill_directory)
+        boxes = []
+        box = box_storage.pop_max_box()
+        while box is not None:
+            boxes.append(box)
+            if len(boxes) == spill_storage.memory_size:
+                spill_storage.add_boxes(boxes)
+                boxes = []
+            box = box_storage.pop_max_box()
+        spill_storage.add_boxes(boxes)
+        owner.box_storage = spill_storage
+        return True
+
+    def _get_summary(self, status: str, error: str) -> dict:
+        """
+        Describe the run of the placement.
+
+        :param status: The status of the run.
+        :param error: The error that stopped the run, or None.
+        :return: A dictionary describing the run.
+        """
+        box_storage = getattr(self.algorithm, 'box_storage', None)
+        return {
+            'status': status,
+            'error': error,
+            'placed': self.num_placed,
+            'max_placed': self.max_placed,
+            'elapsed_time': self.elapsed_time,
+            'peak_rss': get_peak_rss(),
+            'storage_sizes': box_storage.get_sizes() if box_storage is not None else {},
+            'update_placed_details': getattr(self.algorithm, 'update_placed_details', None),
+            'budget_actions': list(self.budget_actions)
+        }
+
+    def save_checkpoint(self) -> None:
+        """
+        Save the whole state of the placement, including the algorithm, its box storage and statistic listeners,
+        the position of the detail generator and the placed details, with the checkpoint manager. The changes of
+        the placed details since the previous checkpoint are appended to the delta file of the checkpoint manager.
+        """
+        self.algorithm.prepare_checkpoint()
+        if isinstance(self.placed_details, CheckpointedPlacedDetails):
+            self.placed_details.prepare_checkpoint()
+        self.checkpoint_manager.save(self)
+        self.algorithm.complete_checkpoint()
+
+    @staticmethod
+    def resume(checkpoint_manager: CheckpointManager) -> 'DetailPlacer':
+        """
+        Load the placer from the latest checkpoint. Calling `run_algorithm` on it continues the placement.
+
+        :param checkpoint_manager: The checkpoint manager the placer was saved with.
+        :return: The loaded placer, or None if no checkpoint has been saved.
+        """
+        return checkpoint_manager.load()
@@ -0,0 +1,186 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+from algorithm.gamma_algorithm import GammaAlgorithm
+from algorithm.headless_gamma_algorithm import HeadlessGammaAlgorithm
+from core.detail_placer import DetailPlacer
+from detail.detail import Detail
+from detail.detail_generator import HarmonicRectangleDetailGenerator
+from statistic.listener.default_gamma_algorithm_listeners import NormalBoxFinalMaxRatioTracker, \
+    LrpOccupancyRatioHarmonicRectangleTracker
+from statistic.output import NullOutputHandler
+from storage.in_memory_box_storage import InMemoryBoxStorage
+
+# The number of details generated and placed at once in headless runs.
+HEADLESS_BATCH_SIZE = 4096
+
+
+def run_gamma_algorithm(n0: int, gamma: float, max_placed: int, is_width_smaller: bool = False,
+                        box_storage_class: type = InMemoryBoxStorage, headless: bool = False) -> dict:
+    """
+    Place harmonic rectangles with the gamma algorithm and collect the results of the run.
+
+    The function is defined at module level so that it can be sent to worker processes.
+
+    :param n0: The index of the first detail to be placed.
+    :param gamma: The gamma parameter.
+    :param max_placed: The maximum number of details to place.
+    :param is_width_smaller: Boolean indicating if the width of the details is smaller than the height.
+    :param box_storage_class: The class of the box storage created for the run. It must be constructible
+        without arguments.
+    :param headless: Boolean indicating if the run uses HeadlessGammaAlgorithm instead of GammaAlgorithm, which is
+        much faster and gives the same results, except that the LRP occupancy ratios are computed with the free area
+        maintained by the algorithm and may differ from the closed form in the last bits. The box storage class
+        is not used then.
+    :return: A dictionary with the parameters of the run, the number of placed details, the maximum ratio of
+        min_size / max_size^gamma for normal boxes, the smallest and the last LRP occupancy ratios
+        and the execution time in seconds.
+    """
+    start_time = time.perf_counter()
+    detail_generator = HarmonicRectangleDetailGenerator(n0, is_width_smaller=is_width_smaller)
+    base_width, base_height = detail_generator.get_base_size()
+    base_detail = Detail((0, 0), (base_width, base_height), GammaAlgorithm.LRP_PREFIX, GammaAlgorithm.LRP_NAME)
+    if headless:
+        algorithm = HeadlessGammaAlgorithm(gamma, n0, max_placed)
+        DetailPlacer(algorithm, detail_generator, base_detail, max_placed,
+                     batch_size=HEADLESS_BATCH_SIZE).run_algorithm()
+        return {
+            'n0': n0,
+            'gamma': gamma,
+            'max_placed': max_placed,
+            'placed': algorithm.last_placed_index - n0 + 1,
+            'max_ratio': algorithm.max_ratio,
+            'min_lrp_ratio': algorithm.min_lrp_ratio,
+            'last_lrp_ratio': algorithm.last_lrp_ratio,
+            'execution_time': time.perf_counter() - start_time
+        }
+    max_ratio_tracker = NormalBoxFinalMaxRatioTracker(NullOutputHandler())
+    lrp_occupancy_ratio_tracker = LrpOccupancyRatioHarmonicRectangleTracker(NullOutputHandler())
+    algorithm = GammaAlgorithm(gamma, n0, max_placed, box_storage_class(),
+                               statistic_listeners=[max_ratio_tracker, lrp_occupancy_ratio_tracker],
+                               update_placed_details=False)
+    DetailPlacer(algorithm, detail_generator, base_detail, max_placed).run_algorithm()
+    return {
+        'n0': n0,
+        'gamma': gamma,
+        'max_placed': max_placed,
+        'placed': algorithm.last_placed_index - n0 + 1,
+        'max_ratio': max_ratio_tracker.current_max,
+        'min_lrp_ratio': lrp_occupancy_ratio_tracker.min_ratio,
+        'last_lrp_ratio': lrp_occupancy_ratio_tracker.last_ratio,
+        'execution_time': time.perf_counter() - start_time
+    }
+
+
+class ParameterSweep:
+    """
+    Class to run the gamma algorithm for every combination of the given parameters in a process pool.
+
+    Each run places harmonic rectangles with its own box storage in a separate process, so independent runs
+    use all the cores. The result of each run is appended to a CSV file as soon as the run finishes. Runs whose
+    parameters are already in the file are skipped, so an interrupted sweep continues where it stopped.
+    Runs that stop early because a detail could not be placed are recorded with the number of placed details.
+    A run that raises an exception in its worker (for example a database error or a broken process pool) is
+    recorded with the error and without results, and the sweep continues. Such runs are started again when
+    the sweep is run next time.
+
+    When the sweep is started from a script, the script should call `run` under an `if __name__ == '__main__'`
+    guard, because worker processes may import the script.
+
+    Attributes:
+        results_path (str): The path to the CSV file with the results.
+        n0_values (list[int]): The values of the index of the first detail.
+        gamma_values (list[float]): The values of the gamma parameter.
+        max_placed_values (list[int]): The values of the maximum number of details to place.
+        is_width_smaller (bool): Boolean indicating if the width of the details is smaller than the height.
+        box_storage_class (type): The class of the box storage created for each run.
+        headless (bool): Boolean indicating if the runs use HeadlessGammaAlgorithm.
+        max_workers (int): The number of worker processes.
+    """
+
+    FIELDS = ['n0', 'gamma', 'max_placed', 'placed', 'max_ratio', 'min_lrp_ratio', 'last_lrp_ratio',
+              'execution_time', 'error']
+
+    def __init__(self, results_path: str, n0_values: list[int], gamma_values: list[float],
+                 max_placed_values: list[int], is_width_smaller: bool = False,
+                 box_storage_class: type = InMemoryBoxStorage, max_workers: int = None, headless: bool = False):
+        """
+        Initialize the ParameterSweep.
+
+        :param results_path: The path to the CSV file with the results. It is created if it does not exist.
+        :param n0_values: The values of the index of the first detail.
+        :param gamma_values: The values of the gamma parameter.
+        :param max_placed_values: The values of the maximum number of details to place.
+        :param is_width_smaller: Boolean indicating if the width of the details is smaller than the height
+            (default is False).
+        :param box_storage_class: The class of the box storage created for each run. It must be constructible
+            without arguments (default is InMemoryBoxStorage).
+        :param max_workers: The number of worker processes (default is the number of CPUs).
+        :param headless: Boolean indicating if the runs use HeadlessGammaAlgorithm instead of GammaAlgorithm
+            (default is False). See `run_gamma_algorithm`.
+        """
+        self.results_path = results_path
+        self.n0_values = n0_values
+        self.gamma_values = gamma_values
+        self.max_placed_values = max_placed_values
+        self.is_width_smaller = is_width_smaller
+        self.box_storage_class = box_storage_class
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.headless = headless
+
+    def get_parameters(self) -> list[tuple[int, float, int]]:
+        """
+        Get all combinations of the parameters.
+
+        :return: A list of (n0, gamma, max_placed) tuples.
+        """
+        return list(product(self.n0_values, self.gamma_values, self.max_placed_values))
+
+    def get_completed_parameters(self) -> set[tuple[int, float, int]]:
+        """
+        Get the parameters of the runs already recorded in the results file with their results, that is, without
+        the runs that failed with an error.
+
+        :return: A set of (n0, gamma, max_placed) tuples.
+        """
+        if not os.path.isfile(self.results_path):
+            return set()
+        with open(self.results_path, newline='') as f:
+            return {(int(row['n0']), float(row['gamma']), int(row['max_placed'])) for row in csv.DictReader(f)
+                    if row.get('placed')}
+
+    def run(self) -> None:
+        """
+        Run the gamma algorithm for every combination of the parameters that is not in the results file yet,
+        and append the results to the file. The longest runs are started first to keep all workers busy
+        until the end of the sweep. If the file already has a header, its columns are kept.
+        """
+        completed = self.get_completed_parameters()
+        pending = [parameters for parameters in self.get_parameters() if parameters not in completed]
+        pending.sort(key=lambda parameters: parameters[2], reverse=True)
+        if not pending:
+            return
+        write_header = not os.path.isfile(self.results_path) or os.path.getsize(self.results_path) == 0
+        fields = self.FIELDS
+        if not write_header:
+            with open(self.results_path, newline='') as f:
+                fields = next(csv.reader(f))
+        with open(self.results_path, 'a', newline='') as f, \
+                ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
+            futures = {executor.submit(run_gamma_algorithm, n0, gamma, max_placed, self.is_width_smaller,
+                                       self.box_storage_class, self.headless): (n0, gamma, max_placed)
+                       for n0, gamma, max_placed in pending}
+            for future in as_completed(futures):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    n0, gamma, max_placed = futures[future]
+                    row = {'n0': n0, 'gamma': gamma, 'max_placed': max_placed, 'error': f'{type(e).__name__}: {e}'}
+                writer.writerow(row)
+                f.flush()
@@ -0,0 +1,164 @@
+import os
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from storage.abstract_box_storage import BoxStorage
+
+
+def get_current_rss() -> int:
+    """
+    Get the resident set size of the current process. It is read from /proc on Linux; on other systems, the peak
+    resident set size is returned instead.
+
+    :return: The resident set size in bytes, or 0 if it cannot be measured.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return get_peak_rss()
+
+
+def get_peak_rss() -> int:
+    """
+    Get the peak resident set size of the current process.
+
+    :return: The peak resident set size in bytes, or 0 if it cannot be measured.
+    """
+    if resource is None:
+        return 0
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+class ResourceBudget:
+    """
+    A class describing limits on the resources of a placement and the actions taken when they are exceeded.
+
+    The budgets are checked by the DetailPlacer every `check_interval` placed details. Each budget has its own list
+    of actions. Every time a budget is found exceeded, the next action of its list is taken, so the reaction
+    escalates while the budget stays exceeded, and nothing more is done once the list is used up. An action that
+    cannot be applied (for example spilling a storage that is already on disk) is skipped in favor of the next one.
+
+    The actions are:
+    - `SPILL_STORAGE`: move the boxes of the in-memory box storage of the algorithm to an ExternalMemoryBoxStorage,
+      which keeps at most `spill_memory_size` boxes, and not more than `max_storage_size`, in memory. A storage
+      wrapped by PruningBoxStorage or InstrumentedBoxStorage is replaced inside the wrapper. Not applied to
+      database, hybrid or external memory storages, or in the exact mode of the gamma algorithm.
+    - `DISABLE_PLACED_DETAILS`: turn off `update_placed_details` of the algorithm, so the placed details stop
+      growing and keep the layout at that moment. Not applied when the layout is streamed to a detail log.
+    - `STOP`: stop the placement, keeping the details placed so far.
+
+    Attributes:
+        max_rss (int): The largest resident set size of the process in bytes, or None.
+        max_wall_time (float): The longest wall-clock time of the placement in seconds, or None.
+        max_storage_size (int): The largest number of boxes kept in memory by the box storage, or None.
+        actions (dict[str, list[str]]): The actions taken for each budget, in order.
+        check_interval (int): The number of placed details between checks.
+        spill_memory_size (int): The number of boxes kept in memory by the storage created by `SPILL_STORAGE`.
+        spill_directory (str): The directory for the runs of the storage created by `SPILL_STORAGE`, or None
+            for a temporary directory.
+        action_indices (dict[str, int]): The index of the next action of each budget.
+    """
+
+    RSS = 'rss'
+    WALL_TIME = 'wall_time'
+    STORAGE_SIZE = 'storage_size'
+
+    SPILL_STORAGE = 'spill_storage'
+    DISABLE_PLACED_DETAILS = 'disable_placed_details'
+    STOP = 'stop'
+
+    DEFAULT_ACTIONS = {
+        RSS: [SPILL_STORAGE, DISABLE_PLACED_DETAILS, STOP],
+        WALL_TIME: [STOP],
+        STORAGE_SIZE: [SPILL_STORAGE, STOP]
+    }
+
+    # The sizes reported by `get_sizes` of the storages that count boxes kept in memory.
+    MEMORY_SIZE_NAMES = ('boxes', 'memory', 'to_add_cache', 'max_cache')
+
+    def __init__(self, max_rss: int = None, max_wall_time: float = None, max_storage_size: int = None,
+                 actions: dict[str, list[str]] = None, check_interval: int = 1000, spill_memory_size: int = 1000000,
+                 spill_directory: str = None):
+        """
+        Initialize a ResourceBudget object.
+
+        :param max_rss: The largest resident set size of the process in bytes (optional).
+        :param max_wall_time: The longest wall-clock time of the placement in seconds (optional).
+        :param max_storage_size: The largest number of boxes kept in memory by the box storage (optional).
+        :param actions: The actions taken for each budget, in order. Budgets that are not given use
+            the actions of `DEFAULT_ACTIONS`.
+        :param check_interval: The number of placed details between checks (default is 1000).
+        :param spill_memory_size: The number of boxes kept in memory by the storage created by `SPILL_STORAGE`
+            (default is 1000000).
+        :param spill_directory: The directory for the runs of the storage created by `SPILL_STORAGE` (optional).
+        """
+        self.max_rss = max_rss
+        self.max_wall_time = max_wall_time
+        self.max_storage_size = max_storage_size
+        self.actions = {**self.DEFAULT_ACTIONS, **(actions or {})}
+        self.check_interval = check_interval
+        self.spill_memory_size = spill_memory_size
+        self.spill_directory = spill_directory
+        self.action_indices = {budget: 0 for budget in self.actions}
+
+    def get_exceeded_budgets(self, wall_time: float, box_storage: BoxStorage) -> list[tuple[str, float]]:
+        """
+        Measure the resources and find the exceeded budgets.
+
+        :param wall_time: The wall-clock time of the placement in seconds.
+        :param box_storage: The box storage of the algorithm, or None if the algorithm has no box storage.
+        :return: A list of the names of the exceeded budgets with the measured values.
+        """
+        exceeded = []
+        if self.max_rss is not None:
+            rss = get_current_rss()
+            if rss > self.max_rss:
+                exceeded.append((self.RSS, rss))
+        if self.max_wall_time is not None and wall_time > self.max_wall_time:
+            exceeded.append((self.WALL_TIME, wall_time))
+        if self.max_storage_size is not None and box_storage is not None:
+            storage_size = self.get_storage_size(box_storage)
+            if storage_size > self.max_storage_size:
+                exceeded.append((self.STORAGE_SIZE, storage_size))
+        return exceeded
+
+    def get_storage_size(self, box_storage: BoxStorage) -> int:
+        """
+        Get the number of boxes kept in memory by a box storage, from the sizes it reports.
+
+        :param box_storage: The box storage.
+        :return: The number of boxes kept in memory.
+        """
+        sizes = box_storage.get_sizes()
+        return sum(sizes.get(name, 0) for name in self.MEMORY_SIZE_NAMES)
+
+    def get_spill_memory_size(self) -> int:
+        """
+        Get the number of boxes kept in memory by the storage created by `SPILL_STORAGE`. It is limited by
+        the storage size budget, so that spilling brings the storage within the budget.
+
+        :return: The number of boxes kept in memory.
+        """
+        if self.max_storage_size is None:
+            return self.spill_memory_size
+        return max(1, min(self.spill_memory_size, self.max_storage_size))
+
+    def next_action(self, budget: str) -> str:
+        """
+        Get the next action of a budget and move past it.
+
+        :param budget: The name of the budget.
+        :return: The next action, or None if all the actions of the budget have been taken.
+        """
+        actions = self.actions.get(budget, [])
+        index = self.action_indices.get(budget, 0)
+        if index >= len(actions):
+            return None
+        self.action_indices[budget] = index + 1
+        return actions[index]
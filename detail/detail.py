@@ -3,17 +3,25 @@ class Detail:
     A class representing a detail.
     Each detail is defined by its bottom-left and top-right coordinates, a name, and a type.
 
+    The class uses `__slots__`, so details have no per-instance dictionary, and the width, the height,
+    the minimum side and the area are computed once in the constructor, since they are read over and over
+    by storages, the algorithm and listeners. The cached sizes assume that the coordinates are not modified after
+    the detail is created; nothing enforces this, so create a new detail instead of changing the coordinates
+    of an existing one.
+
     Attributes:
         bottom_left (tuple[float, float]): The bottom-left coordinates of the detail.
         top_right (tuple[float, float]): The top-right coordinates of the detail.
         name (str): The name of the detail.
         detail_type (str): The type of the detail.
-
-    Properties:
         width (float): The width of the detail.
         height (float): The height of the detail.
+        min_size (float): The smaller side of the detail.
+        area (float): The area of the detail.
     """
 
+    __slots__ = ('bottom_left', 'top_right', 'name', 'detail_type', 'width', 'height', 'min_size', 'area')
+
     def __init__(self, bottom_left: tuple[float, float], top_right: tuple[float, float], name: str, detail_type: str):
         """
         Initialize a Detail object.
@@ -27,24 +35,10 @@ class Detail:
         self.top_right = top_right
         self.name = name
         self.detail_type = detail_type
-
-    @property
-    def width(self) -> float:
-        """
-        Calculate the width of the detail.
-
-        :return: The width of the detail.
-        """
-        return self.top_right[0] - self.bottom_left[0]
-
-    @property
-    def height(self) -> float:
-        """
-        Calculate the height of the detail.
-
-        :return: The height of the detail.
-        """
-        return self.top_right[1] - self.bottom_left[1]
+        self.width = top_right[0] - bottom_left[0]
+        self.height = top_right[1] - bottom_left[1]
+        self.min_size = self.width if self.width <= self.height else self.height
+        self.area = self.width * self.height
 
     def __eq__(self, other) -> bool:
         """
@@ -1,5 +1,7 @@
 from detail.detail import Detail
+from detail.fixed_point import FixedPoint
 import json
+from typing import Iterable
 
 
 def find_all_neighbours(details: list[Detail], target_detail: Detail) -> list[Detail]:
@@ -41,15 +43,17 @@ def find_neighbours_of_depth(details: list[Detail], target_detail: Detail, depth
     return list(selected_details)
 
 
-def serialize_details_to_json(details: list[Detail], filename: str) -> None:
+def serialize_details_to_json(details: Iterable[Detail], filename: str) -> None:
     """
-    Serialize a list of Detail objects to a JSON file.
+    Serialize Detail objects to a JSON file. FixedPoint coordinates of details placed in the exact mode are written
+    as floats.
 
-    :param details: List of Detail objects to be serialized.
+    :param details: Detail objects to be serialized, for example a list or the details read from a detail log.
     :param filename: The name of the JSON file to save the serialized data.
     """
     serialized_details = []
     for detail in details:
+        detail = convert_detail_to_float(detail)
         serialized_detail = {
             "bottom_left": detail.bottom_left,
             "top_right": detail.top_right,
@@ -99,3 +103,86 @@ def count_detail_types(details: list[Detail]) -> dict[str, int]:
         else:
             detail_counts[detail.detail_type] = 1
     return detail_counts
+
+
+def convert_detail_to_float(detail: Detail) -> Detail:
+    """
+    Convert the coordinates of a detail placed in the exact mode to floats.
+
+    :param detail: A Detail object with FixedPoint or float coordinates.
+    :return: A new Detail object with float coordinates, or the detail itself if it has no FixedPoint coordinates.
+    """
+    if not any(isinstance(value, FixedPoint) for value in detail.bottom_left + detail.top_right):
+        return detail
+    return Detail(tuple(float(value) for value in detail.bottom_left),
+                  tuple(float(value) for value in detail.top_right),
+                  detail.name, detail.detail_type)
+
+
+def convert_details_to_float(details: Iterable[Detail]) -> list[Detail]:
+    """
+    Convert the coordinates of details placed in the exact mode to floats. The serializer and the plotter convert
+    the details themselves, so this is only needed for other consumers of the coordinates.
+
+    :param details: Detail objects with FixedPoint or float coordinates.
+    :return: A list of Detail objects with float coordinates.
+    """
+    return [convert_detail_to_float(detail) for detail in details]
+
+
+def compare_detail_coordinates(exact_details: list[Detail], float_details: list[Detail]) -> dict:
+    """
+    Compare the details placed in the exact mode with the details of the same run placed with floats,
+    and report how far the float coordinates have diverged.
+    Details are matched by name. The difference of a detail is the largest absolute difference
+    of its coordinates, and its relative difference is the difference divided by the smaller side of the exact
+    detail.
+
+    :param exact_details: A list of Detail objects placed in the exact mode.
+    :param float_details: A list of Detail objects placed with floats.
+    :return: A dictionary with the number of compared details ('compared'), the numbers of details found only
+        in one of the lists ('only_exact', 'only_float'), the number of matched details of different types
+        ('different_types'), the largest and the mean differences ('max_difference', 'mean_difference'),
+        the name of the detail with the largest difference ('max_difference_name') and the largest relative
+        difference ('max_relative_difference').
+    """
+    float_details_by_name = {detail.name: detail for detail in float_details}
+    exact_names = set()
+    compared = 0
+    different_types = 0
+    total_difference = 0.0
+    max_difference = 0.0
+    max_difference_name = None
+    max_relative_difference = 0.0
+    for exact_detail in exact_details:
+        exact_names.add(exact_detail.name)
+        float_detail = float_details_by_name.get(exact_detail.name)
+        if float_detail is None:
+            continue
+        compared += 1
+        if exact_detail.detail_type != float_detail.detail_type:
+            different_types += 1
+        difference = 0.0
+        for exact_value, float_value in zip(exact_detail.bottom_left + exact_detail.top_right,
+                                            float_detail.bottom_left + float_detail.top_right):
+            if isinstance(exact_value, FixedPoint):
+                difference = max(difference, abs(float(exact_value - FixedPoint.from_float(float_value))))
+            else:
+                difference = max(difference, abs(exact_value - float_value))
+        total_difference += difference
+        if difference > max_difference:
+            max_difference = difference
+            max_difference_name = exact_detail.name
+        min_size = float(exact_detail.min_size)
+        if min_size > 0:
+            max_relative_difference = max(max_relative_difference, difference / min_size)
+    return {
+        'compared': compared,
+        'only_exact': len(exact_names) - compared,
+        'only_float': sum(1 for detail in float_details if detail.name not in exact_names),
+        'different_types': different_types,
+        'max_difference': max_difference,
+        'mean_difference': total_difference / compared if compared else 0.0,
+        'max_difference_name': max_difference_name,
+        'max_relative_difference': max_relative_difference
+    }
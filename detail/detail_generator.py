@@ -1,6 +1,10 @@
 import math
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from detail.zeta import zeta_tail, EULER_MACLAURIN_START
+
 
 class DetailGenerator(ABC):
     """
@@ -35,6 +39,27 @@ class DetailGenerator(ABC):
         """
         pass
 
+    def get_chunk(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the next details as arrays of widths and heights. The details are the same as the ones
+        returned by `__next__`, and the generator advances past them.
+        By default, the details are generated one by one. Subclasses may override this method with a vectorized
+        implementation.
+
+        :param size: The number of details to generate.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details. The arrays are shorter
+            than the requested size only if the generator is exhausted.
+        """
+        widths = np.empty(size)
+        heights = np.empty(size)
+        count = 0
+        for count in range(size):
+            try:
+                widths[count], heights[count] = next(self)
+            except StopIteration:
+                return widths[:count], heights[:count]
+        return widths, heights
+
 
 class HarmonicSquareDetailGenerator(DetailGenerator):
     """
@@ -60,16 +85,25 @@ class HarmonicSquareDetailGenerator(DetailGenerator):
         self.denominator += 1
         return detail
 
+    def get_chunk(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the next square details as arrays of widths and heights.
+
+        :param size: The number of details to generate.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details.
+        """
+        sides = 1 / np.arange(self.denominator, self.denominator + size, dtype=np.float64)
+        self.denominator += size
+        return sides, sides.copy()
+
     def get_base_size(self) -> tuple[float, float]:
         """
         Compute the size of the base sheet for square detail.
+        The area of the sheet is the tail of the zeta series of 2 starting from n0, computed in constant time.
 
         :return: A tuple representing the width and height of the base sheet.
         """
-        base_size = pow(math.pi, 2) / 6
-        for i in range(1, self.n0):
-            base_size -= pow(1 / i, 2)
-        base_size = math.sqrt(base_size)
+        base_size = math.sqrt(zeta_tail(2, self.n0))
         return base_size, base_size
 
 
@@ -102,6 +136,19 @@ class HarmonicRectangleDetailGenerator(DetailGenerator):
         self.denominator += 1
         return detail
 
+    def get_chunk(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the next rectangular details as arrays of widths and heights.
+
+        :param size: The number of details to generate.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details.
+        """
+        sides = 1 / np.arange(self.denominator, self.denominator + size + 1, dtype=np.float64)
+        self.denominator += size
+        if self.is_width_smaller:
+            return sides[1:], sides[:-1]
+        return sides[:-1], sides[1:]
+
     def get_base_size(self) -> tuple[float, float]:
         """
         Compute the size of the base sheet for rectangular detail.
@@ -110,3 +157,176 @@ class HarmonicRectangleDetailGenerator(DetailGenerator):
         """
         base_size = math.sqrt(1 / self.n0)
         return base_size, base_size
+
+
+class PowerLawDetailGenerator(DetailGenerator):
+    """
+    Base class for generators of details whose sides decrease as 1/n^p.
+
+    The sides are computed with NumPy in blocks, and `__next__` returns the details of the current block one by one,
+    so the details returned by `__next__` and by `get_chunk` are exactly the same.
+
+    Attributes:
+        n0 (int): The starting denominator for the first detail.
+        p (float): The exponent of the power law.
+        denominator (int): The denominator of the next detail.
+        buffer (list[tuple[float, float]]): The computed details that have not been returned yet.
+        buffer_position (int): The position of the next detail in the buffer.
+    """
+
+    BUFFER_SIZE = 1024
+
+    def __init__(self, n0: int, p: float):
+        """
+        Initialize a PowerLawDetailGenerator object.
+
+        :param n0: The starting denominator for the first detail.
+        :param p: The exponent of the power law. Must be greater than 1/2, so that the total area is finite.
+        :raises ValueError: If the exponent is not greater than 1/2.
+        """
+        if p <= 0.5:
+            raise ValueError(f'The total area of details is infinite for the exponent {p}')
+        self.n0 = n0
+        self.p = p
+        self.denominator = n0
+        self.buffer = []
+        self.buffer_position = 0
+
+    def __next__(self) -> tuple[float, float]:
+        """
+        Return the next detail.
+
+        :return: A tuple representing the width and height of the next detail.
+        """
+        if self.buffer_position == len(self.buffer):
+            widths, heights = self._compute_chunk(self.denominator, self.BUFFER_SIZE)
+            self.buffer = list(zip(widths.tolist(), heights.tolist()))
+            self.buffer_position = 0
+        detail = self.buffer[self.buffer_position]
+        self.buffer_position += 1
+        self.denominator += 1
+        return detail
+
+    def get_chunk(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the next details as arrays of widths and heights.
+
+        :param size: The number of details to generate.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details.
+        """
+        buffered = self.buffer[self.buffer_position:self.buffer_position + size]
+        self.buffer_position += len(buffered)
+        self.denominator += len(buffered)
+        widths, heights = self._compute_chunk(self.denominator, size - len(buffered))
+        self.denominator += size - len(buffered)
+        if buffered:
+            buffered_widths, buffered_heights = np.array(buffered).reshape(-1, 2).T
+            widths = np.concatenate((buffered_widths, widths))
+            heights = np.concatenate((buffered_heights, heights))
+        return widths, heights
+
+    @abstractmethod
+    def _compute_chunk(self, first_denominator: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Abstract method to compute the sides of consecutive details. Should be implemented in subclasses.
+
+        :param first_denominator: The denominator of the first detail.
+        :param size: The number of details.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details.
+        """
+        pass
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the generator without the buffer, which is computed again when needed.
+
+        :return: The state of the generator.
+        """
+        state = self.__dict__.copy()
+        state['buffer'] = self.buffer[self.buffer_position:]
+        state['buffer_position'] = 0
+        return state
+
+
+class PowerLawSquareDetailGenerator(PowerLawDetailGenerator):
+    """
+    Generator for square details with sides 1/n^p.
+    """
+
+    def _compute_chunk(self, first_denominator: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the sides of consecutive square details.
+
+        :param first_denominator: The denominator of the first detail.
+        :param size: The number of details.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details.
+        """
+        sides = np.power(np.arange(first_denominator, first_denominator + size, dtype=np.float64), -self.p)
+        return sides, sides.copy()
+
+    def get_base_size(self) -> tuple[float, float]:
+        """
+        Compute the size of the square base sheet whose area is the total area of the details, which is the tail
+        of the zeta series of 2p starting from n0.
+
+        :return: A tuple representing the width and height of the base sheet.
+        """
+        base_size = math.sqrt(zeta_tail(2 * self.p, self.n0))
+        return base_size, base_size
+
+
+class PowerLawRectangleDetailGenerator(PowerLawDetailGenerator):
+    """
+    Generator for rectangular details with sides 1/n^p and 1/(n+1)^p.
+
+    Attributes:
+        is_width_smaller (bool): Boolean indicating if the width is smaller than the height.
+    """
+
+    def __init__(self, n0: int, p: float, is_width_smaller: bool):
+        """
+        Initialize a PowerLawRectangleDetailGenerator object.
+
+        :param n0: The starting denominator for the first detail.
+        :param p: The exponent of the power law. Must be greater than 1/2, so that the total area is finite.
+        :param is_width_smaller: Boolean indicating if the width is smaller than the height.
+        """
+        super().__init__(n0, p)
+        self.is_width_smaller = is_width_smaller
+
+    def _compute_chunk(self, first_denominator: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the sides of consecutive rectangular details.
+
+        :param first_denominator: The denominator of the first detail.
+        :param size: The number of details.
+        :return: A tuple of two float64 arrays with the widths and the heights of the details.
+        """
+        sides = np.power(np.arange(first_denominator, first_denominator + size + 1, dtype=np.float64), -self.p)
+        if self.is_width_smaller:
+            return sides[1:], sides[:-1]
+        return sides[:-1], sides[1:]
+
+    def get_base_size(self) -> tuple[float, float]:
+        """
+        Compute the size of the square base sheet whose area is the total area of the details.
+
+        The area is the sum of (n(n+1))^(-p) over n >= n0. Its first terms are summed directly, and for the rest
+        (n(n+1))^(-p) = n^(-2p) (1 + 1/n)^(-p) is expanded into the binomial series, which turns the tail into
+        a fast converging sum of zeta tails.
+
+        :return: A tuple representing the width and height of the base sheet.
+        """
+        start = max(self.n0, EULER_MACLAURIN_START)
+        terms = [pow(n * (n + 1), -self.p) for n in range(self.n0, start)]
+        coefficient = 1.0
+        j = 0
+        while True:
+            term = coefficient * zeta_tail(2 * self.p + j, start)
+            terms.append(term)
+            if abs(term) < 1e-18 * abs(terms[-1 - j]):
+                break
+            coefficient *= (-self.p - j) / (j + 1)
+            j += 1
+        base_size = math.sqrt(math.fsum(terms))
+        return base_size, base_size
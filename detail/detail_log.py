@@ -0,0 +1,219 @@
+import csv
+import os
+from collections import Counter
+from typing import Iterable, Iterator
+
+from detail.detail import Detail
+
+
+class DetailLogWriter:
+    """
+    A class representing a placed-details sink that streams the layout to an append-only log file.
+
+    It can be used by the algorithm in place of PlacedDetails. Every detail is written to the log when it is added,
+    and a removal record is written when it is removed, so memory does not grow with the layout. The only exception
+    is the pieces that the algorithm replaces over and over: the LRP, which is replaced by every cut of a stripe, and
+    the current stripe, whose endpoint is replaced by every placed detail. At most one detail of each of these
+    groups is kept in memory; it is written once it becomes final, that is, when another detail of its group is
+    added while it is still in the layout, or when the log is closed. Iteration goes over the details kept in memory
+    (the sheet before the first detail is placed), which is all the gamma algorithm needs.
+
+    Each line of the log holds the coordinates, the name and the type of a detail. Coordinates are written as
+    floats with their exact representation. A removal record repeats the line of the removed detail followed
+    by REMOVED_MARKER. The log can be read with `read_detail_log`, which applies the removal records.
+
+    Attributes:
+        path (str): The path to the log file.
+        pending_groups (list[set[str]]): The groups of detail types of which the last added detail is kept
+            in memory until it becomes final.
+        pending (list[Detail]): The detail kept in memory for each of the pending groups, or None.
+        file (TextIO): The open log file, or None if the log is closed.
+        writer (csv.writer): The CSV writer of the log file.
+        detail_count (int): The number of details in the layout.
+        written_count (int): The number of lines written to the log, including removal records.
+    """
+
+    REMOVED_MARKER = 'removed'
+
+    def __init__(self, path: str, pending_groups: Iterable[Iterable[str]] = (('lrp',), ('endpoint_1', 'endpoint_2'))):
+        """
+        Initializes the DetailLogWriter and creates an empty log file, replacing an existing one.
+
+        :param path: The path to the log file.
+        :param pending_groups: The groups of detail types of which the last added detail is kept in memory until
+            it becomes final (default is the LRP and the endpoints of the gamma algorithm). The sheet must be
+            of one of these types, so that the algorithm can find it by iterating over the log.
+        """
+        self.path = path
+        self.pending_groups = [set(group) for group in pending_groups]
+        self.pending = [None] * len(self.pending_groups)
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.detail_count = 0
+        self.written_count = 0
+
+    def append(self, detail: Detail) -> None:
+        """
+        Add a detail to the layout. A detail of a pending group replaces the detail of its group kept in memory,
+        which is written to the log; any other detail is written at once.
+
+        :param detail: The detail to be added.
+        """
+        self.detail_count += 1
+        for index, group in enumerate(self.pending_groups):
+            if detail.detail_type in group:
+                if self.pending[index] is not None:
+                    self._write(self.pending[index])
+                self.pending[index] = detail
+                return
+        self._write(detail)
+
+    def extend(self, details: Iterable[Detail]) -> None:
+        """
+        Add several details to the layout, in order.
+
+        :param details: The details to be added.
+        """
+        for detail in details:
+            self.append(detail)
+
+    def remove(self, detail: Detail) -> None:
+        """
+        Remove a detail from the layout. A detail kept in memory is dropped; for a detail already written,
+        a removal record is written. The writer does not check that the detail is in the layout.
+
+        :param detail: The detail to be removed.
+        """
+        self.detail_count -= 1
+        for index, pending_detail in enumerate(self.pending):
+            if pending_detail == detail:
+                self.pending[index] = None
+                return
+        self._write(detail, removed=True)
+
+    def replace(self, old_detail: Detail, new_detail: Detail) -> None:
+        """
+        Remove a detail from the layout and add another one.
+
+        :param old_detail: The detail to be removed.
+        :param new_detail: The detail to be added.
+        """
+        self.remove(old_detail)
+        self.append(new_detail)
+
+    def __iter__(self) -> Iterator[Detail]:
+        """
+        Iterate over the details kept in memory.
+
+        :return: An iterator over the details kept in memory.
+        """
+        return (detail for detail in self.pending if detail is not None)
+
+    def __len__(self) -> int:
+        """
+        Get the number of details in the layout, including the ones already written.
+
+        :return: The number of details.
+        """
+        return self.detail_count
+
+    def __contains__(self, detail: Detail) -> bool:
+        """
+        Check if a detail is kept in memory.
+
+        :param detail: The detail to be checked.
+        :return: True if an equal detail is kept in memory, False otherwise.
+        """
+        return detail in self.pending
+
+    def close(self) -> None:
+        """
+        Write the details kept in memory to the log and close the file. Does nothing if the log is already closed.
+        """
+        if self.file is None:
+            return
+        for detail in self:
+            self._write(detail)
+        self.pending = [None] * len(self.pending_groups)
+        self.file.close()
+        self.file = None
+        self.writer = None
+
+    def read(self) -> Iterator[Detail]:
+        """
+        Read the details written to the log. After the log is closed, these are all the details of the layout.
+
+        :return: An iterator over the details written to the log and not removed.
+        """
+        if self.file is not None:
+            self.file.flush()
+        return read_detail_log(self.path)
+
+    def _write(self, detail: Detail, removed: bool = False) -> None:
+        """
+        Write a detail or its removal record to the log.
+
+        :param detail: The detail to be written.
+        :param removed: Whether to write the removal record of the detail (default is False).
+        """
+        row = (float(detail.bottom_left[0]), float(detail.bottom_left[1]),
+               float(detail.top_right[0]), float(detail.top_right[1]), detail.name, detail.detail_type)
+        self.writer.writerow(row + (self.REMOVED_MARKER,) if removed else row)
+        self.written_count += 1
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the writer for a checkpoint. The written part of the log is flushed to disk, and its size
+        is saved instead of the open file, so besides the counts only the details kept in memory are pickled.
+
+        :return: The state of the writer.
+        """
+        state = self.__dict__.copy()
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            state['file'] = self.file.tell()
+        del state['writer']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the writer from a checkpoint. Details written to the log after the checkpoint are discarded.
+
+        :param state: The state of the writer.
+        """
+        self.__dict__.update(state)
+        self.writer = None
+        if self.file is not None:
+            position = self.file
+            self.file = open(self.path, 'r+', newline='')
+            self.file.truncate(position)
+            self.file.seek(position)
+            self.writer = csv.writer(self.file)
+
+
+def read_detail_log(path: str) -> Iterator[Detail]:
+    """
+    Read the details from a log written by DetailLogWriter, one at a time, in the order they were written.
+    The log is read twice: the removal records are collected first, so that the removed details can be skipped
+    while the details are read. Memory is therefore bounded by the number of removed details.
+    The details can be passed to `serialize_details_to_json`, or collected into a list for the Plotter.
+
+    :param path: The path to the log file.
+    :return: An iterator over the details of the log that have not been removed.
+    """
+    removed = Counter()
+    with open(path, newline='') as file:
+        for row in csv.reader(file):
+            if len(row) > 6:
+                removed[tuple(row[:6])] += 1
+    with open(path, newline='') as file:
+        for row in csv.reader(file):
+            if len(row) > 6:
+                continue
+            key = tuple(row)
+            if removed[key] > 0:
+                removed[key] -= 1
+                continue
+            x1, y1, x2, y2, name, detail_type = row
+            yield Detail((float(x1), float(y1)), (float(x2), float(y2)), name, detail_type)
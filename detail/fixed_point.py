@@ -0,0 +1,126 @@
+class FixedPoint(int):
+    """
+    A class representing an exact fixed-point number: an integer numerator over the common denominator 2^SCALE_BITS.
+
+    Sums and differences of fixed-point numbers are plain integer operations, so coordinates built by repeatedly
+    adding and subtracting sizes do not accumulate rounding errors. Every float whose magnitude is not less than
+    2^(52 - SCALE_BITS) is converted exactly, which covers all sizes and gaps of the harmonic details used in
+    practice. Comparisons between fixed-point numbers are inherited from int and are exact as well.
+
+    Multiplication, true division and powers leave the exact domain and return floats, so statistics such as
+    min_size / max_size^gamma or areas work with fixed-point coordinates unchanged. Comparisons with floats are
+    not scaled; a float threshold must be converted with `from_float` before it is compared with a fixed-point
+    number.
+    """
+
+    SCALE_BITS = 128
+    SCALE = float(1 << SCALE_BITS)
+    INVERSE_SCALE = 1 / SCALE
+
+    __slots__ = ()
+
+    @classmethod
+    def from_float(cls, value: float) -> 'FixedPoint':
+        """
+        Convert a float to the nearest fixed-point number.
+
+        :param value: The float to be converted.
+        :return: The fixed-point number.
+        """
+        return cls(round(value * cls.SCALE))
+
+    def __float__(self) -> float:
+        """
+        Convert the fixed-point number to the nearest float.
+
+        :return: The value as a float.
+        """
+        return int.__float__(self) * self.INVERSE_SCALE
+
+    def __add__(self, other):
+        """
+        Add a number. The sum of two fixed-point numbers is exact; with any other number it is a float.
+        """
+        if isinstance(other, FixedPoint):
+            return FixedPoint(int.__add__(self, other))
+        return float(self) + other
+
+    def __radd__(self, other):
+        """
+        Add the fixed-point number to a number that is not fixed-point. The result is a float.
+        """
+        return other + float(self)
+
+    def __sub__(self, other):
+        """
+        Subtract a number. The difference of two fixed-point numbers is exact; with any other number it is a float.
+        """
+        if isinstance(other, FixedPoint):
+            return FixedPoint(int.__sub__(self, other))
+        return float(self) - other
+
+    def __rsub__(self, other):
+        """
+        Subtract the fixed-point number from a number that is not fixed-point. The result is a float.
+        """
+        return other - float(self)
+
+    def __neg__(self):
+        """
+        Negate the fixed-point number exactly.
+        """
+        return FixedPoint(int.__neg__(self))
+
+    def __abs__(self):
+        """
+        Get the absolute value of the fixed-point number exactly.
+        """
+        return FixedPoint(int.__abs__(self))
+
+    def __mul__(self, other):
+        """
+        Multiply by a number. The result is a float.
+        """
+        return float(self) * float(other)
+
+    def __rmul__(self, other):
+        """
+        Multiply a number by the fixed-point number. The result is a float.
+        """
+        return float(other) * float(self)
+
+    def __truediv__(self, other):
+        """
+        Divide by a number. The result is a float.
+        """
+        return float(self) / float(other)
+
+    def __rtruediv__(self, other):
+        """
+        Divide a number by the fixed-point number. The result is a float.
+        """
+        return float(other) / float(self)
+
+    def __pow__(self, other, modulo=None):
+        """
+        Raise the fixed-point number to a power. The result is a float.
+        """
+        return pow(float(self), other)
+
+    def __rpow__(self, other):
+        """
+        Raise a number to the power of the fixed-point number. The result is a float.
+        """
+        return pow(other, float(self))
+
+    def __repr__(self) -> str:
+        """
+        Get the representation of the fixed-point number showing its value as a float.
+        """
+        return f'FixedPoint({float(self)!r})'
+
+    def __str__(self) -> str:
+        """
+        Get the value of the fixed-point number as a string of the nearest float.
+        """
+        return str(float(self))
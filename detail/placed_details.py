@@ -0,0 +1,217 @@
+import os
+import pickle
+from typing import Iterable, Iterator
+
+from detail.detail import Detail
+
+
+class PlacedDetails:
+    """
+    A class representing an ordered collection of placed details with constant-time removal.
+
+    Details are kept as the keys of an insertion-ordered dictionary, so appending, removing a detail and checking
+    whether a detail is in the collection take constant time, while iteration returns the details in the same order
+    as a list that is only appended to and removed from would. Details are found by equality, so a detail restored
+    from a database storage removes the equal detail that was placed before. The collection cannot hold two equal
+    details at the same time. Names are reused (for example, every LRP is named `LRP`), but details that are in
+    a layout at the same time cover disjoint parts of the sheet, so they never have the same coordinates and are
+    never equal. A detail that was removed may be added again.
+
+    Attributes:
+        details (dict[Detail, None]): The placed details in the order they were added.
+    """
+
+    def __init__(self, details: Iterable[Detail] = ()):
+        """
+        Initializes the PlacedDetails.
+
+        :param details: The initial details (optional).
+        """
+        self.details = dict.fromkeys(details)
+
+    def append(self, detail: Detail) -> None:
+        """
+        Add a detail to the end of the collection.
+
+        :param detail: The detail to be added.
+        """
+        self.details[detail] = None
+
+    def extend(self, details: Iterable[Detail]) -> None:
+        """
+        Add several details to the end of the collection, in order.
+
+        :param details: The details to be added.
+        """
+        self.details.update(dict.fromkeys(details))
+
+    def remove(self, detail: Detail) -> None:
+        """
+        Remove a detail from the collection.
+
+        :param detail: The detail to be removed.
+        :raises ValueError: If the detail is not in the collection.
+        """
+        try:
+            del self.details[detail]
+        except KeyError:
+            raise ValueError(f'Detail {detail.name} is not placed') from None
+
+    def replace(self, old_detail: Detail, new_detail: Detail) -> None:
+        """
+        Remove a detail from the collection and add another one to its end.
+
+        :param old_detail: The detail to be removed.
+        :param new_detail: The detail to be added.
+        :raises ValueError: If the removed detail is not in the collection.
+        """
+        self.remove(old_detail)
+        self.details[new_detail] = None
+
+    def __iter__(self) -> Iterator[Detail]:
+        """
+        Iterate over the details in the order they were added.
+
+        :return: An iterator over the details.
+        """
+        return iter(self.details)
+
+    def __len__(self) -> int:
+        """
+        Get the number of details in the collection.
+
+        :return: The number of details.
+        """
+        return len(self.details)
+
+    def __contains__(self, detail: Detail) -> bool:
+        """
+        Check if a detail is in the collection.
+
+        :param detail: The detail to be checked.
+        :return: True if an equal detail is in the collection, False otherwise.
+        """
+        return detail in self.details
+
+
+class CheckpointedPlacedDetails(PlacedDetails):
+    """
+    A class representing placed details whose checkpoints take time proportional to the changes since the previous
+    checkpoint rather than to the size of the layout.
+
+    The added and removed details are recorded in memory, and `prepare_checkpoint` appends them to an append-only
+    delta file as one pickle record. Pickling saves only the size of the delta file and the changes not yet
+    appended, not the details themselves. Unpickling replays the delta file up to the saved size, so records
+    appended after the checkpoint are discarded. The delta file holds the whole history of the layout, so resuming
+    takes time proportional to the number of changes during the run.
+
+    Attributes:
+        details (dict[Detail, None]): The placed details in the order they were added.
+        path (str): The path to the delta file.
+        changes (list[tuple[Detail, bool]]): The details added (False) or removed (True) since the last checkpoint,
+            in order.
+        offset (int): The size of the delta file at the last checkpoint.
+    """
+
+    def __init__(self, path: str, details: Iterable[Detail] = ()):
+        """
+        Initializes the CheckpointedPlacedDetails and creates an empty delta file, replacing an existing one.
+
+        :param path: The path to the delta file.
+        :param details: The initial details (optional).
+        """
+        super().__init__(details)
+        self.path = path
+        self.changes = [(detail, False) for detail in self.details]
+        self.offset = 0
+        open(path, 'wb').close()
+
+    def append(self, detail: Detail) -> None:
+        """
+        Add a detail to the end of the collection and record the change.
+
+        :param detail: The detail to be added.
+        """
+        self.details[detail] = None
+        self.changes.append((detail, False))
+
+    def extend(self, details: Iterable[Detail]) -> None:
+        """
+        Add several details to the end of the collection, in order, and record the changes.
+
+        :param details: The details to be added.
+        """
+        for detail in details:
+            self.append(detail)
+
+    def remove(self, detail: Detail) -> None:
+        """
+        Remove a detail from the collection and record the change.
+
+        :param detail: The detail to be removed.
+        :raises ValueError: If the detail is not in the collection.
+        """
+        super().remove(detail)
+        self.changes.append((detail, True))
+
+    def replace(self, old_detail: Detail, new_detail: Detail) -> None:
+        """
+        Remove a detail from the collection, add another one to its end and record the changes.
+
+        :param old_detail: The detail to be removed.
+        :param new_detail: The detail to be added.
+        :raises ValueError: If the removed detail is not in the collection.
+        """
+        self.remove(old_detail)
+        self.append(new_detail)
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Append the changes since the last checkpoint to the delta file. Called right before the details are pickled.
+        """
+        if not self.changes:
+            return
+        with open(self.path, 'ab') as file:
+            pickle.dump(self.changes, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+            self.offset = file.tell()
+        self.changes = []
+
+    def _apply(self, changes: list[tuple[Detail, bool]]) -> None:
+        """
+        Apply recorded changes to the collection without recording them again.
+
+        :param changes: The added (False) and removed (True) details, in order.
+        """
+        for detail, removed in changes:
+            if removed:
+                del self.details[detail]
+            else:
+                self.details[detail] = None
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the collection for a checkpoint: the size of the delta file and the changes not yet
+        appended to it, without the details.
+
+        :return: The state of the collection.
+        """
+        state = self.__dict__.copy()
+        del state['details']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the collection from a checkpoint by replaying the delta file and the unsaved changes.
+        Records appended to the delta file after the checkpoint are discarded.
+
+        :param state: The state of the collection.
+        """
+        self.__dict__.update(state)
+        self.details = {}
+        with open(self.path, 'r+b') as file:
+            while file.tell() < self.offset:
+                self._apply(pickle.load(file))
+            file.truncate(self.offset)
+        self._apply(self.changes)
@@ -0,0 +1,38 @@
+import math
+
+EULER_MACLAURIN_START = 50
+"""The smallest index from which tails are computed with the Euler-Maclaurin formula. Smaller indices are summed
+directly, so that the correction terms of the formula are far below the float precision."""
+
+BERNOULLI_COEFFICIENTS = [1 / 6, -1 / 30, 1 / 42, -1 / 30, 5 / 66, -691 / 2730]
+"""The Bernoulli numbers B2, B4, ..., B12 used by the correction terms of the Euler-Maclaurin formula."""
+
+
+def zeta_tail(s: float, n: int) -> float:
+    """
+    Calculate the tail of the zeta series, the sum of k^(-s) over all k >= n (the Hurwitz zeta function of s and n).
+
+    The terms below EULER_MACLAURIN_START are summed directly and the rest of the series is computed with
+    the Euler-Maclaurin formula, so the result takes constant time for any n and has full float precision.
+    Unlike subtracting a partial sum from the value of the zeta function, it does not lose precision when n is large.
+
+    :param s: The exponent of the series. Must be greater than 1.
+    :param n: The index of the first term of the tail. Must be positive.
+    :return: The sum of the tail.
+    :raises ValueError: If the series does not converge or the index is not positive.
+    """
+    if s <= 1:
+        raise ValueError(f'The series of k^(-{s}) does not converge')
+    if n < 1:
+        raise ValueError(f'The index of the first term must be positive, got {n}')
+    start = max(n, EULER_MACLAURIN_START)
+    terms = [pow(k, -s) for k in range(n, start)]
+    terms.append(pow(start, 1 - s) / (s - 1))
+    terms.append(pow(start, -s) / 2)
+    rising_factorial = s
+    factorial = 2
+    for j, bernoulli in enumerate(BERNOULLI_COEFFICIENTS, start=1):
+        terms.append(bernoulli / factorial * rising_factorial * pow(start, -s - 2 * j + 1))
+        rising_factorial *= (s + 2 * j - 1) * (s + 2 * j)
+        factorial *= (2 * j + 1) * (2 * j + 2)
+    return math.fsum(terms)
@@ -1,4 +1,7 @@
+import numpy as np
+
 from detail.detail import Detail
+from detail.placed_details import PlacedDetails
 from statistic.event.abstract_event import Event
 
 
@@ -22,13 +25,13 @@ class GammaAlgorithmEvent(Event):
         stripe_from (str): Type of the detail from which the current stripe was formed.
         detail (tuple[float, float]): The current detail to be placed. A tuple represents the width and height
             of the detail. The width here means the side on which the detail will be placed.
-        placed_details (list[Detail]): A list of placed details.
+        placed_details (PlacedDetails): The placed details.
     """
 
     def __init__(self, gamma: float, n0: int, max_placed: int, lrp: Detail, stripe: Detail,
                  stripe_first_detail_index: int, is_stripe_horizontal: bool, last_placed_index: int,
                  endpoints_placed: int, stripe_from: str, detail: tuple[float, float],
-                 placed_details: list[Detail]):
+                 placed_details: PlacedDetails):
         """
         Initialize a GammaAlgorithmEvent object.
 
@@ -45,7 +48,7 @@ class GammaAlgorithmEvent(Event):
         :param stripe_from: The detail from which the current stripe was formed.
         :param detail: The current detail to be placed. A tuple represents the width and height of the detail.
             The width here means the side on which the detail will be placed.
-        :param placed_details: A list of placed details.
+        :param placed_details: The placed details.
         """
         self.gamma = gamma
         self.n0 = n0
@@ -89,7 +92,7 @@ class GammaAlgorithmAfterDetailPlacedEvent(GammaAlgorithmEvent):
         stripe_from (str): Type of the detail from which the current stripe was formed.
         detail (tuple[float, float]): The current detail to be placed. A tuple represents the width and height
             of the detail. The width here means the side on which the detail will be placed.
-        placed_details (list[Detail]): A list of placed details.
+        placed_details (PlacedDetails): The placed details.
         placed_detail (Detail): The new placed detail.
         normal_box (Detail): The normal box created after placing the detail.
         endpoint (Detail): The endpoint created after placing the detail.
@@ -97,7 +100,7 @@ class GammaAlgorithmAfterDetailPlacedEvent(GammaAlgorithmEvent):
 
     def __init__(self, gamma: float, n0: int, max_placed: int, lrp: Detail, stripe: Detail,
                  stripe_first_detail_index: int, is_stripe_horizontal: bool, last_placed_index: int,
-                 endpoints_placed: int, stripe_from: str, detail: tuple[float, float], placed_details: list[Detail],
+                 endpoints_placed: int, stripe_from: str, detail: tuple[float, float], placed_details: PlacedDetails,
                  placed_detail: Detail, normal_box: Detail, endpoint: Detail):
         """
         Initialize a GammaAlgorithmDetailPlacedEvent object.
@@ -115,7 +118,7 @@ class GammaAlgorithmAfterDetailPlacedEvent(GammaAlgorithmEvent):
         :param stripe_from: The detail from which the current stripe was formed.
         :param detail: The current detail to be placed. A tuple represents the width and height of the detail.
             The width here means the side on which the detail will be placed.
-        :param placed_details: A list of placed details.
+        :param placed_details: The placed details.
         :param placed_detail: The new placed detail.
         :param normal_box: The normal box created after placing the detail.
         :param endpoint: The endpoint created after placing the detail.
@@ -155,7 +158,7 @@ class GammaAlgorithmBeforeLRPCutEvent(GammaAlgorithmEvent):
         stripe_from (str): Type of the detail from which the current stripe was formed.
         detail (tuple[float, float]): The current detail to be placed. A tuple represents the width and height
             of the detail. The width here means the side on which the detail will be placed.
-        placed_details (list[Detail]): A list of placed details.
+        placed_details (PlacedDetails): The placed details.
     """
 
     def get_event_type(self) -> str:
@@ -187,7 +190,7 @@ class GammaAlgorithmAfterLRPCutEvent(GammaAlgorithmEvent):
         stripe_from (str): Type of the detail from which the current stripe was formed.
         detail (tuple[float, float]): The current detail to be placed. A tuple represents the width and height
             of the detail. The width here means the side on which the detail will be placed.
-        placed_details (list[Detail]): A list of placed details.
+        placed_details (PlacedDetails): The placed details.
     """
 
     def get_event_type(self) -> str:
@@ -219,7 +222,7 @@ class GammaAlgorithmEndEvent(GammaAlgorithmEvent):
         stripe_from (str): Type of the detail from which the current stripe was formed.
         detail (tuple[float, float]): The last placed detail. A tuple represents the width and height
             of the detail. The width here means the side on which the detail will be placed.
-        placed_details (list[Detail]): A list of placed details.
+        placed_details (PlacedDetails): The placed details.
     """
 
     def get_event_type(self) -> str:
@@ -229,3 +232,288 @@ class GammaAlgorithmEndEvent(GammaAlgorithmEvent):
         :return: The type of the event.
         """
         return self.EVENT_TYPE
+
+
+class GammaAlgorithmDetailsPlacedBatchEvent(GammaAlgorithmEvent):
+    EVENT_TYPE = 'Gamma algorithm details placed batch event'
+
+    """
+    Event that occurs after a batch of consecutive details has been placed during the execution of the gamma
+    algorithm. It describes all the details of the batch at once as columnar arrays, where the i-th element
+    of every array belongs to the detail with the index `indices[i]`.
+
+    Attributes:
+        gamma (float): The gamma parameter.
+        n0 (int): The index of the first detail to be placed.
+        max_placed (int): The maximum number of details to place.
+        lrp (Detail): The Large Rectangular Piece (LRP).
+        stripe (Detail): The current stripe, or None if there is no current stripe.
+        stripe_first_detail_index (int): The index of the first detail in the current stripe.
+        is_stripe_horizontal (bool): Whether the stripe is horizontal (the size along the x-axis is greater than
+            along the y-axis).
+        last_placed_index (int): The index of the last placed detail.
+        endpoints_placed (int): The number of endpoints placed.
+        stripe_from (str): Type of the detail from which the current stripe was formed.
+        detail (tuple[float, float]): The last placed detail. A tuple represents the width and height
+            of the detail. The width here means the side on which the detail will be placed.
+        placed_details (PlacedDetails): The placed details.
+        indices (np.ndarray): The indices of the placed details.
+        detail_widths (np.ndarray): The widths of the placed details, that is, the sides on which they were placed.
+        detail_heights (np.ndarray): The heights of the placed details.
+        normal_box_widths (np.ndarray): The widths of the normal boxes created after placing the details.
+        normal_box_heights (np.ndarray): The heights of the normal boxes created after placing the details.
+        endpoint_widths (np.ndarray): The widths of the endpoints created after placing the details.
+        endpoint_heights (np.ndarray): The heights of the endpoints created after placing the details.
+    """
+
+    def __init__(self, gamma: float, n0: int, max_placed: int, lrp: Detail, stripe: Detail,
+                 stripe_first_detail_index: int, is_stripe_horizontal: bool, last_placed_index: int,
+                 endpoints_placed: int, stripe_from: str, detail: tuple[float, float], placed_details: PlacedDetails,
+                 indices: np.ndarray, detail_widths: np.ndarray, detail_heights: np.ndarray,
+                 normal_box_widths: np.ndarray, normal_box_heights: np.ndarray, endpoint_widths: np.ndarray,
+                 endpoint_heights: np.ndarray):
+        """
+        Initialize a GammaAlgorithmDetailsPlacedBatchEvent object.
+
+        :param gamma: The gamma parameter.
+        :param n0: The index of the first detail to be placed.
+        :param max_placed: The maximum number of details to place.
+        :param lrp: The Large Rectangular Piece (LRP).
+        :param stripe: The current stripe, or None if there is no current stripe.
+        :param stripe_first_detail_index: The index of the first detail in the current stripe.
+        :param is_stripe_horizontal: Whether the stripe is horizontal (the size along the x-axis is greater than
+            along the y-axis).
+        :param last_placed_index: The index of the last placed detail.
+        :param endpoints_placed: The number of endpoints placed.
+        :param stripe_from: The detail from which the current stripe was formed.
+        :param detail: The last placed detail. A tuple represents the width and height of the detail.
+            The width here means the side on which the detail will be placed.
+        :param placed_details: The placed details.
+        :param indices: The indices of the placed details.
+        :param detail_widths: The widths of the placed details.
+        :param detail_heights: The heights of the placed details.
+        :param normal_box_widths: The widths of the normal boxes created after placing the details.
+        :param normal_box_heights: The heights of the normal boxes created after placing the details.
+        :param endpoint_widths: The widths of the endpoints created after placing the details.
+        :param endpoint_heights: The heights of the endpoints created after placing the details.
+        """
+        super().__init__(gamma, n0, max_placed, lrp, stripe, stripe_first_detail_index, is_stripe_horizontal,
+                         last_placed_index, endpoints_placed, stripe_from, detail, placed_details)
+        self.indices = indices
+        self.detail_widths = detail_widths
+        self.detail_heights = detail_heights
+        self.normal_box_widths = normal_box_widths
+        self.normal_box_heights = normal_box_heights
+        self.endpoint_widths = endpoint_widths
+        self.endpoint_heights = endpoint_heights
+
+    def get_event_type(self) -> str:
+        """
+        Returns the type of the event as a string.
+
+        :return: The type of the event.
+        """
+        return self.EVENT_TYPE
+
+
+class GammaAlgorithmStateView:
+    """
+    Mixin that turns a gamma algorithm event into a view over the current state of the algorithm.
+
+    Instead of copying the state of the algorithm when the event is created, the attributes describing it are read
+    from the algorithm when they are accessed, and the attributes describing the placement being handled are
+    assigned right before the event is delivered. The algorithm creates one view of each event type and reuses it
+    for every delivery, so listeners must not keep the event after `handle` returns.
+
+    Attributes:
+        algorithm (GammaAlgorithm): The algorithm whose state is viewed.
+        detail (tuple[float, float]): The current detail to be placed. A tuple represents the width and height
+            of the detail. The width here means the side on which the detail will be placed.
+        placed_details (PlacedDetails): The placed details.
+
+    Properties:
+        free_area (float): The area of the sheet not covered by placed details, maintained by the algorithm
+            incrementally.
+    """
+
+    def __init__(self, algorithm):
+        """
+        Initialize a view over the state of the algorithm.
+
+        :param algorithm: The algorithm whose state is viewed.
+        """
+        self.algorithm = algorithm
+        self.detail = None
+        self.placed_details = None
+
+    @property
+    def gamma(self) -> float:
+        """
+        Get the gamma parameter.
+
+        :return: The gamma parameter.
+        """
+        return self.algorithm.gamma
+
+    @property
+    def n0(self) -> int:
+        """
+        Get the index of the first detail to be placed.
+
+        :return: The index of the first detail to be placed.
+        """
+        return self.algorithm.n0
+
+    @property
+    def max_placed(self) -> int:
+        """
+        Get the maximum number of details to place.
+
+        :return: The maximum number of details to place.
+        """
+        return self.algorithm.max_placed
+
+    @property
+    def lrp(self) -> Detail:
+        """
+        Get the Large Rectangular Piece (LRP).
+
+        :return: The LRP.
+        """
+        return self.algorithm.lrp
+
+    @property
+    def stripe(self) -> Detail:
+        """
+        Get the current stripe.
+
+        :return: The current stripe, or None if there is no current stripe.
+        """
+        return self.algorithm.stripe
+
+    @property
+    def stripe_first_detail_index(self) -> int:
+        """
+        Get the index of the first detail in the current stripe.
+
+        :return: The index of the first detail in the current stripe.
+        """
+        return self.algorithm.stripe_first_detail_index
+
+    @property
+    def is_stripe_horizontal(self) -> bool:
+        """
+        Get whether the stripe is horizontal.
+
+        :return: True if the size of the stripe along the x-axis is greater than along the y-axis, False otherwise.
+        """
+        return self.algorithm.is_stripe_horizontal
+
+    @property
+    def last_placed_index(self) -> int:
+        """
+        Get the index of the last placed detail.
+
+        :return: The index of the last placed detail.
+        """
+        return self.algorithm.last_placed_index
+
+    @property
+    def endpoints_placed(self) -> int:
+        """
+        Get the number of endpoints placed.
+
+        :return: The number of endpoints placed.
+        """
+        return self.algorithm.endpoints_placed
+
+    @property
+    def stripe_from(self) -> str:
+        """
+        Get the type of the detail from which the current stripe was formed.
+
+        :return: The type of the detail from which the current stripe was formed.
+        """
+        return self.algorithm.stripe_from
+
+    @property
+    def free_area(self) -> float:
+        """
+        Get the area of the sheet not covered by placed details.
+
+        :return: The free area.
+        """
+        return self.algorithm.free_area
+
+
+class GammaAlgorithmAfterDetailPlacedEventView(GammaAlgorithmStateView, GammaAlgorithmAfterDetailPlacedEvent):
+    """
+    A view of the event that occurs after placing a new detail, reused for every placed detail.
+
+    Attributes:
+        placed_detail (Detail): The new placed detail.
+        normal_box (Detail): The normal box created after placing the detail.
+        endpoint (Detail): The endpoint created after placing the detail.
+    """
+
+    def __init__(self, algorithm):
+        """
+        Initialize a GammaAlgorithmAfterDetailPlacedEventView object.
+
+        :param algorithm: The algorithm whose state is viewed.
+        """
+        super().__init__(algorithm)
+        self.placed_detail = None
+        self.normal_box = None
+        self.endpoint = None
+
+
+class GammaAlgorithmBeforeLRPCutEventView(GammaAlgorithmStateView, GammaAlgorithmBeforeLRPCutEvent):
+    """
+    A view of the event that occurs before cutting a stripe from the LRP, reused for every cut.
+    """
+    pass
+
+
+class GammaAlgorithmAfterLRPCutEventView(GammaAlgorithmStateView, GammaAlgorithmAfterLRPCutEvent):
+    """
+    A view of the event that occurs after cutting a stripe from the LRP, reused for every cut.
+    """
+    pass
+
+
+class GammaAlgorithmEndEventView(GammaAlgorithmStateView, GammaAlgorithmEndEvent):
+    """
+    A view of the event that occurs at the end of the gamma algorithm.
+    """
+    pass
+
+
+class GammaAlgorithmDetailsPlacedBatchEventView(GammaAlgorithmStateView, GammaAlgorithmDetailsPlacedBatchEvent):
+    """
+    A view of the event that occurs after a batch of details has been placed, reused for every batch.
+
+    Attributes:
+        indices (np.ndarray): The indices of the placed details.
+        detail_widths (np.ndarray): The widths of the placed details.
+        detail_heights (np.ndarray): The heights of the placed details.
+        normal_box_widths (np.ndarray): The widths of the normal boxes created after placing the details.
+        normal_box_heights (np.ndarray): The heights of the normal boxes created after placing the details.
+        endpoint_widths (np.ndarray): The widths of the endpoints created after placing the details.
+        endpoint_heights (np.ndarray): The heights of the endpoints created after placing the details.
+    """
+
+    def __init__(self, algorithm):
+        """
+        Initialize a GammaAlgorithmDetailsPlacedBatchEventView object.
+
+        :param algorithm: The algorithm whose state is viewed.
+        """
+        super().__init__(algorithm)
+        self.indices = None
+        self.detail_widths = None
+        self.detail_heights = None
+        self.normal_box_widths = None
+        self.normal_box_heights = None
+        self.endpoint_widths = None
+        self.endpoint_heights = None
@@ -0,0 +1,113 @@
+class LogHistogram:
+    """
+    A histogram of non-negative integer values (for example durations in nanoseconds or row counts) with
+    logarithmic buckets.
+
+    Every power of two is split into four buckets, so recording a value takes constant time and memory does not
+    grow with the number of values, while percentiles are estimated with a relative error of at most 25%.
+
+    Attributes:
+        counts (list[int]): The number of values in each bucket.
+        count (int): The number of recorded values.
+        total (int): The sum of recorded values.
+        min_value (int): The smallest recorded value, or None if no values were recorded.
+        max_value (int): The largest recorded value, or None if no values were recorded.
+    """
+
+    SUB_BUCKETS = 4
+
+    def __init__(self):
+        """
+        Initializes an empty LogHistogram.
+        """
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min_value = None
+        self.max_value = None
+
+    def record(self, value: int) -> None:
+        """
+        Record a value in the histogram. Negative values are recorded as zero.
+
+        :param value: The value to be recorded.
+        """
+        value = max(0, int(value))
+        index = self._bucket_index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+    def get_mean(self) -> float:
+        """
+        Get the mean of the recorded values.
+
+        :return: The mean of the recorded values, or 0 if no values were recorded.
+        """
+        return self.total / self.count if self.count > 0 else 0
+
+    def get_percentile(self, percentile: float) -> int:
+        """
+        Estimate a percentile of the recorded values as the upper bound of the bucket containing it.
+
+        :param percentile: The percentile in the range from 0 to 100.
+        :return: The estimated percentile, or 0 if no values were recorded.
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, int(percentile / 100 * self.count + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._bucket_lower_bound(index + 1) - 1, self.max_value)
+        return self.max_value
+
+    def get_summary(self) -> dict[str, float]:
+        """
+        Get a summary of the recorded values.
+
+        :return: A dictionary with the count, total, mean, minimum, maximum and the 50th, 90th and 99th percentiles.
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.get_mean(),
+            'min': self.min_value if self.min_value is not None else 0,
+            'max': self.max_value if self.max_value is not None else 0,
+            'p50': self.get_percentile(50),
+            'p90': self.get_percentile(90),
+            'p99': self.get_percentile(99)
+        }
+
+    @classmethod
+    def _bucket_index(cls, value: int) -> int:
+        """
+        Find the bucket containing a value.
+
+        :param value: A non-negative value.
+        :return: The index of the bucket.
+        """
+        if value < cls.SUB_BUCKETS:
+            return value
+        exponent = value.bit_length() - 1
+        return cls.SUB_BUCKETS * (exponent - 1) + ((value >> (exponent - 2)) & (cls.SUB_BUCKETS - 1))
+
+    @classmethod
+    def _bucket_lower_bound(cls, index: int) -> int:
+        """
+        Find the smallest value contained in a bucket.
+
+        :param index: The index of the bucket.
+        :return: The smallest value of the bucket.
+        """
+        if index < cls.SUB_BUCKETS:
+            return index
+        exponent = index // cls.SUB_BUCKETS + 1
+        return (cls.SUB_BUCKETS + index % cls.SUB_BUCKETS) << (exponent - 2)
@@ -1,19 +1,53 @@
 import math
 import time
 
-from algorithm.gamma_algorithm import GammaAlgorithm
-from statistic.event.gamma_algorithm_events import GammaAlgorithmAfterDetailPlacedEvent, \
-    GammaAlgorithmBeforeLRPCutEvent, GammaAlgorithmEndEvent
-from statistic.listener.gamma_algorithm_listeners import AfterDetailPlacedListener, BeforeLRPCutListener, \
-    AlgorithmEndListener
+import numpy as np
+
+from statistic.event.gamma_algorithm_events import GammaAlgorithmBeforeLRPCutEvent, GammaAlgorithmEndEvent, \
+    GammaAlgorithmDetailsPlacedBatchEvent
+from statistic.listener.gamma_algorithm_listeners import BeforeLRPCutListener, AlgorithmEndListener, \
+    DetailsPlacedBatchListener
 from statistic.output import OutputHandler
 
+# The relative tolerance within which a ratio computed with NumPy may be below the maximum so far while its exact
+# value exceeds it.
+RATIO_TOLERANCE = 1e-9
+
+
+def get_normal_box_ratio_candidates(event: GammaAlgorithmDetailsPlacedBatchEvent,
+                                    current_max: float) -> tuple[list[int], list[float]]:
+    """
+    Find the normal boxes of a batch whose ratio of min_size / max_size^gamma may exceed the maximum of the ratios
+    of the previous normal boxes, and compute their ratios as for a single normal box.
+
+    The ratios of the whole batch are computed with NumPy, whose power may differ from `pow` in the last bit.
+    A normal box is a candidate if its ratio is not below the maximum so far by more than the relative tolerance,
+    so the normal boxes that are not candidates cannot exceed the maximum, and the ratios of the candidates are
+    computed again with `pow`, which gives the same values as handling the normal boxes one by one.
 
-class PrintEachN(AfterDetailPlacedListener):
+    :param event: The event that occurs after a batch of details is placed.
+    :param current_max: The maximum ratio before the batch.
+    :return: The positions of the candidates in the batch and their ratios.
+    """
+    widths = event.normal_box_widths
+    heights = event.normal_box_heights
+    ratios = np.minimum(widths, heights) / np.power(np.maximum(widths, heights), event.gamma)
+    previous_maxima = np.maximum.accumulate(np.concatenate(([current_max], ratios[:-1])))
+    positions = np.flatnonzero(ratios >= previous_maxima - np.abs(previous_maxima) * RATIO_TOLERANCE).tolist()
+    values = []
+    for position in positions:
+        width = float(widths[position])
+        height = float(heights[position])
+        min_size = width if width <= height else height
+        values.append(min_size / pow(max(height, width), event.gamma))
+    return positions, values
+
+
+class PrintEachN(DetailsPlacedBatchListener):
     """
     A listener that prints a message when a detail with an index multiple of n is placed.
-    This class handles events that occur after a detail is placed during the gamma algorithm,
-    and outputs a message when the index of the last placed detail is a multiple of n.
+    This class handles batches of placed details during the gamma algorithm,
+    and outputs a message for each placed detail whose index is a multiple of n.
 
     Attributes:
         n (int): The interval for indices at which to print messages.
@@ -30,16 +64,15 @@ class PrintEachN(AfterDetailPlacedListener):
         self.n = n
         self.output_handler = output_handler
 
-    def handle(self, event: GammaAlgorithmAfterDetailPlacedEvent) -> None:
+    def handle(self, event: GammaAlgorithmDetailsPlacedBatchEvent) -> None:
         """
-        Handle the event that occurs after a detail is placed.
-        If the index of the last placed detail is a multiple of n, print a message
-        indicating the detail has been placed.
+        Handle the event that occurs after a batch of details is placed.
+        For each placed detail with an index multiple of n, print a message indicating the detail has been placed.
 
-        :param event: The event that occurs after a detail is placed.
+        :param event: The event that occurs after a batch of details is placed.
         """
-        if event.last_placed_index % self.n == 0:
-            message = f'Placed detail with index {event.last_placed_index}'
+        for index in event.indices[event.indices % self.n == 0].tolist():
+            message = f'Placed detail with index {index}'
             self.output_handler.write(message)
 
 
@@ -70,11 +103,13 @@ class PrintInfoAtEnd(AlgorithmEndListener):
         self.output_handler.write(message)
 
 
-class ExecutionTimeTracker(AfterDetailPlacedListener):
+class ExecutionTimeTracker(DetailsPlacedBatchListener):
     """
     A listener that tracks and outputs the execution time of the gamma algorithm.
-    This class handles events that occur after a detail is placed during the gamma algorithm,
+    This class handles batches of placed details during the gamma algorithm,
     measuring both the total execution time and the execution time for each block of n details.
+    It requires batches to end after every detail whose index is a multiple of n, so each block ends exactly
+    with a batch and its time is read when that batch is delivered.
 
     Attributes:
         n (int): The number of details in each block for which to measure the execution time.
@@ -97,37 +132,45 @@ class ExecutionTimeTracker(AfterDetailPlacedListener):
         self.current_block_start_time = None
         self.output_handler = output_handler
 
-    def handle(self, event: GammaAlgorithmAfterDetailPlacedEvent) -> None:
+    def handle(self, event: GammaAlgorithmDetailsPlacedBatchEvent) -> None:
         """
-        Handle the event that occurs after a detail is placed.
+        Handle the event that occurs after a batch of details is placed.
         Measures and outputs the execution time for each block of n details and the total execution time.
 
-        :param event: The event that occurs after a detail is placed.
+        :param event: The event that occurs after a batch of details is placed.
         """
+        end_time = time.time()
         if not self.start_time:
-            self.start_time = time.time()
-        if not self.current_block_start_time:
-            self.current_block_start_time = time.time()
-        if event.last_placed_index % self.n == 0:
-            end_time = time.time()
+            self.start_time = end_time
+            self.current_block_start_time = end_time
+        for _ in range(np.count_nonzero(event.indices % self.n == 0)):
             execution_time = end_time - self.current_block_start_time
             message = f'Execution time of block {self.current_block_num} of {self.n} details: {execution_time} seconds'
             self.output_handler.write(message)
             self.current_block_num += 1
-            self.current_block_start_time = None
+            self.current_block_start_time = end_time
         if event.last_placed_index == event.n0 + event.max_placed - 1:
-            end_time = time.time()
             execution_time = end_time - self.start_time
             message = f'Full execution time: {execution_time} seconds'
             self.output_handler.write(message)
 
+    def get_batch_period(self) -> int:
+        """
+        Get the period of the indices of the placed details after which a batch must end.
 
-class NormalBoxMaxRatioTracker(AfterDetailPlacedListener):
+        :return: The number of details in each block.
+        """
+        return self.n
+
+
+class NormalBoxMaxRatioTracker(DetailsPlacedBatchListener):
     """
     A listener that tracks and outputs information about the maximum ratio of min_size / max_size^gamma
     for normal boxes resulting from the gamma algorithm.
-    This class handles events that occur after a detail is placed and calculates the ratio for each resulting
-    normal box. It tracks sequences of maximum values and outputs information about these sequences.
+    This class handles batches of placed details and calculates the ratio for each resulting normal box.
+    It tracks sequences of maximum values and outputs information about these sequences.
+    Only the normal boxes that may exceed the maximum are handled one by one, with the same results as handling
+    every normal box (see `get_normal_box_ratio_candidates`).
 
     Attributes:
         current_max (float): The current maximum ratio.
@@ -151,32 +194,46 @@ class NormalBoxMaxRatioTracker(AfterDetailPlacedListener):
         self.current_finish_value = None
         self.output_handler = output_handler
 
-    def handle(self, event: GammaAlgorithmAfterDetailPlacedEvent) -> None:
+    def handle(self, event: GammaAlgorithmDetailsPlacedBatchEvent) -> None:
         """
-        Handle the event that occurs after a detail is placed.
-        Calculate the ratio for the normal box created by placing the detail.
+        Handle the event that occurs after a batch of details is placed.
+        Calculate the ratios for the normal boxes created by placing the details.
         Track sequences of maximum values and output information about these sequences.
+        A sequence ends at the first normal box whose ratio does not exceed the maximum.
 
-        :param event: The event that occurs after a detail is placed.
-        """
-        min_size = min(event.normal_box.height, event.normal_box.width)
-        max_size = max(event.normal_box.height, event.normal_box.width)
-        value = min_size / pow(max_size, event.gamma)
-        if value > self.current_max:
-            self.current_max = value
-            self.current_finish_index = event.last_placed_index
-            self.current_finish_value = value
-            if self.current_start_index is None:
-                self.current_start_index = event.last_placed_index
-                self.current_start_value = value
-        elif self.current_start_index is not None:
+        :param event: The event that occurs after a batch of details is placed.
+        """
+        positions, values = get_normal_box_ratio_candidates(event, self.current_max)
+        next_position = 0
+        for position, value in zip(positions, values):
+            if position > next_position:
+                self._finish_sequence()
+            if value > self.current_max:
+                index = int(event.indices[position])
+                self.current_max = value
+                self.current_finish_index = index
+                self.current_finish_value = value
+                if self.current_start_index is None:
+                    self.current_start_index = index
+                    self.current_start_value = value
+            else:
+                self._finish_sequence()
+            next_position = position + 1
+        if next_position < len(event.indices):
+            self._finish_sequence()
+
+    def _finish_sequence(self) -> None:
+        """
+        Output information about the current maximum sequence, if there is one, and end it.
+        """
+        if self.current_start_index is not None:
             message = f'{self.current_start_index} - {self.current_finish_index}:' \
                       f' {self.current_start_value} - {self.current_finish_value}'
             self.output_handler.write(message)
             self.current_start_index = None
 
 
-class NormalBoxFinalMaxRatioTracker(AfterDetailPlacedListener):
+class NormalBoxFinalMaxRatioTracker(DetailsPlacedBatchListener):
     """
     A listener that tracks and outputs information about the maximum ratio of min_size / max_size^gamma
     for normal boxes resulting from the gamma algorithm.
@@ -196,19 +253,17 @@ class NormalBoxFinalMaxRatioTracker(AfterDetailPlacedListener):
         self.current_max = -math.inf
         self.output_handler = output_handler
 
-    def handle(self, event: GammaAlgorithmAfterDetailPlacedEvent) -> None:
+    def handle(self, event: GammaAlgorithmDetailsPlacedBatchEvent) -> None:
         """
-        Handle the event that occurs after a detail is placed.
-        Calculate the ratio for the normal box created by placing the detail. At the end of the algorithm,
+        Handle the event that occurs after a batch of details is placed.
+        Calculate the ratios for the normal boxes created by placing the details. At the end of the algorithm,
         output the maximum ratio.
 
-        :param event: The event that occurs after a detail is placed.
+        :param event: The event that occurs after a batch of details is placed.
         """
-        min_size = min(event.normal_box.height, event.normal_box.width)
-        max_size = max(event.normal_box.height, event.normal_box.width)
-        value = min_size / pow(max_size, event.gamma)
-        if value > self.current_max:
-            self.current_max = value
+        _, values = get_normal_box_ratio_candidates(event, self.current_max)
+        if values and max(values) > self.current_max:
+            self.current_max = max(values)
         if event.last_placed_index == event.n0 + event.max_placed - 1:
             message = f'n0 = {event.n0}, gamma = {event.gamma}, max_ratio = {self.current_max}'
             self.output_handler.write(message)
@@ -219,9 +274,11 @@ class LrpOccupancyRatioTracker(BeforeLRPCutListener):
     A listener that calculates and outputs the proportion of the total free space on a sheet
     occupied by the Large Rectangular Piece (LRP) before a new stripe is cut from it.
 
-    This class works correctly only if the update_placed_details flag in the gamma algorithm is set to True.
+    It works with any detail generator, and regardless of the update_placed_details flag in the gamma algorithm.
 
     Attributes:
+        min_ratio (float): The smallest ratio output so far, or None if no stripe has been cut yet.
+        last_ratio (float): The last ratio output, or None if no stripe has been cut yet.
         output_handler (OutputHandler): The handler used to output messages.
     """
 
@@ -231,22 +288,25 @@ class LrpOccupancyRatioTracker(BeforeLRPCutListener):
 
         :param output_handler: The handler used to output messages.
         """
+        self.min_ratio = None
+        self.last_ratio = None
         self.output_handler = output_handler
 
     def handle(self, event: GammaAlgorithmBeforeLRPCutEvent) -> None:
         """
         Handle the event that occurs before a new stripe is cut from the LRP.
         Calculate the proportion of the total free space occupied by the LRP and output this information.
-
-        Note:
-            This method works correctly only if the update_placed_details flag in the gamma algorithm is set to True.
+        The total free space is maintained by the gamma algorithm incrementally, so handling the event takes
+        constant time.
 
         :param event: The event that occurs before a new stripe is cut from the LRP.
         """
-        lrp_area = event.lrp.width * event.lrp.height
-        free_area = sum(detail.width * detail.height for detail in event.placed_details if
-                        detail.detail_type != GammaAlgorithm.DETAIL_NAME)
+        lrp_area = event.lrp.area
+        free_area = event.free_area
         lcp_ratio = lrp_area / free_area
+        if self.min_ratio is None or lcp_ratio < self.min_ratio:
+            self.min_ratio = lcp_ratio
+        self.last_ratio = lcp_ratio
         self.output_handler.write(f'Placed: {event.last_placed_index}, lrp: {lcp_ratio}')
 
 
@@ -259,6 +319,8 @@ class LrpOccupancyRatioHarmonicRectangleTracker(BeforeLRPCutListener):
     even if the update_placed_details flag in the gamma algorithm is set to False.
 
     Attributes:
+        min_ratio (float): The smallest ratio output so far, or None if no stripe has been cut yet.
+        last_ratio (float): The last ratio output, or None if no stripe has been cut yet.
         output_handler (OutputHandler): The handler used to output messages.
     """
 
@@ -268,6 +330,8 @@ class LrpOccupancyRatioHarmonicRectangleTracker(BeforeLRPCutListener):
 
         :param output_handler: The handler used to output messages.
         """
+        self.min_ratio = None
+        self.last_ratio = None
         self.output_handler = output_handler
 
     def handle(self, event: GammaAlgorithmBeforeLRPCutEvent) -> None:
@@ -281,7 +345,10 @@ class LrpOccupancyRatioHarmonicRectangleTracker(BeforeLRPCutListener):
 
         :param event: The event that occurs before a new stripe is cut from the LRP.
         """
-        lrp_area = event.lrp.width * event.lrp.height
+        lrp_area = event.lrp.area
         free_area = 1 / (event.last_placed_index + 1)
         lcp_ratio = lrp_area / free_area
+        if self.min_ratio is None or lcp_ratio < self.min_ratio:
+            self.min_ratio = lcp_ratio
+        self.last_ratio = lcp_ratio
         self.output_handler.write(f'Placed: {event.last_placed_index}, lrp: {lcp_ratio}')
@@ -1,6 +1,7 @@
 from abc import abstractmethod
 from statistic.event.gamma_algorithm_events import GammaAlgorithmAfterDetailPlacedEvent, \
-    GammaAlgorithmBeforeLRPCutEvent, GammaAlgorithmAfterLRPCutEvent, GammaAlgorithmEndEvent
+    GammaAlgorithmBeforeLRPCutEvent, GammaAlgorithmAfterLRPCutEvent, GammaAlgorithmEndEvent, \
+    GammaAlgorithmDetailsPlacedBatchEvent
 from statistic.listener.abstract_listener import StatisticListener
 
 
@@ -29,6 +30,43 @@ class AfterDetailPlacedListener(StatisticListener):
         return GammaAlgorithmAfterDetailPlacedEvent.EVENT_TYPE
 
 
+class DetailsPlacedBatchListener(StatisticListener):
+    """
+    An abstract listener class for handling batches of placed details during the gamma algorithm.
+    It is the batch alternative to AfterDetailPlacedListener: instead of one call per placed detail, the listener
+    receives the placed details in batches as columnar arrays, so it can process them with vectorized operations.
+    This class should be subclassed by classes that aggregate statistics over the placed details.
+    """
+
+    @abstractmethod
+    def handle(self, event: GammaAlgorithmDetailsPlacedBatchEvent) -> None:
+        """
+        Handle the event that occurs after a batch of details is placed.
+
+        :param event: The event that occurs after a batch of details is placed.
+        """
+        pass
+
+    def get_batch_period(self) -> int | None:
+        """
+        Get the period of the indices of the placed details after which a batch must end. If a period is given,
+        the algorithm delivers a batch after the first placed detail and after every placed detail whose index
+        is a multiple of the period, so the listener can act exactly at these details (for example read the time).
+        By default, no period is required.
+
+        :return: The period, or None if batches may end after any detail.
+        """
+        return None
+
+    def get_event_type(self) -> str:
+        """
+        Get the type of event associated with this listener.
+
+        :return: The type of event associated with this listener.
+        """
+        return GammaAlgorithmDetailsPlacedBatchEvent.EVENT_TYPE
+
+
 class BeforeLRPCutListener(StatisticListener):
     """
     An abstract listener class for handling events before cutting a stripe from the LRP during the gamma algorithm.
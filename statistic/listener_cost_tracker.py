@@ -0,0 +1,126 @@
+import warnings
+from time import perf_counter_ns
+
+from statistic.event.abstract_event import Event
+from statistic.listener.abstract_listener import StatisticListener
+
+
+class ListenerCostTracker:
+    """
+    A class measuring the time spent in each statistic listener while events are delivered to it.
+
+    Every call of `handle` is timed with `perf_counter_ns`, and the number of calls and the total time are kept
+    for each listener. The run time is marked by whoever drives the algorithm (DetailPlacer does) with `start_run`
+    and `end_run`, so the report shows which fraction of the run each listener takes. The run time is accumulated
+    over all the calls of `start_run` and `end_run`, and it is kept when the tracker is pickled with a checkpoint,
+    so a resumed run goes on counting from the saved time. If the run has never been started, the fractions are 0.
+
+    If a budget is set, a RuntimeWarning is issued once for each listener whose time exceeds the given fraction
+    of the run time. The budget is checked only while the run is going and after it has taken `min_run_time`
+    seconds, so that the first calls, which are often slower, do not cause warnings.
+
+    Attributes:
+        budget (float): The largest fraction of the run time a listener may take without a warning, or None.
+        min_run_time (float): The run time in seconds after which the budget is checked.
+        costs (dict[StatisticListener, list[int]]): The number of calls and the total time in nanoseconds
+            of each listener, in the order the listeners were first called.
+        warned (set[StatisticListener]): The listeners that have exceeded the budget.
+        run_time (int): The run time in nanoseconds accumulated before the current start of the run.
+        run_start_time (int): The time of the current start of the run in nanoseconds, or None if the run is not
+            going.
+    """
+
+    def __init__(self, budget: float = None, min_run_time: float = 1.0):
+        """
+        Initialize a ListenerCostTracker object.
+
+        :param budget: The largest fraction of the run time a listener may take without a warning (optional).
+        :param min_run_time: The run time in seconds after which the budget is checked (default is 1 second).
+        """
+        self.budget = budget
+        self.min_run_time = min_run_time
+        self.costs = {}
+        self.warned = set()
+        self.run_time = 0
+        self.run_start_time = None
+
+    def start_run(self) -> None:
+        """
+        Mark the start of the run, or of its continuation after a resume.
+        """
+        if self.run_start_time is None:
+            self.run_start_time = perf_counter_ns()
+
+    def end_run(self) -> None:
+        """
+        Mark the end of the run, or of the part of it before a stop.
+        """
+        if self.run_start_time is not None:
+            self.run_time += perf_counter_ns() - self.run_start_time
+            self.run_start_time = None
+
+    def get_run_time(self) -> int:
+        """
+        Get the run time, including the current part of the run if it is going.
+
+        :return: The run time in nanoseconds.
+        """
+        if self.run_start_time is None:
+            return self.run_time
+        return self.run_time + perf_counter_ns() - self.run_start_time
+
+    def measure(self, listener: StatisticListener, event: Event) -> None:
+        """
+        Deliver an event to a listener and measure the time of the call.
+
+        :param listener: The statistic listener.
+        :param event: The event to be delivered.
+        """
+        start = perf_counter_ns()
+        try:
+            listener.handle(event)
+        finally:
+            end = perf_counter_ns()
+            cost = self.costs.get(listener)
+            if cost is None:
+                cost = [0, 0]
+                self.costs[listener] = cost
+            cost[0] += 1
+            cost[1] += end - start
+        if self.budget is not None and listener not in self.warned and self.run_start_time is not None:
+            run_time = self.run_time + end - self.run_start_time
+            if run_time >= self.min_run_time * 1e9 and cost[1] > self.budget * run_time:
+                self.warned.add(listener)
+                warnings.warn(f'Listener {type(listener).__name__} takes {cost[1] / run_time:.1%} of the run time, '
+                              f'over the budget of {self.budget:.1%}', RuntimeWarning, stacklevel=2)
+
+    def get_report(self) -> list[dict]:
+        """
+        Get the cost of each listener, from the most expensive one.
+
+        :return: A list with a dictionary for each listener, containing the name of its class under 'listener',
+            the number of calls under 'calls', the total and mean time in nanoseconds under 'time' and 'mean',
+            and the fraction of the run time under 'fraction'.
+        """
+        run_time = self.get_run_time()
+        report = [{
+            'listener': type(listener).__name__,
+            'calls': calls,
+            'time': time,
+            'mean': time / calls,
+            'fraction': time / run_time if run_time > 0 else 0
+        } for listener, (calls, time) in self.costs.items()]
+        report.sort(key=lambda cost: cost['time'], reverse=True)
+        return report
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the tracker for pickling. The current part of the run is added to the run time, since
+        a time of `perf_counter_ns` means nothing in another process.
+
+        :return: The state of the tracker.
+        """
+        state = self.__dict__.copy()
+        state['run_time'] = self.get_run_time()
+        state['run_start_time'] = None
+        return state
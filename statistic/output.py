@@ -74,4 +74,19 @@ class FileOutputHandler(OutputHandler):
                 with open(self.file_path, 'a') as f:
                     f.write(f'{message}\n')
         else:
-            raise ValueError(f"Invalid mode: {self.mode}")
\ No newline at end of file
+            raise ValueError(f"Invalid mode: {self.mode}")
+
+
+class NullOutputHandler(OutputHandler):
+    """
+    A class to handle output operations by discarding all messages.
+    It is useful when only the attributes of a listener are needed, for example in parameter sweeps.
+    """
+
+    def write(self, message: str):
+        """
+        Discards the given message.
+
+        :param message: The message to be discarded.
+        """
+        pass
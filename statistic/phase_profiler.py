@@ -0,0 +1,129 @@
+from time import perf_counter_ns
+from typing import Any, Callable
+
+from statistic.histogram import LogHistogram
+from statistic.output import OutputHandler
+
+
+class PhaseProfiler:
+    """
+    A class measuring how the time of an algorithm is split between its phases.
+
+    Phases are measured with `measure`, which calls a function and records its latency, measured with
+    `perf_counter_ns`, in the histogram of the phase. Phases may be nested, for example storage calls inside
+    the choice of a stripe. The latency recorded in a histogram includes nested phases, while the time of a phase
+    in the block breakdown is its own time, without nested phases, so the times of all phases add up to the time
+    spent in the measured code.
+
+    The details are counted in blocks. When a block of `block_size` details is complete, the breakdown of its
+    wall-clock time by phases is output, with the time spent outside all phases (for example in the detail
+    generator) as `other`.
+
+    Attributes:
+        block_size (int): The number of details in each block of the breakdown.
+        output_handler (OutputHandler): The handler used to output the breakdown of each block, or None.
+        histograms (dict[str, LogHistogram]): The latencies of the calls of each phase in nanoseconds.
+        total_times (dict[str, int]): The own time of each phase over the whole run in nanoseconds.
+        block_times (dict[str, int]): The own time of each phase in the current block in nanoseconds.
+        stack (list[list[int]]): The start time and the time of nested phases of each phase being measured.
+        block_num (int): The number of the current block.
+        block_details (int): The number of details counted in the current block.
+        block_start_time (int): The time when the current block started, or None if it has not started.
+    """
+
+    OTHER = 'other'
+
+    def __init__(self, block_size: int, output_handler: OutputHandler = None):
+        """
+        Initialize a PhaseProfiler object.
+
+        :param block_size: The number of details in each block of the breakdown.
+        :param output_handler: The handler used to output the breakdown of each block (optional).
+        """
+        self.block_size = block_size
+        self.output_handler = output_handler
+        self.histograms = {}
+        self.total_times = {}
+        self.block_times = {}
+        self.stack = []
+        self.block_num = 1
+        self.block_details = 0
+        self.block_start_time = None
+
+    def measure(self, phase: str, function: Callable, *args) -> Any:
+        """
+        Call a function and measure its time as a phase.
+
+        :param phase: The name of the phase.
+        :param function: The function to be called.
+        :param args: The arguments of the function.
+        :return: The result of the function.
+        """
+        if self.block_start_time is None:
+            self.block_start_time = perf_counter_ns()
+        frame = [perf_counter_ns(), 0]
+        self.stack.append(frame)
+        try:
+            return function(*args)
+        finally:
+            duration = perf_counter_ns() - frame[0]
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1][1] += duration
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = LogHistogram()
+                self.histograms[phase] = histogram
+            histogram.record(duration)
+            own_time = duration - frame[1]
+            self.block_times[phase] = self.block_times.get(phase, 0) + own_time
+            self.total_times[phase] = self.total_times.get(phase, 0) + own_time
+
+    def count_details(self, count: int) -> None:
+        """
+        Count placed details. When the current block is complete, its breakdown is output and a new block starts.
+
+        :param count: The number of placed details.
+        """
+        self.block_details += count
+        if self.block_details >= self.block_size:
+            self._complete_block()
+
+    def get_block_breakdown(self) -> dict[str, int]:
+        """
+        Get the own time of each phase in the current block, and the time spent outside all phases.
+
+        :return: A dictionary with the times in nanoseconds by the names of the phases, with the time spent outside
+            all phases under 'other'.
+        """
+        breakdown = dict(self.block_times)
+        if self.block_start_time is not None:
+            breakdown[self.OTHER] = max(0, perf_counter_ns() - self.block_start_time - sum(self.block_times.values()))
+        return breakdown
+
+    def get_report(self) -> dict[str, dict]:
+        """
+        Get the own time of each phase over the whole run and the summary of its latency histogram.
+
+        :return: A dictionary with a dictionary for each phase, containing the own time in nanoseconds under
+            'time' and the histogram summary of `LogHistogram.get_summary`.
+        """
+        return {phase: {'time': self.total_times[phase], **histogram.get_summary()}
+                for phase, histogram in self.histograms.items()}
+
+    def _complete_block(self) -> None:
+        """
+        Output the breakdown of the current block, if there is an output handler, and start a new block.
+        """
+        if self.output_handler is not None:
+            breakdown = self.get_block_breakdown()
+            block_time = max(1, sum(breakdown.values()))
+            parts = ', '.join(f'{phase}: {time / 1e6:.3f} ms ({time / block_time:.1%})'
+                              for phase, time in sorted(breakdown.items(), key=lambda item: -item[1]))
+            message = (f'Block {self.block_num} of {self.block_details} details: {block_time / 1e6:.3f} ms; '
+                       f'{parts}')
+            self.output_handler.write(message)
+        self.block_num += 1
+        self.block_details = 0
+        self.block_times = {}
+        self.block_start_time = perf_counter_ns()
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterable
 
 from detail.detail import Detail
 
@@ -34,3 +35,62 @@ class BoxStorage(ABC):
         :return: The largest box.
         """
         pass
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the storage.
+        Storages may override this method to add the boxes more efficiently than one by one.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        for detail in details:
+            self.add_box(detail)
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+        Storages may override this method to remove the boxes more efficiently than one by one.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        boxes = []
+        max_box = self.get_max_box()
+        while max_box is not None and max_box.min_size >= min_size_threshold:
+            boxes.append(self.pop_max_box())
+            max_box = self.get_max_box()
+        return boxes
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current sizes of the internal structures of the storage, such as the number of stored boxes or
+        the sizes of caches. Storages that cannot report their sizes cheaply return an empty dictionary.
+
+        :return: A dictionary of sizes by their names.
+        """
+        return {}
+
+    def keeps_details(self) -> bool:
+        """
+        Check whether the storage returns the added Detail objects as they are. Storages that encode coordinates,
+        for example as doubles, return False; they cannot be used in the exact mode of the gamma algorithm, since
+        FixedPoint coordinates would come back as plain numbers.
+
+        :return: True if the added Detail objects are returned unchanged, False otherwise (the default).
+        """
+        return False
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Bring the storage to a state that can be saved in a checkpoint. Called right before the storage is pickled.
+        Storages that keep boxes outside of the process (for example in a database or on disk) make the external
+        state match the pickled state here. Does nothing by default.
+        """
+        pass
+
+    def complete_checkpoint(self) -> None:
+        """
+        Release resources that are no longer needed once a checkpoint has been saved, such as files that only
+        the previous checkpoint referred to. Does nothing by default.
+        """
+        pass
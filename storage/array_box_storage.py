@@ -0,0 +1,260 @@
+from array import array
+from typing import Iterable
+
+from detail.detail import Detail
+from storage.abstract_box_storage import BoxStorage
+from storage.detail_codec import DetailCodec
+
+
+class ArrayBoxStorage(BoxStorage):
+    """
+    A class representing a compact in-memory storage that keeps boxes in typed parallel arrays.
+
+    Every box occupies a slot in the arrays: four float64 coordinates, its minimum side, an insertion sequence number,
+    the name encoded as a prefix code and an index, and a small type code. Slots of removed boxes are reused through
+    a free list. The order of the boxes is kept by a binary heap of slot numbers, and Detail objects are created only
+    when a box is returned from the storage. Boxes with equal minimum sides are returned in the order they were added.
+
+    Attributes:
+        bottom_left_x (array[float]): The x coordinates of the bottom-left corners of the boxes.
+        bottom_left_y (array[float]): The y coordinates of the bottom-left corners of the boxes.
+        top_right_x (array[float]): The x coordinates of the top-right corners of the boxes.
+        top_right_y (array[float]): The y coordinates of the top-right corners of the boxes.
+        min_sizes (array[float]): The minimum sides of the boxes.
+        sequence_numbers (array[int]): The insertion sequence numbers of the boxes, used to break ties.
+        name_prefixes (array[int]): The codes of the name prefixes of the boxes.
+        name_indices (array[int]): The indices in the names of the boxes.
+        type_codes (array[int]): The codes of the types of the boxes.
+        heap (array[int]): A binary heap of occupied slots ordered by the minimum side of the boxes.
+        free_slots (array[int]): Slots of removed boxes available for reuse.
+        codec (DetailCodec): The codec used to encode names and types of the boxes.
+        next_sequence_number (int): The sequence number of the next added box.
+    """
+
+    def __init__(self):
+        """
+        Initializes the ArrayBoxStorage with empty arrays.
+        """
+        self.bottom_left_x = array('d')
+        self.bottom_left_y = array('d')
+        self.top_right_x = array('d')
+        self.top_right_y = array('d')
+        self.min_sizes = array('d')
+        self.sequence_numbers = array('q')
+        self.name_prefixes = array('H')
+        self.name_indices = array('q')
+        self.type_codes = array('B')
+        self.heap = array('q')
+        self.free_slots = array('q')
+        self.codec = DetailCodec()
+        self.next_sequence_number = 0
+
+    def add_box(self, detail: Detail) -> None:
+        """
+        Add a box to the array storage.
+
+        :param detail: A Detail object representing the box to be added to the storage.
+        """
+        prefix_code, name_index = self.codec.encode_name(detail.name)
+        type_code = self.codec.encode_type(detail.detail_type)
+        if len(self.free_slots) > 0:
+            slot = self.free_slots.pop()
+            self._write_slot(slot, detail, prefix_code, name_index, type_code)
+        else:
+            slot = len(self.min_sizes)
+            self.bottom_left_x.append(detail.bottom_left[0])
+            self.bottom_left_y.append(detail.bottom_left[1])
+            self.top_right_x.append(detail.top_right[0])
+            self.top_right_y.append(detail.top_right[1])
+            self.min_sizes.append(detail.min_size)
+            self.sequence_numbers.append(self.next_sequence_number)
+            self.name_prefixes.append(prefix_code)
+            self.name_indices.append(name_index)
+            self.type_codes.append(type_code)
+        self.next_sequence_number += 1
+        self.heap.append(slot)
+        self._sift_up(len(self.heap) - 1)
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the array storage.
+        Names and types of all the boxes are encoded first, so nothing is added if one of them cannot be encoded.
+        Free slots are reused, the rest of the boxes are appended to every array at once, and if more boxes are
+        added than the heap contains, the heap is rebuilt in linear time instead of sifting the slots up one by one.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        details = list(details)
+        codes = [(*self.codec.encode_name(detail.name), self.codec.encode_type(detail.detail_type))
+                 for detail in details]
+        reused_count = min(len(details), len(self.free_slots))
+        slots = []
+        for detail, (prefix_code, name_index, type_code) in zip(details[:reused_count], codes):
+            slot = self.free_slots.pop()
+            self._write_slot(slot, detail, prefix_code, name_index, type_code)
+            self.next_sequence_number += 1
+            slots.append(slot)
+        appended = details[reused_count:]
+        appended_codes = codes[reused_count:]
+        first_slot = len(self.min_sizes)
+        self.bottom_left_x.extend(detail.bottom_left[0] for detail in appended)
+        self.bottom_left_y.extend(detail.bottom_left[1] for detail in appended)
+        self.top_right_x.extend(detail.top_right[0] for detail in appended)
+        self.top_right_y.extend(detail.top_right[1] for detail in appended)
+        self.min_sizes.extend(detail.min_size for detail in appended)
+        self.sequence_numbers.extend(range(self.next_sequence_number, self.next_sequence_number + len(appended)))
+        self.name_prefixes.extend(code[0] for code in appended_codes)
+        self.name_indices.extend(code[1] for code in appended_codes)
+        self.type_codes.extend(code[2] for code in appended_codes)
+        self.next_sequence_number += len(appended)
+        slots.extend(range(first_slot, first_slot + len(appended)))
+        if len(slots) > len(self.heap):
+            self.heap.extend(slots)
+            for position in reversed(range(len(self.heap) // 2)):
+                self._sift_down(position)
+        else:
+            for slot in slots:
+                self.heap.append(slot)
+                self._sift_up(len(self.heap) - 1)
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+        The threshold is compared with the minimum sides in the arrays, so Detail objects are created only for
+        the removed boxes.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        boxes = []
+        heap = self.heap
+        min_sizes = self.min_sizes
+        while len(heap) > 0 and min_sizes[heap[0]] >= min_size_threshold:
+            boxes.append(self.pop_max_box())
+        return boxes
+
+    def get_max_box(self) -> Detail:
+        """
+        Retrieve the largest box from the array storage without removing it.
+
+        :return: The largest box.
+        """
+        return self._slot_to_detail(self.heap[0]) if len(self.heap) > 0 else None
+
+    def pop_max_box(self) -> Detail:
+        """
+        Retrieve and remove the largest box from the array storage.
+
+        :return: The largest box.
+        """
+        if len(self.heap) == 0:
+            return None
+        slot = self.heap[0]
+        last_slot = self.heap.pop()
+        if len(self.heap) > 0:
+            self.heap[0] = last_slot
+            self._sift_down(0)
+        self.free_slots.append(slot)
+        return self._slot_to_detail(slot)
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current number of boxes and free slots in the array storage.
+
+        :return: A dictionary with the number of boxes under 'boxes' and the number of free slots
+            under 'free_slots'.
+        """
+        return {'boxes': len(self.heap), 'free_slots': len(self.free_slots)}
+
+    def _sift_up(self, position: int) -> None:
+        """
+        Move the slot at the given heap position up until the heap order is restored.
+
+        :param position: The position of the slot in the heap.
+        """
+        heap = self.heap
+        min_sizes = self.min_sizes
+        sequence_numbers = self.sequence_numbers
+        slot = heap[position]
+        min_size = min_sizes[slot]
+        sequence_number = sequence_numbers[slot]
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent_slot = heap[parent_position]
+            parent_min_size = min_sizes[parent_slot]
+            if min_size > parent_min_size or \
+                    (min_size == parent_min_size and sequence_number < sequence_numbers[parent_slot]):
+                heap[position] = parent_slot
+                position = parent_position
+            else:
+                break
+        heap[position] = slot
+
+    def _sift_down(self, position: int) -> None:
+        """
+        Move the slot at the given heap position down until the heap order is restored.
+
+        :param position: The position of the slot in the heap.
+        """
+        heap = self.heap
+        min_sizes = self.min_sizes
+        sequence_numbers = self.sequence_numbers
+        heap_size = len(heap)
+        slot = heap[position]
+        min_size = min_sizes[slot]
+        sequence_number = sequence_numbers[slot]
+        while True:
+            child_position = 2 * position + 1
+            if child_position >= heap_size:
+                break
+            child_slot = heap[child_position]
+            right_position = child_position + 1
+            if right_position < heap_size:
+                right_slot = heap[right_position]
+                if min_sizes[right_slot] > min_sizes[child_slot] or \
+                        (min_sizes[right_slot] == min_sizes[child_slot] and
+                         sequence_numbers[right_slot] < sequence_numbers[child_slot]):
+                    child_position = right_position
+                    child_slot = right_slot
+            child_min_size = min_sizes[child_slot]
+            if child_min_size > min_size or \
+                    (child_min_size == min_size and sequence_numbers[child_slot] < sequence_number):
+                heap[position] = child_slot
+                position = child_position
+            else:
+                break
+        heap[position] = slot
+
+    def _write_slot(self, slot: int, detail: Detail, prefix_code: int, name_index: int, type_code: int) -> None:
+        """
+        Write a box to a free slot of the arrays, with the next sequence number.
+
+        :param slot: The free slot.
+        :param detail: A Detail object representing the box.
+        :param prefix_code: The code of the name prefix of the box.
+        :param name_index: The index in the name of the box.
+        :param type_code: The code of the type of the box.
+        """
+        self.bottom_left_x[slot] = detail.bottom_left[0]
+        self.bottom_left_y[slot] = detail.bottom_left[1]
+        self.top_right_x[slot] = detail.top_right[0]
+        self.top_right_y[slot] = detail.top_right[1]
+        self.min_sizes[slot] = detail.min_size
+        self.sequence_numbers[slot] = self.next_sequence_number
+        self.name_prefixes[slot] = prefix_code
+        self.name_indices[slot] = name_index
+        self.type_codes[slot] = type_code
+
+    def _slot_to_detail(self, slot: int) -> Detail:
+        """
+        Convert a slot of the arrays to a Detail object.
+
+        :param slot: The slot of the box in the arrays.
+        :return: A Detail object representing the box.
+        """
+        return Detail(
+            (self.bottom_left_x[slot], self.bottom_left_y[slot]),
+            (self.top_right_x[slot], self.top_right_y[slot]),
+            self.codec.decode_name(self.name_prefixes[slot], self.name_indices[slot]),
+            self.codec.decode_type(self.type_codes[slot])
+        )
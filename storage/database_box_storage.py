@@ -1,31 +1,83 @@
-from sqlalchemy import Column, Integer, Float, String, create_engine, MetaData, Table, Index, Row
-from sqlalchemy.exc import ProgrammingError
+from sqlalchemy import Column, Integer, Float, String, create_engine, MetaData, Table, Index, Row, insert, select, \
+    delete, bindparam
 from sqlalchemy.orm import sessionmaker
+from time import perf_counter_ns
+from typing import Iterable
 
 from detail.detail import Detail
 from storage.abstract_box_storage import BoxStorage
+from storage.database_checkpoint import DatabaseCheckpointMarker
+from storage.storage_metrics import StorageMetrics
 
 
 class DatabaseBoxStorage(BoxStorage):
     """
     A class representing a database storage for storing boxes during the detail placement process.
 
+    Operations are grouped into transactions of `batch_size` operations. Added boxes are buffered and inserted with
+    a single executemany statement before the next query or when the buffer is full. If the dialect supports
+    DELETE ... RETURNING (for example SQLite and PostgreSQL), the largest box is retrieved and removed with a single
+    statement. All statements are built once and reused.
+
+    Once the first checkpoint is taken, changes are committed only at checkpoints, so after a crash the database
+    rolls back to the state saved in the latest checkpoint, and a storage restored from the checkpoint reconnects
+    to the existing table instead of recreating it.
+
     Attributes:
+        db_url (str): The URL of the database.
+        table_name (str): The name of the table to store boxes.
         engine (Engine): The SQLAlchemy engine for connecting to the database.
         session (Session): The SQLAlchemy session for interacting with the database.
         boxes_table (Table): The SQLAlchemy Table object representing the boxes table.
+        batch_size (int): The number of operations grouped into one transaction.
+        pending_rows (list[dict]): Rows of the added boxes that have not been inserted yet.
+        operations_since_commit (int): The number of operations performed since the last commit.
+        insert_statement (Insert): The statement inserting boxes.
+        max_statement (Select): The statement selecting the largest box.
+        delete_statement (Delete): The statement deleting a box by its id.
+        pop_statement (Delete): The statement deleting the largest box and returning it, or None if the dialect
+            does not support DELETE ... RETURNING.
+        max_boxes_statement (Select): The statement selecting the boxes not less than a threshold, from the largest
+            to the smallest.
+        delete_boxes_statement (Delete): The statement deleting the boxes not less than a threshold.
+        pop_boxes_statement (Delete): The statement deleting the boxes not less than a threshold and returning them,
+            or None if the dialect does not support DELETE ... RETURNING.
+        metrics (StorageMetrics): Durations and sizes of inserts of buffered boxes and durations of commits.
+        checkpoint_marker (DatabaseCheckpointMarker): The table storing the number of the latest checkpoint.
+        commit_at_checkpoints (bool): Whether changes are committed only at checkpoints.
+        checkpoint_number (int): The number of the latest checkpoint.
     """
 
-    def __init__(self, db_url, table_name='boxes'):
+    def __init__(self, db_url, table_name='boxes', batch_size: int = 1):
         """
         Initializes the DatabaseBoxStorage with the given database URL and table name.
 
         :param db_url: The URL of the database to connect to.
         :param table_name: The name of the table to store boxes (default is 'boxes').
+        :param batch_size: The number of operations grouped into one transaction (default is 1, which commits
+            after every operation).
+        """
+        self.db_url = db_url
+        self.table_name = table_name
+        metadata = self._connect()
+        self._drop_existing_table()
+        metadata.create_all(self.engine)
+        self.batch_size = batch_size
+        self.pending_rows = []
+        self.operations_since_commit = 0
+        self.metrics = StorageMetrics()
+        self.commit_at_checkpoints = False
+        self.checkpoint_number = 0
+
+    def _connect(self) -> MetaData:
         """
-        self.engine = create_engine(db_url)
+        Connect to the database and build the table objects and statements without creating any tables.
+
+        :return: The metadata of the tables.
+        """
+        self.engine = create_engine(self.db_url)
         metadata = MetaData()
-        self.boxes_table = Table(table_name, metadata,
+        self.boxes_table = Table(self.table_name, metadata,
                                  Column('id', Integer, primary_key=True),
                                  Column('bottom_left_x', Float),
                                  Column('bottom_left_y', Float),
@@ -35,19 +87,31 @@ class DatabaseBoxStorage(BoxStorage):
                                  Column('name', String),
                                  Column('detail_type', String),
                                  Index('idx_min_size', 'min_size'))
-        self._drop_existing_table()
-        metadata.create_all(self.engine)
+        self.checkpoint_marker = DatabaseCheckpointMarker(metadata, self.table_name)
         session = sessionmaker(bind=self.engine)
         self.session = session()
+        order = (self.boxes_table.c.min_size.desc(), self.boxes_table.c.id)
+        self.insert_statement = insert(self.boxes_table)
+        self.max_statement = select(self.boxes_table).order_by(*order).limit(1)
+        self.delete_statement = delete(self.boxes_table).where(self.boxes_table.c.id == bindparam('box_id'))
+        not_less_than_threshold = self.boxes_table.c.min_size >= bindparam('min_size_threshold')
+        self.max_boxes_statement = select(self.boxes_table).where(not_less_than_threshold).order_by(*order)
+        self.delete_boxes_statement = delete(self.boxes_table).where(not_less_than_threshold)
+        self.pop_statement = None
+        self.pop_boxes_statement = None
+        if self.engine.dialect.delete_returning:
+            max_id = select(self.boxes_table.c.id).order_by(*order).limit(1).scalar_subquery()
+            self.pop_statement = delete(self.boxes_table).where(self.boxes_table.c.id == max_id) \
+                .returning(*self.boxes_table.c)
+            self.pop_boxes_statement = self.delete_boxes_statement.returning(*self.boxes_table.c)
+        return metadata
 
     def _drop_existing_table(self) -> None:
         """
         Drop the existing table with the specified table name if it exists.
         """
-        try:
-            self.boxes_table.drop(self.engine)
-        except ProgrammingError:
-            pass
+        self.boxes_table.drop(self.engine, checkfirst=True)
+        self.checkpoint_marker.marker_table.drop(self.engine, checkfirst=True)
 
     def add_box(self, detail: Detail) -> None:
         """
@@ -55,16 +119,32 @@ class DatabaseBoxStorage(BoxStorage):
 
         :param detail: A Detail object representing the box to be added to the storage.
         """
-        self.session.execute(self.boxes_table.insert().values(
-            bottom_left_x=detail.bottom_left[0],
-            bottom_left_y=detail.bottom_left[1],
-            top_right_x=detail.top_right[0],
-            top_right_y=detail.top_right[1],
-            min_size=min(detail.width, detail.height),
-            name=detail.name,
-            detail_type=detail.detail_type
-        ))
-        self.session.commit()
+        self.add_boxes([detail])
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the database storage.
+        Each box counts as one operation, and the boxes are inserted with a single executemany statement once
+        `batch_size` rows are buffered.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        rows = [
+            {
+                'bottom_left_x': detail.bottom_left[0],
+                'bottom_left_y': detail.bottom_left[1],
+                'top_right_x': detail.top_right[0],
+                'top_right_y': detail.top_right[1],
+                'min_size': detail.min_size,
+                'name': detail.name,
+                'detail_type': detail.detail_type
+            }
+            for detail in details
+        ]
+        self.pending_rows.extend(rows)
+        if len(self.pending_rows) >= self.batch_size:
+            self._insert_pending_rows()
+        self._count_operation(len(rows))
 
     def get_max_box(self) -> Detail:
         """
@@ -72,7 +152,8 @@ class DatabaseBoxStorage(BoxStorage):
 
         :return: The largest box.
         """
-        max_box = self.session.query(self.boxes_table).order_by(self.boxes_table.c.min_size.desc()).first()
+        self._insert_pending_rows()
+        max_box = self.session.execute(self.max_statement).first()
         return self._row_to_detail(max_box) if max_box else None
 
     def pop_max_box(self) -> Detail:
@@ -81,13 +162,120 @@ class DatabaseBoxStorage(BoxStorage):
 
         :return: The largest box.
         """
-        max_box = self.session.query(self.boxes_table).order_by(self.boxes_table.c.min_size.desc()).first()
+        self._insert_pending_rows()
+        if self.pop_statement is not None:
+            max_box = self.session.execute(self.pop_statement).first()
+        else:
+            max_box = self.session.execute(self.max_statement).first()
+            if max_box:
+                self.session.execute(self.delete_statement, {'box_id': max_box.id})
         if max_box:
-            self.session.query(self.boxes_table).filter_by(id=max_box.id).delete()
-            self.session.commit()
+            self._count_operation()
             return self._row_to_detail(max_box)
         return None
 
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+        The boxes are retrieved and removed with a single statement if the dialect supports DELETE ... RETURNING,
+        and with one select and one delete statement otherwise. Each removed box counts as one operation.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        self._insert_pending_rows()
+        parameters = {'min_size_threshold': min_size_threshold}
+        if self.pop_boxes_statement is not None:
+            rows = self.session.execute(self.pop_boxes_statement, parameters).fetchall()
+            rows.sort(key=lambda row: (-row.min_size, row.id))
+        else:
+            rows = self.session.execute(self.max_boxes_statement, parameters).fetchall()
+            if len(rows) > 0:
+                self.session.execute(self.delete_boxes_statement, parameters)
+        if len(rows) > 0:
+            self._count_operation(len(rows))
+        return [self._row_to_detail(row) for row in rows]
+
+    def flush(self) -> None:
+        """
+        Insert all buffered boxes and commit the current transaction, unless changes are committed only
+        at checkpoints.
+        """
+        self._insert_pending_rows()
+        if not self.commit_at_checkpoints:
+            start = perf_counter_ns()
+            self.session.commit()
+            self.metrics.record('commit_ns', perf_counter_ns() - start)
+        self.operations_since_commit = 0
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Insert all buffered boxes and commit the current transaction together with the number of the new checkpoint.
+        From now on, changes are committed only at checkpoints.
+        """
+        self._insert_pending_rows()
+        self.commit_at_checkpoints = True
+        self.checkpoint_number += 1
+        self.checkpoint_marker.write(self.session, self.checkpoint_number)
+        start = perf_counter_ns()
+        self.session.commit()
+        self.metrics.record('commit_ns', perf_counter_ns() - start)
+        self.operations_since_commit = 0
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the storage for pickling, without the connection to the database and the statements.
+
+        :return: The state of the storage.
+        """
+        state = self.__dict__.copy()
+        for name in ('engine', 'session', 'boxes_table', 'checkpoint_marker', 'insert_statement', 'max_statement',
+                     'delete_statement', 'max_boxes_statement', 'delete_boxes_statement', 'pop_statement',
+                     'pop_boxes_statement'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the storage from a checkpoint and reconnect to the existing table.
+
+        :param state: The state of the storage.
+        :raises CheckpointException: If the table has been changed after the checkpoint.
+        """
+        self.__dict__.update(state)
+        self._connect()
+        self.checkpoint_marker.verify(self.session, self.checkpoint_number)
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current number of buffered boxes and operations in the current transaction.
+
+        :return: A dictionary with the number of buffered boxes under 'pending_rows' and the number of operations
+            in the current transaction under 'operations_since_commit'.
+        """
+        return {'pending_rows': len(self.pending_rows), 'operations_since_commit': self.operations_since_commit}
+
+    def _insert_pending_rows(self) -> None:
+        """
+        Insert all buffered boxes into the database with a single executemany statement.
+        """
+        if len(self.pending_rows) > 0:
+            start = perf_counter_ns()
+            self.session.execute(self.insert_statement, self.pending_rows)
+            self.metrics.record('insert_ns', perf_counter_ns() - start)
+            self.metrics.record('insert_rows', len(self.pending_rows))
+            self.pending_rows = []
+
+    def _count_operation(self, operations: int = 1) -> None:
+        """
+        Count performed operations and commit the transaction once it contains `batch_size` operations.
+
+        :param operations: The number of performed operations (default is 1).
+        """
+        self.operations_since_commit += operations
+        if self.operations_since_commit >= self.batch_size:
+            self.flush()
+
     @staticmethod
     def _row_to_detail(row: Row) -> Detail:
         """
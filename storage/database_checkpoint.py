@@ -0,0 +1,52 @@
+from sqlalchemy import Table, Column, Integer, MetaData, select, delete, insert
+from sqlalchemy.orm import Session
+
+from core.checkpoint import CheckpointException
+
+
+class DatabaseCheckpointMarker:
+    """
+    A class that stores the number of the latest checkpoint in a single-row table next to the boxes table.
+
+    Database storages commit their changes only at checkpoints once the first checkpoint is taken, and write
+    the checkpoint number in the same transaction. When a storage is restored from a checkpoint, the number in
+    the database is compared with the restored one, so a database that has been changed after the checkpoint
+    is detected instead of being silently reused.
+
+    Attributes:
+        marker_table (Table): The SQLAlchemy Table object representing the checkpoint table.
+    """
+
+    def __init__(self, metadata: MetaData, table_name: str):
+        """
+        Initializes the DatabaseCheckpointMarker.
+
+        :param metadata: The metadata of the boxes table.
+        :param table_name: The name of the boxes table. The checkpoint table is named after it.
+        """
+        self.marker_table = Table(f'{table_name}_checkpoint', metadata,
+                                  Column('id', Integer, primary_key=True),
+                                  Column('checkpoint_number', Integer))
+
+    def write(self, session: Session, checkpoint_number: int) -> None:
+        """
+        Write the number of the checkpoint into the current transaction.
+
+        :param session: The session of the storage.
+        :param checkpoint_number: The number of the checkpoint.
+        """
+        session.execute(delete(self.marker_table))
+        session.execute(insert(self.marker_table).values(id=1, checkpoint_number=checkpoint_number))
+
+    def verify(self, session: Session, checkpoint_number: int) -> None:
+        """
+        Check that the database has been committed at the given checkpoint and not changed since then.
+
+        :param session: The session of the storage.
+        :param checkpoint_number: The number of the restored checkpoint.
+        :raises CheckpointException: If the database belongs to another checkpoint.
+        """
+        stored_number = session.execute(select(self.marker_table.c.checkpoint_number)).scalar()
+        if stored_number != checkpoint_number:
+            raise CheckpointException(f'Table {self.marker_table.name} belongs to checkpoint {stored_number}, '
+                                      f'but checkpoint {checkpoint_number} is being restored')
@@ -0,0 +1,99 @@
+import re
+
+
+class DetailCodec:
+    """
+    A class that encodes the string fields of a Detail into small integers and decodes them back.
+
+    Names produced by the gamma algorithm consist of a prefix and an optional index (e.g. `B123456`, `Ep42`, `LRP`),
+    so a name is stored as a prefix code and an index instead of a string. Detail types are stored as type codes.
+    Both prefixes and types are registered in lookup tables the first time they are seen.
+
+    The codes are stored by the storages in fixed-width fields: prefix codes in 16 bits, indices in signed 64 bits
+    and type codes in 8 bits. Names whose index does not fit are stored entirely as a prefix, and a ValueError
+    is raised before a prefix or a type that would not fit is registered.
+
+    Attributes:
+        prefixes (list[str]): Known name prefixes, indexed by their code.
+        prefix_codes (dict[str, int]): Mapping of name prefixes to their codes.
+        detail_types (list[str]): Known detail types, indexed by their code.
+        detail_type_codes (dict[str, int]): Mapping of detail types to their codes.
+    """
+
+    NO_INDEX = -1
+    MAX_INDEX = 2 ** 63 - 1
+    MAX_PREFIX_CODE = 2 ** 16 - 1
+    MAX_TYPE_CODE = 2 ** 8 - 1
+    NAME_PATTERN = re.compile(r'^(.*?)(0|[1-9][0-9]*)$')
+
+    def __init__(self):
+        """
+        Initializes the DetailCodec with empty lookup tables.
+        """
+        self.prefixes = []
+        self.prefix_codes = {}
+        self.detail_types = []
+        self.detail_type_codes = {}
+
+    def encode_name(self, name: str) -> tuple[int, int]:
+        """
+        Encode a detail name as a prefix code and an index.
+        Names that do not end with a number (or whose number has leading zeros or exceeds MAX_INDEX) are stored
+        entirely as a prefix.
+
+        :param name: The name of the detail.
+        :return: A tuple of the prefix code and the index, or NO_INDEX if the name has no index.
+        :raises ValueError: If the name has a new prefix and MAX_PREFIX_CODE prefixes are already registered.
+        """
+        match = self.NAME_PATTERN.match(name)
+        if match and int(match.group(2)) <= self.MAX_INDEX:
+            prefix, index = match.group(1), int(match.group(2))
+        else:
+            prefix, index = name, self.NO_INDEX
+        code = self.prefix_codes.get(prefix)
+        if code is None:
+            code = len(self.prefixes)
+            if code > self.MAX_PREFIX_CODE:
+                raise ValueError(f'Cannot encode the name {name!r}: more than {self.MAX_PREFIX_CODE + 1} '
+                                 f'different name prefixes')
+            self.prefixes.append(prefix)
+            self.prefix_codes[prefix] = code
+        return code, index
+
+    def decode_name(self, prefix_code: int, index: int) -> str:
+        """
+        Decode a detail name from its prefix code and index.
+
+        :param prefix_code: The code of the name prefix.
+        :param index: The index of the name, or NO_INDEX if the name has no index.
+        :return: The name of the detail.
+        """
+        prefix = self.prefixes[prefix_code]
+        return prefix if index == self.NO_INDEX else f'{prefix}{index}'
+
+    def encode_type(self, detail_type: str) -> int:
+        """
+        Encode a detail type as a type code.
+
+        :param detail_type: The type of the detail.
+        :return: The code of the detail type.
+        :raises ValueError: If the type is new and MAX_TYPE_CODE types are already registered.
+        """
+        code = self.detail_type_codes.get(detail_type)
+        if code is None:
+            code = len(self.detail_types)
+            if code > self.MAX_TYPE_CODE:
+                raise ValueError(f'Cannot encode the detail type {detail_type!r}: more than '
+                                 f'{self.MAX_TYPE_CODE + 1} different detail types')
+            self.detail_types.append(detail_type)
+            self.detail_type_codes[detail_type] = code
+        return code
+
+    def decode_type(self, type_code: int) -> str:
+        """
+        Decode a detail type from its type code.
+
+        :param type_code: The code of the detail type.
+        :return: The type of the detail.
+        """
+        return self.detail_types[type_code]
@@ -0,0 +1,374 @@
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import weakref
+from itertools import count
+from time import perf_counter_ns
+from typing import Iterable
+
+from detail.detail import Detail
+from storage.abstract_box_storage import BoxStorage
+from storage.detail_codec import DetailCodec
+from storage.storage_metrics import StorageMetrics
+
+
+class SortedRun:
+    """
+    A class representing a sorted run of boxes written to a memory-mapped binary file.
+
+    Each record of the run contains the negated minimum side of the box, its insertion sequence number, four
+    coordinates, the encoded name and the type code. Records are sorted from the largest box to the smallest one.
+
+    Attributes:
+        path (str): The path to the file of the run.
+        size (int): The number of records in the run.
+        position (int): The position of the next unread record.
+        file (BinaryIO): The file object of the run.
+        mapped_file (mmap.mmap): The memory map of the file.
+    """
+
+    RECORD = struct.Struct('<dq4dHqB')
+
+    def __init__(self, path: str, records: list[tuple]):
+        """
+        Write the records to a new file and map it to memory.
+
+        :param path: The path to the file of the run.
+        :param records: Sorted records to be written to the run.
+        """
+        self.path = path
+        self.size = len(records)
+        self.position = 0
+        buffer = bytearray(self.RECORD.size * self.size)
+        pack_into = self.RECORD.pack_into
+        offset = 0
+        for record in records:
+            pack_into(buffer, offset, *record)
+            offset += self.RECORD.size
+        with open(path, 'wb') as file:
+            file.write(buffer)
+        self._open()
+
+    def _open(self) -> None:
+        """
+        Open the file of the run and map it to memory.
+        """
+        self.file = open(self.path, 'rb')
+        self.mapped_file = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self) -> tuple:
+        """
+        Read the record at the current position and advance the position.
+
+        :return: The record at the current position.
+        """
+        record = self.RECORD.unpack_from(self.mapped_file, self.position * self.RECORD.size)
+        self.position += 1
+        return record
+
+    def is_exhausted(self) -> bool:
+        """
+        Check if all records of the run have been read.
+
+        :return: True if all records have been read, False otherwise.
+        """
+        return self.position >= self.size
+
+    def close(self, remove_file: bool = True) -> None:
+        """
+        Close the memory map and delete the file of the run.
+
+        :param remove_file: Whether the file of the run is deleted (default is True).
+        """
+        self.mapped_file.close()
+        self.file.close()
+        if remove_file:
+            os.remove(self.path)
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the run for pickling. Only the path, the size and the position are saved, since the file
+        itself is not changed after it is written.
+
+        :return: The state of the run.
+        """
+        return {'path': self.path, 'size': self.size, 'position': self.position}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the run from a checkpoint and map its file to memory again.
+
+        :param state: The state of the run.
+        """
+        self.__dict__.update(state)
+        self._open()
+
+
+class ExternalMemoryBoxStorage(BoxStorage):
+    """
+    A class representing a file-backed external priority queue for storing boxes that do not fit in memory.
+
+    Boxes are kept in an in-memory binary heap of `(-min_size, seq, detail)` entries. When the heap grows beyond
+    `memory_size`, its smaller half is written to disk as a sorted run. The heads of all runs are kept in a separate
+    heap, and when the largest box is on disk, the in-memory heap is refilled with the next `refill_size` boxes by
+    k-way merging the run heads. No database server is needed, and runs are written and read as raw binary records.
+
+    Runs are never changed after they are written, so a checkpoint only saves the in-memory heap and the positions
+    of the runs. Once the first checkpoint is taken, the files of exhausted runs are kept until the next checkpoint
+    is saved, since the previous checkpoint may still refer to them.
+
+    A temporary directory created by the storage is removed by `close`, at the end of a `with` block, or when
+    the storage is garbage collected or the interpreter exits. Once a checkpoint is taken, the directory is removed
+    only by `close`, so the checkpoint can still be resumed.
+
+    Attributes:
+        memory_size (int): The maximum number of boxes kept in memory before spilling to disk.
+        refill_size (int): The largest number of boxes merged from disk into memory on each refill. Fewer boxes
+            are merged if the in-memory heap would grow beyond `memory_size`.
+        directory (str): The directory where the runs are stored.
+        boxes (list[tuple[float, int, Detail]]): A binary heap of `(-min_size, seq, detail)` entries in memory.
+        run_heads (list[tuple[float, int, int]]): A binary heap of `(-min_size, seq, run_id)` entries for the heads
+            of the runs.
+        runs (dict[int, SortedRun]): The runs on disk that still have unread records, by their ids.
+        codec (DetailCodec): The codec used to encode names and types of the boxes written to disk.
+        counter (itertools.count): A counter providing the insertion sequence numbers used to break ties.
+        run_counter (itertools.count): A counter providing ids of the runs.
+        metrics (StorageMetrics): Durations and sizes of spills and refills.
+        keep_retired_runs (bool): Whether the files of exhausted runs are kept until the next checkpoint is saved.
+        retired_runs (list[str]): The paths to the files of exhausted runs that are kept.
+    """
+
+    def __init__(self, memory_size: int = 1000000, refill_size: int = None, directory: str = None):
+        """
+        Initializes the ExternalMemoryBoxStorage.
+
+        :param memory_size: The maximum number of boxes kept in memory before spilling to disk.
+        :param refill_size: The number of boxes merged from disk into memory on each refill
+            (default is half of `memory_size`).
+        :param directory: The directory where the runs are stored. If not provided, a temporary directory is created
+            and removed when the storage is closed.
+        """
+        self.memory_size = memory_size
+        self.refill_size = refill_size if refill_size is not None else max(1, memory_size // 2)
+        self._owns_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix='boxes_') if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True) \
+            if self._owns_directory else None
+        self.boxes = []
+        self.run_heads = []
+        self.runs = {}
+        self.codec = DetailCodec()
+        self.counter = count()
+        self.run_counter = count()
+        self.metrics = StorageMetrics()
+        self.keep_retired_runs = False
+        self.retired_runs = []
+
+    def add_box(self, detail: Detail) -> None:
+        """
+        Add a box to the external memory storage.
+
+        :param detail: A Detail object representing the box to be added to the storage.
+        """
+        heapq.heappush(self.boxes, (-detail.min_size, next(self.counter), detail))
+        if len(self.boxes) > self.memory_size:
+            self._spill()
+
+    def get_max_box(self) -> Detail:
+        """
+        Retrieve the largest box from the external memory storage without removing it.
+
+        :return: The largest box.
+        """
+        self._refill_if_needed()
+        return self.boxes[0][2] if len(self.boxes) > 0 else None
+
+    def pop_max_box(self) -> Detail:
+        """
+        Retrieve and remove the largest box from the external memory storage.
+
+        :return: The largest box.
+        """
+        self._refill_if_needed()
+        return heapq.heappop(self.boxes)[2] if len(self.boxes) > 0 else None
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the external memory storage.
+        The boxes are added to the in-memory heap at once, and the heap is spilled to disk at most once.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        entries = [(-detail.min_size, next(self.counter), detail) for detail in details]
+        if len(entries) > len(self.boxes):
+            self.boxes.extend(entries)
+            heapq.heapify(self.boxes)
+        else:
+            for entry in entries:
+                heapq.heappush(self.boxes, entry)
+        if len(self.boxes) > self.memory_size:
+            self._spill()
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        boxes = []
+        self._refill_if_needed()
+        while len(self.boxes) > 0 and -self.boxes[0][0] >= min_size_threshold:
+            boxes.append(heapq.heappop(self.boxes)[2])
+            self._refill_if_needed()
+        return boxes
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current number of boxes in memory and on disk, and the number of runs.
+
+        :return: A dictionary with the number of boxes in memory under 'memory', the number of unread boxes on disk
+            under 'disk' and the number of runs under 'runs'.
+        """
+        return {'memory': len(self.boxes), 'disk': sum(run.size - run.position for run in self.runs.values()),
+                'runs': len(self.runs)}
+
+    def close(self) -> None:
+        """
+        Delete all runs from disk and remove the directory of the runs if it was created by the storage.
+        """
+        for run in self.runs.values():
+            run.close()
+        self.runs = {}
+        self.run_heads = []
+        self.complete_checkpoint()
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> 'ExternalMemoryBoxStorage':
+        """
+        Enter a `with` block.
+
+        :return: The storage.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Close the storage at the end of a `with` block.
+        """
+        self.close()
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Start keeping the files of exhausted runs until the next checkpoint is saved, and keep the directory
+        of the runs after the storage is garbage collected, since the checkpoint refers to it.
+        """
+        self.keep_retired_runs = True
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+
+    def complete_checkpoint(self) -> None:
+        """
+        Delete the files of the runs that were exhausted before the saved checkpoint.
+        """
+        for path in self.retired_runs:
+            if os.path.exists(path):
+                os.remove(path)
+        self.retired_runs = []
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the storage for pickling. The counters are saved as their next values, and they are
+        restarted from these values, so pickling does not change the numbers used later.
+
+        :return: The state of the storage.
+        """
+        state = self.__dict__.copy()
+        state['_finalizer'] = None
+        state['counter'] = next(self.counter)
+        state['run_counter'] = next(self.run_counter)
+        self.counter = count(state['counter'])
+        self.run_counter = count(state['run_counter'])
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the storage from a checkpoint. The files of the runs must still exist.
+
+        :param state: The state of the storage.
+        """
+        self.__dict__.update(state)
+        self.counter = count(state['counter'])
+        self.run_counter = count(state['run_counter'])
+
+    def _spill(self) -> None:
+        """
+        Write the smaller half of the in-memory boxes to disk as a new sorted run. The boxes are removed from
+        memory only after the run is written, so if a name or a type cannot be encoded, no box is lost.
+        """
+        start = perf_counter_ns()
+        entries = sorted(self.boxes)
+        keep_count = self.memory_size // 2
+        records = []
+        for negative_min_size, seq, detail in entries[keep_count:]:
+            prefix_code, name_index = self.codec.encode_name(detail.name)
+            records.append((negative_min_size, seq,
+                            detail.bottom_left[0], detail.bottom_left[1], detail.top_right[0], detail.top_right[1],
+                            prefix_code, name_index, self.codec.encode_type(detail.detail_type)))
+        if len(records) == 0:
+            return
+        run_id = next(self.run_counter)
+        run = SortedRun(os.path.join(self.directory, f'run_{run_id}.bin'), records)
+        self.runs[run_id] = run
+        self.boxes = entries[:keep_count]
+        heapq.heappush(self.run_heads, (records[0][0], records[0][1], run_id))
+        self.metrics.record('spill_ns', perf_counter_ns() - start)
+        self.metrics.record('spill_rows', len(records))
+
+    def _refill_if_needed(self) -> None:
+        """
+        Refill the in-memory heap from the runs if the largest box is stored on disk.
+        """
+        if len(self.run_heads) > 0 and (len(self.boxes) == 0 or self.run_heads[0] < self.boxes[0][:2]):
+            self._refill()
+
+    def _refill(self) -> None:
+        """
+        Move the next `refill_size` largest boxes from the runs to memory by k-way merging the run heads.
+        The refill never makes the in-memory heap larger than `memory_size`, so the next added box does not cause
+        a spill of a tiny run. At least one box is moved, so the largest box is always in memory afterwards.
+        """
+        start = perf_counter_ns()
+        refilled_count = 0
+        for _ in range(max(1, min(self.refill_size, self.memory_size - len(self.boxes)))):
+            if len(self.run_heads) == 0:
+                break
+            refilled_count += 1
+            _, _, run_id = self.run_heads[0]
+            run = self.runs[run_id]
+            negative_min_size, seq, bottom_left_x, bottom_left_y, top_right_x, top_right_y, \
+                prefix_code, name_index, type_code = run.read()
+            detail = Detail((bottom_left_x, bottom_left_y), (top_right_x, top_right_y),
+                            self.codec.decode_name(prefix_code, name_index), self.codec.decode_type(type_code))
+            heapq.heappush(self.boxes, (negative_min_size, seq, detail))
+            if run.is_exhausted():
+                heapq.heappop(self.run_heads)
+                run.close(remove_file=not self.keep_retired_runs)
+                if self.keep_retired_runs:
+                    self.retired_runs.append(run.path)
+                del self.runs[run_id]
+            else:
+                next_negative_min_size, next_seq = SortedRun.RECORD.unpack_from(
+                    run.mapped_file, run.position * SortedRun.RECORD.size)[:2]
+                heapq.heapreplace(self.run_heads, (next_negative_min_size, next_seq, run_id))
+        self.metrics.record('refill_ns', perf_counter_ns() - start)
+        self.metrics.record('refill_rows', refilled_count)
@@ -0,0 +1,116 @@
+import heapq
+from itertools import count
+from typing import Iterable
+
+from detail.detail import Detail
+from storage.abstract_box_storage import BoxStorage
+
+
+class HeapBoxStorage(BoxStorage):
+    """
+    A class representing an in-memory storage based on a binary heap for storing boxes during the detail placement
+    process.
+
+    Each box is stored as a `(-min_size, seq, detail)` entry, so the key of a box is computed once when it is added
+    and the heap never calls back into Python comparators. Boxes with equal minimum sides are returned in the order
+    they were added, as in `InMemoryBoxStorage`.
+
+    Attributes:
+        boxes (list[tuple[float, int, Detail]]): A binary heap of `(-min_size, seq, detail)` entries.
+        counter (itertools.count): A counter providing the insertion sequence numbers used to break ties.
+    """
+
+    def __init__(self):
+        """
+        Initializes the HeapBoxStorage with an empty heap for storing boxes.
+        """
+        self.boxes = []
+        self.counter = count()
+
+    def add_box(self, detail: Detail) -> None:
+        """
+        Add a box to the heap storage.
+
+        :param detail: A Detail object representing the box to be added to the storage.
+        """
+        heapq.heappush(self.boxes, (-detail.min_size, next(self.counter), detail))
+
+    def keeps_details(self) -> bool:
+        """
+        Check whether the storage returns the added Detail objects as they are. The heap storage keeps the objects.
+
+        :return: True.
+        """
+        return True
+
+    def get_max_box(self) -> Detail:
+        """
+        Retrieve the largest box from the heap storage without removing it.
+
+        :return: The largest box.
+        """
+        return self.boxes[0][2] if len(self.boxes) > 0 else None
+
+    def pop_max_box(self) -> Detail:
+        """
+        Retrieve and remove the largest box from the heap storage.
+
+        :return: The largest box.
+        """
+        return heapq.heappop(self.boxes)[2] if len(self.boxes) > 0 else None
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the heap storage.
+        If more boxes are added than the heap contains, the heap is rebuilt in linear time instead of pushing
+        the boxes one by one.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        entries = [(-detail.min_size, next(self.counter), detail) for detail in details]
+        if len(entries) > len(self.boxes):
+            self.boxes.extend(entries)
+            heapq.heapify(self.boxes)
+        else:
+            for entry in entries:
+                heapq.heappush(self.boxes, entry)
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        boxes = []
+        while len(self.boxes) > 0 and -self.boxes[0][0] >= min_size_threshold:
+            boxes.append(heapq.heappop(self.boxes)[2])
+        return boxes
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current number of boxes in the heap storage.
+
+        :return: A dictionary with the number of boxes under 'boxes'.
+        """
+        return {'boxes': len(self.boxes)}
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the storage for pickling. The counter is saved as the next sequence number, and it is
+        restarted from that number, so pickling does not change the sequence numbers of the boxes added later.
+
+        :return: The state of the storage.
+        """
+        next_sequence_number = next(self.counter)
+        self.counter = count(next_sequence_number)
+        return {'boxes': self.boxes, 'next_sequence_number': next_sequence_number}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the storage from a checkpoint.
+
+        :param state: The state of the storage.
+        """
+        self.boxes = state['boxes']
+        self.counter = count(state['next_sequence_number'])
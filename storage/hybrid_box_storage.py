@@ -1,12 +1,18 @@
 import math
+from concurrent.futures import ThreadPoolExecutor
 from functools import cmp_to_key
+from heapq import merge
+from time import perf_counter_ns
+from typing import Iterable
 from sortedcontainers import SortedSet
-from sqlalchemy import Column, Integer, Float, String, create_engine, MetaData, Table, Index, insert, Row
-from sqlalchemy.exc import ProgrammingError
+from sqlalchemy import Column, Integer, Float, String, create_engine, MetaData, Table, Index, insert, Row, and_, or_, \
+    delete
 from sqlalchemy.orm import sessionmaker
 
 from detail.detail import Detail
 from storage.abstract_box_storage import BoxStorage
+from storage.database_checkpoint import DatabaseCheckpointMarker
+from storage.storage_metrics import StorageMetrics
 
 
 class HybridBoxStorage(BoxStorage):
@@ -15,30 +21,92 @@ class HybridBoxStorage(BoxStorage):
 
     This hybrid storage uses three caches:
     - `to_add_cache`: A cache for storing boxes to be added to the database.
-    - `to_delete_cache`: A cache for storing boxes to be deleted from the database.
+    - `to_delete_cache`: A cache for storing primary keys of boxes to be deleted from the database.
     - `max_cache`: A cache for storing the largest boxes retrieved from the database.
 
+    In background flush mode, synchronization with the database runs on a worker thread. When `to_add_cache`
+    overflows, it is swapped out for an empty buffer and flushed together with `to_delete_cache` while placement
+    continues, and the next window of the largest boxes is prefetched into `max_cache` before it runs dry. Boxes
+    that are larger than the last box loaded from the database are kept in `max_cache` instead of being flushed,
+    and if `max_cache` grows beyond `cache_size`, its smallest boxes are returned to the database, so `max_cache`
+    always holds boxes at least as large as any box in the database that has not been loaded yet.
+
+    Once the first checkpoint is taken, changes are committed only at checkpoints, so after a crash the database
+    rolls back to the state saved in the latest checkpoint, and a storage restored from the checkpoint reconnects
+    to the existing table instead of recreating it.
+
     Attributes:
+        db_url (str): The URL of the database.
+        table_name (str): The name of the table to store boxes.
         engine (Engine): The SQLAlchemy engine for connecting to the database.
         session (Session): The SQLAlchemy session for interacting with the database.
         boxes_table (Table): The SQLAlchemy Table object representing the boxes table.
         cache_size (int): The maximum size of the in-memory cache.
         to_add_cache (SortedSet[Detail]): A sorted set of boxes to be added to the database.
         max_cache (SortedSet[Detail]): A sorted set of the largest boxes retrieved from the database.
-        to_delete_cache (list[Detail]): A list of boxes to be deleted from the database.
+        to_delete_cache (list[int]): A list of primary keys of boxes to be deleted from the database.
+        max_cache_ids (dict[Detail, int]): Primary keys of the boxes in `max_cache` that were loaded from the
+            database.
+        background_flush (bool): Whether synchronization with the database runs on a worker thread.
+        prefetch_threshold (int): The size of `max_cache` at which the next window is prefetched in background
+            flush mode.
+        executor (ThreadPoolExecutor): The worker thread used in background flush mode, or None.
+        pending_task (Future): The database task running on the worker thread, or None.
+        loaded_boundary (float): In background flush mode, the minimum side that separates boxes kept in memory
+            from boxes in the database that have not been loaded, or None if every box in the database can be
+            loaded. Boxes in `max_cache` are not smaller and such boxes in the database are not larger than it.
+        boundary_ids (set[int]): Primary keys of the loaded boxes whose minimum side equals `loaded_boundary`.
+        unloaded_rows (int): The number of rows in the database that have not been loaded into `max_cache`.
+        metrics (StorageMetrics): Durations and sizes of flushes, deletions and refills of `max_cache`, and in
+            background flush mode the time spent waiting for the worker thread.
+        checkpoint_marker (DatabaseCheckpointMarker): The table storing the number of the latest checkpoint.
+        commit_at_checkpoints (bool): Whether changes are committed only at checkpoints.
+        checkpoint_number (int): The number of the latest checkpoint.
     """
 
-    def __init__(self, db_url: str, table_name: str = 'boxes', cache_size: int = 1000000):
+    def __init__(self, db_url: str, table_name: str = 'boxes', cache_size: int = 1000000,
+                 background_flush: bool = False, prefetch_threshold: int = None):
         """
         Initializes the HybridBoxStorage with the given database URL, table name, and cache size.
 
         :param db_url: The URL of the database to connect to.
         :param table_name: The name of the table to store boxes (default is 'boxes').
         :param cache_size: The maximum size of the in-memory cache.
+        :param background_flush: Whether synchronization with the database runs on a worker thread
+            (default is False).
+        :param prefetch_threshold: The size of `max_cache` at which the next window is prefetched in background
+            flush mode (default is a quarter of `cache_size`).
         """
-        self.engine = create_engine(db_url)
+        self.db_url = db_url
+        self.table_name = table_name
+        metadata = self._connect()
+        self._drop_existing_table()
+        metadata.create_all(self.engine)
+        self.cache_size = cache_size
+        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.to_delete_cache = []
+        self.max_cache_ids = {}
+        self.background_flush = background_flush
+        self.prefetch_threshold = prefetch_threshold if prefetch_threshold is not None else cache_size // 4
+        self.executor = ThreadPoolExecutor(max_workers=1) if background_flush else None
+        self.pending_task = None
+        self.loaded_boundary = None
+        self.boundary_ids = set()
+        self.unloaded_rows = 0
+        self.metrics = StorageMetrics()
+        self.commit_at_checkpoints = False
+        self.checkpoint_number = 0
+
+    def _connect(self) -> MetaData:
+        """
+        Connect to the database and build the table objects without creating any tables.
+
+        :return: The metadata of the tables.
+        """
+        self.engine = create_engine(self.db_url)
         metadata = MetaData()
-        self.boxes_table = Table(table_name, metadata,
+        self.boxes_table = Table(self.table_name, metadata,
                                  Column('id', Integer, primary_key=True, autoincrement=True),
                                  Column('bottom_left_x', Float),
                                  Column('bottom_left_y', Float),
@@ -48,23 +116,17 @@ class HybridBoxStorage(BoxStorage):
                                  Column('name', String),
                                  Column('detail_type', String),
                                  Index('idx_min_size', 'min_size'))
-        self._drop_existing_table()
-        metadata.create_all(self.engine)
+        self.checkpoint_marker = DatabaseCheckpointMarker(metadata, self.table_name)
         session = sessionmaker(bind=self.engine)
         self.session = session()
-        self.cache_size = cache_size
-        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
-        self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
-        self.to_delete_cache = []
+        return metadata
 
     def _drop_existing_table(self) -> None:
         """
         Drop the existing table with the specified table name if it exists.
         """
-        try:
-            self.boxes_table.drop(self.engine)
-        except ProgrammingError:
-            pass
+        self.boxes_table.drop(self.engine, checkfirst=True)
+        self.checkpoint_marker.marker_table.drop(self.engine, checkfirst=True)
 
     def add_box(self, detail: Detail) -> None:
         """
@@ -74,7 +136,10 @@ class HybridBoxStorage(BoxStorage):
         """
         self.to_add_cache.add(detail)
         if len(self.to_add_cache) > self.cache_size:
-            self._update_caches()
+            if self.background_flush:
+                self._flush_in_background()
+            else:
+                self._update_caches()
 
     def get_max_box(self) -> Detail:
         """
@@ -82,6 +147,8 @@ class HybridBoxStorage(BoxStorage):
 
         :return: The largest box.
         """
+        if self.background_flush:
+            self._ensure_max_cache_loaded()
         max_from_to_add_cache = self.to_add_cache[0] if len(self.to_add_cache) > 0 else None
         max_from_max_cache = self.max_cache[0] if len(self.max_cache) > 0 else None
         return max_from_max_cache \
@@ -92,19 +159,158 @@ class HybridBoxStorage(BoxStorage):
         """
         Retrieve and remove the largest box from the hybrid storage.
 
-        :return: The largest box.
+        :return: The largest box, or None if the storage is empty.
         """
+        if self.background_flush:
+            self._ensure_max_cache_loaded()
         max_from_to_add_cache = self.to_add_cache[0] if len(self.to_add_cache) > 0 else None
         max_from_max_cache = self.max_cache[0] if len(self.max_cache) > 0 else None
+        if max_from_max_cache is None and max_from_to_add_cache is None:
+            return None
         if self._detail_comparator(max_from_to_add_cache, max_from_max_cache) >= 0:
-            self.to_delete_cache.append(self.max_cache.pop(0))
-            if len(self.max_cache) == 0:
+            box_id = self.max_cache_ids.pop(self.max_cache.pop(0), None)
+            if box_id is not None:
+                self.to_delete_cache.append(box_id)
+            if self.background_flush:
+                if len(self.max_cache) <= self.prefetch_threshold:
+                    self._prefetch_in_background()
+            elif len(self.max_cache) == 0:
                 self._update_caches()
             return max_from_max_cache
         else:
             self.to_add_cache.pop(0)
             return max_from_to_add_cache
 
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the hybrid storage.
+        The boxes are added to `to_add_cache`, which is flushed at most once after all of them are added.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        add = self.to_add_cache.add
+        for detail in details:
+            add(detail)
+        if len(self.to_add_cache) > self.cache_size:
+            if self.background_flush:
+                self._flush_in_background()
+            else:
+                self._update_caches()
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+
+        Matching boxes are removed from both caches with slice deletions. If all boxes of `max_cache` match,
+        the next window is loaded from the database and the removal continues, so the database is queried once
+        per window rather than once per box.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        from_to_add_cache = self._pop_prefix(self.to_add_cache, min_size_threshold)
+        from_max_cache = []
+        while True:
+            if self.background_flush:
+                self._ensure_max_cache_loaded()
+            if len(self.max_cache) == 0:
+                break
+            boxes = self._pop_prefix(self.max_cache, min_size_threshold)
+            for detail in boxes:
+                box_id = self.max_cache_ids.pop(detail, None)
+                if box_id is not None:
+                    self.to_delete_cache.append(box_id)
+            from_max_cache.extend(boxes)
+            if len(self.max_cache) > 0:
+                break
+            if not self.background_flush:
+                self._update_caches()
+        if self.background_flush and len(self.max_cache) <= self.prefetch_threshold:
+            self._prefetch_in_background()
+        return list(merge(from_max_cache, from_to_add_cache, key=lambda detail: -detail.min_size))
+
+    @staticmethod
+    def _pop_prefix(boxes: SortedSet, min_size_threshold: float) -> list[Detail]:
+        """
+        Remove the largest boxes from a sorted set while their minimum side is not less than the threshold.
+
+        :param boxes: A sorted set of boxes.
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        count = 0
+        for detail in boxes:
+            if detail.min_size < min_size_threshold:
+                break
+            count += 1
+        prefix = boxes[:count]
+        del boxes[:count]
+        return prefix
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current sizes of the caches, and in background flush mode the number of rows in the database
+        that have not been loaded.
+
+        :return: A dictionary of sizes by their names.
+        """
+        sizes = {'to_add_cache': len(self.to_add_cache), 'max_cache': len(self.max_cache),
+                 'to_delete_cache': len(self.to_delete_cache)}
+        if self.background_flush:
+            sizes['unloaded_rows'] = self.unloaded_rows
+        return sizes
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Wait for the database task running in background flush mode and commit the current transaction together
+        with the number of the new checkpoint. The caches are saved with the storage, so only the changes made
+        since the previous checkpoint are written. From now on, changes are committed only at checkpoints.
+        """
+        self._wait_for_pending_task()
+        self.commit_at_checkpoints = True
+        self.checkpoint_number += 1
+        self.checkpoint_marker.write(self.session, self.checkpoint_number)
+        self.session.commit()
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the storage for pickling, without the connection to the database and the worker thread.
+
+        :return: The state of the storage.
+        """
+        state = self.__dict__.copy()
+        for name in ('engine', 'session', 'boxes_table', 'checkpoint_marker', 'executor', 'pending_task'):
+            del state[name]
+        state['to_add_cache'] = list(self.to_add_cache)
+        state['max_cache'] = list(self.max_cache)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the storage from a checkpoint and reconnect to the existing table.
+
+        :param state: The state of the storage.
+        :raises CheckpointException: If the table has been changed after the checkpoint.
+        """
+        self.__dict__.update(state)
+        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        for detail in state['to_add_cache']:
+            self.to_add_cache.add(detail)
+        for detail in state['max_cache']:
+            self.max_cache.add(detail)
+        self.executor = ThreadPoolExecutor(max_workers=1) if self.background_flush else None
+        self.pending_task = None
+        self._connect()
+        self.checkpoint_marker.verify(self.session, self.checkpoint_number)
+
+    def _commit(self) -> None:
+        """
+        Commit the current transaction, unless changes are committed only at checkpoints.
+        """
+        if not self.commit_at_checkpoints:
+            self.session.commit()
+
     def _update_caches(self) -> None:
         """
         Update all caches by syncing the in-memory caches with the database.
@@ -122,43 +328,231 @@ class HybridBoxStorage(BoxStorage):
         Update the `to_add_cache` by inserting its contents into the database.
         """
         BATCH_SIZE = 1000000
-        values = [
-            {
-                'bottom_left_x': detail.bottom_left[0],
-                'bottom_left_y': detail.bottom_left[1],
-                'top_right_x': detail.top_right[0],
-                'top_right_y': detail.top_right[1],
-                'min_size': min(detail.width, detail.height),
-                'name': detail.name,
-                'detail_type': detail.detail_type
-            }
-            for detail in self.to_add_cache
-        ]
+        start = perf_counter_ns()
+        values = self._details_to_rows(self.to_add_cache)
         for i in range(0, len(values), BATCH_SIZE):
             batch = values[i:i + BATCH_SIZE]
             self.session.execute(insert(self.boxes_table), batch)
-            self.session.commit()
+            self._commit()
         self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.metrics.record('flush_ns', perf_counter_ns() - start)
+        self.metrics.record('flush_rows', len(values))
 
     def _update_to_delete_cache(self) -> None:
         """
         Update the `to_delete_cache` by deleting its contents from the database.
         """
-        detail_names = [detail.name for detail in self.to_delete_cache]
-        self.session.query(self.boxes_table).filter(self.boxes_table.c.name.in_(detail_names)).delete(
-            synchronize_session=False)
-        self.session.commit()
+        start = perf_counter_ns()
+        self._delete_by_ids(self.to_delete_cache)
+        self._commit()
+        self.metrics.record('delete_ns', perf_counter_ns() - start)
+        self.metrics.record('delete_rows', len(self.to_delete_cache))
         self.to_delete_cache = []
 
+    def _delete_by_ids(self, box_ids: list[int]) -> None:
+        """
+        Delete boxes from the database by their primary keys, in chunks of bounded size.
+
+        :param box_ids: Primary keys of the boxes to be deleted.
+        """
+        CHUNK_SIZE = 10000
+        for i in range(0, len(box_ids), CHUNK_SIZE):
+            self.session.execute(delete(self.boxes_table).where(
+                self.boxes_table.c.id.in_(box_ids[i:i + CHUNK_SIZE])))
+
     def _update_max_cache(self) -> None:
         """
         Update the `max_cache` by retrieving the largest boxes from the database.
         """
+        start = perf_counter_ns()
         self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
-        rows = self.session.query(self.boxes_table).order_by(self.boxes_table.c.min_size.desc()) \
-            .limit(self.cache_size).all()
+        self.max_cache_ids = {}
+        rows = self.session.query(self.boxes_table) \
+            .order_by(self.boxes_table.c.min_size.desc(), self.boxes_table.c.id).limit(self.cache_size).all()
         for row in rows:
-            self.max_cache.add(self._row_to_detail(row))
+            detail = self._row_to_detail(row)
+            self.max_cache.add(detail)
+            self.max_cache_ids[detail] = row.id
+        self.metrics.record('refill_ns', perf_counter_ns() - start)
+        self.metrics.record('refill_rows', len(rows))
+
+    def close(self) -> None:
+        """
+        Wait for the database task running in background flush mode and stop the worker thread.
+        """
+        if self.executor is not None:
+            self._wait_for_pending_task()
+            self.executor.shutdown()
+            self.executor = None
+
+    def _flush_in_background(self) -> None:
+        """
+        Swap out `to_add_cache` and `to_delete_cache` and flush them to the database on the worker thread.
+
+        Only one database task runs at a time, so the swapped-out buffers are flushed while the new ones are filled.
+        Boxes larger than the last box loaded from the database are moved to `max_cache` instead of the database,
+        and if `max_cache` grows beyond `cache_size`, its smallest boxes are returned to the database.
+        If `max_cache` is running low, the next window is loaded in the same task right after the flush.
+        """
+        self._wait_for_pending_task()
+        boxes = list(self.to_add_cache)
+        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        if self.unloaded_rows == 0:
+            moved_count = max(0, self.cache_size - len(self.max_cache))
+            self.max_cache.update(boxes[:moved_count])
+            boxes = boxes[moved_count:]
+            self._move_boundary_to_max_cache_end()
+        if self.loaded_boundary is not None:
+            moved_count = 0
+            while moved_count < len(boxes) and \
+                    boxes[moved_count].min_size > self.loaded_boundary:
+                moved_count += 1
+            self.max_cache.update(boxes[:moved_count])
+            boxes = boxes[moved_count:]
+        excess = len(self.max_cache) - self.cache_size
+        if excess > 0:
+            evicted = self.max_cache[-excess:]
+            del self.max_cache[-excess:]
+            for detail in evicted:
+                if self.max_cache_ids.pop(detail, None) is None:
+                    boxes.append(detail)
+                else:
+                    self.unloaded_rows += 1
+            self._move_boundary_to_max_cache_end()
+            self.metrics.increment('evicted_rows', excess)
+        deleted_ids = self.to_delete_cache
+        self.to_delete_cache = []
+        self.unloaded_rows += len(boxes)
+        load = len(self.max_cache) <= self.prefetch_threshold and self.unloaded_rows > 0
+        self.pending_task = self.executor.submit(self._sync_with_database, self._details_to_rows(boxes),
+                                                 deleted_ids, load, self.loaded_boundary,
+                                                 list(self.boundary_ids))
+
+    def _prefetch_in_background(self) -> None:
+        """
+        Load the next window of the largest boxes on the worker thread, together with the pending deletions.
+        Does nothing if a database task is already running or the database has no boxes left to load.
+        """
+        self._collect_finished_task()
+        if self.pending_task is not None or self.unloaded_rows == 0:
+            return
+        deleted_ids = self.to_delete_cache
+        self.to_delete_cache = []
+        self.pending_task = self.executor.submit(self._sync_with_database, [], deleted_ids, True,
+                                                 self.loaded_boundary, list(self.boundary_ids))
+
+    def _move_boundary_to_max_cache_end(self) -> None:
+        """
+        Set the boundary to the smallest box in `max_cache`, or reset it if `max_cache` is empty.
+        Called only when every box in the database that has not been loaded is not larger than this box.
+        """
+        self.boundary_ids = set()
+        if len(self.max_cache) == 0:
+            self.loaded_boundary = None
+            return
+        smallest = self.max_cache[-1]
+        self.loaded_boundary = smallest.min_size
+        for detail in reversed(self.max_cache):
+            if detail.min_size != self.loaded_boundary:
+                break
+            if detail in self.max_cache_ids:
+                self.boundary_ids.add(self.max_cache_ids[detail])
+
+    def _ensure_max_cache_loaded(self) -> None:
+        """
+        Make sure that `max_cache` is not empty while the database still has boxes that have not been loaded,
+        waiting for the worker thread if necessary.
+        """
+        self._collect_finished_task()
+        if len(self.max_cache) == 0 and self.unloaded_rows > 0:
+            self._wait_for_pending_task()
+            if len(self.max_cache) == 0 and self.unloaded_rows > 0:
+                self._prefetch_in_background()
+                self._wait_for_pending_task()
+
+    def _collect_finished_task(self) -> None:
+        """
+        Collect the result of the database task if it has finished, without waiting.
+        """
+        if self.pending_task is not None and self.pending_task.done():
+            self._wait_for_pending_task()
+
+    def _wait_for_pending_task(self) -> None:
+        """
+        Wait for the database task to finish and add the boxes it loaded to `max_cache`.
+        """
+        if self.pending_task is None:
+            return
+        task = self.pending_task
+        self.pending_task = None
+        start = perf_counter_ns()
+        details, box_ids = task.result()
+        self.metrics.record('background_wait_ns', perf_counter_ns() - start)
+        if len(details) > 0:
+            self.max_cache.update(details)
+            self.max_cache_ids.update(zip(details, box_ids))
+            last_min_size = details[-1].min_size
+            if last_min_size != self.loaded_boundary:
+                self.loaded_boundary = last_min_size
+                self.boundary_ids = set()
+            for detail, box_id in zip(details, box_ids):
+                if detail.min_size == last_min_size:
+                    self.boundary_ids.add(box_id)
+            self.unloaded_rows -= len(details)
+
+    def _sync_with_database(self, rows: list[dict], deleted_ids: list[int], load: bool, boundary: float,
+                            boundary_ids: list[int]) -> tuple[list[Detail], list[int]]:
+        """
+        Insert and delete boxes in the database and optionally load the next window of the largest boxes.
+        Runs on the worker thread in background flush mode.
+
+        :param rows: Rows of the boxes to be inserted into the database.
+        :param deleted_ids: Primary keys of the boxes to be deleted from the database.
+        :param load: Whether the next window of the largest boxes should be loaded.
+        :param boundary: The boundary between loaded boxes and boxes that have not been loaded, or None.
+        :param boundary_ids: Primary keys of the loaded boxes whose minimum side equals the boundary.
+        :return: The loaded boxes and their primary keys.
+        """
+        start = perf_counter_ns()
+        if len(rows) > 0:
+            self.session.execute(insert(self.boxes_table), rows)
+        self._delete_by_ids(deleted_ids)
+        self._commit()
+        self.metrics.record('flush_rows', len(rows))
+        self.metrics.record('delete_rows', len(deleted_ids))
+        if not load:
+            self.metrics.record('background_sync_ns', perf_counter_ns() - start)
+            return [], []
+        query = self.session.query(self.boxes_table)
+        if boundary is not None:
+            query = query.filter(or_(self.boxes_table.c.min_size < boundary,
+                                     and_(self.boxes_table.c.min_size == boundary,
+                                          self.boxes_table.c.id.not_in(boundary_ids))))
+        rows = query.order_by(self.boxes_table.c.min_size.desc(), self.boxes_table.c.id).limit(self.cache_size).all()
+        self.metrics.record('refill_rows', len(rows))
+        self.metrics.record('background_sync_ns', perf_counter_ns() - start)
+        return [self._row_to_detail(row) for row in rows], [row.id for row in rows]
+
+    @staticmethod
+    def _details_to_rows(details) -> list[dict]:
+        """
+        Convert boxes to rows of the boxes table.
+
+        :param details: An iterable of Detail objects representing the boxes.
+        :return: A list of rows of the boxes table.
+        """
+        return [
+            {
+                'bottom_left_x': detail.bottom_left[0],
+                'bottom_left_y': detail.bottom_left[1],
+                'top_right_x': detail.top_right[0],
+                'top_right_y': detail.top_right[1],
+                'min_size': detail.min_size,
+                'name': detail.name,
+                'detail_type': detail.detail_type
+            }
+            for detail in details
+        ]
 
     @staticmethod
     def _detail_comparator(detail1: Detail, detail2: Detail) -> float:
@@ -175,7 +569,7 @@ class HybridBoxStorage(BoxStorage):
             return math.inf
         if detail2 is None:
             return -math.inf
-        return min(detail2.width, detail2.height) - min(detail1.width, detail1.height)
+        return detail2.min_size - detail1.min_size
 
     @staticmethod
     def _row_to_detail(row: Row) -> Detail:
@@ -1,11 +1,18 @@
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, Float, String, Index, insert, DDL, Row
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, Float, String, Index, insert, DDL, Row, \
+    delete, select, func, table, column, TableClause
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import ProgrammingError
 from sortedcontainers import SortedSet
 from functools import cmp_to_key
+from bisect import bisect_left
+from heapq import merge
+from time import perf_counter_ns
+from typing import Iterable
 import math
 from detail.detail import Detail
 from storage.abstract_box_storage import BoxStorage
+from storage.database_checkpoint import DatabaseCheckpointMarker
+from storage.storage_metrics import StorageMetrics
 
 
 class HybridPartitionedBoxStorage(BoxStorage):
@@ -14,24 +21,51 @@ class HybridPartitionedBoxStorage(BoxStorage):
 
     This hybrid storage uses three caches:
     - `to_add_cache`: A cache for storing boxes to be added to the database.
-    - `to_delete_cache`: A cache for storing boxes to be deleted from the database.
+    - `to_delete_cache`: A cache for storing primary keys of boxes to be deleted from the database.
     - `max_cache`: A cache for storing the largest boxes retrieved from the database.
     Additionally, it supports partitioning based on box sizes.
 
+    Partitions are managed adaptively. The storage tracks the number of rows in every partition, skips empty
+    partitions when refilling `max_cache`, truncates a partition instead of deleting its rows one by one when all of
+    them are consumed, and splits a partition at its median box size when it grows beyond `split_factor` times
+    `boxes_in_partition` rows. A partition whose boxes are too close in size to be split is tried again only after
+    it grows `split_factor` times, so the median query is not repeated on every flush.
+
+    Once the first checkpoint is taken, changes are committed only at checkpoints, so after a crash the database
+    rolls back to the state saved in the latest checkpoint, and a storage restored from the checkpoint reconnects
+    to the existing tables instead of recreating them.
+
     Attributes:
+        db_url (str): The URL of the database.
+        table_name (str): The name of the table to store boxes.
         engine (Engine): The SQLAlchemy engine for connecting to the database.
         session (Session): The SQLAlchemy session for interacting with the database.
         boxes_table (Table): The SQLAlchemy Table object representing the boxes table.
         cache_size (int): The maximum size of the in-memory cache.
         to_add_cache (SortedSet[Detail]): A sorted set of boxes to be added to the database.
         max_cache (SortedSet[Detail]): A sorted set of the largest boxes retrieved from the database.
-        to_delete_cache (list[Detail]): A list of boxes to be deleted from the database.
+        to_delete_cache (list[tuple[int, float]]): A list of `(id, min_size)` primary keys of boxes to be deleted
+            from the database.
+        max_cache_ids (dict[Detail, int]): Primary key ids of the boxes in `max_cache`.
         partition_ranges (list[tuple[float]]): A list of tuples representing the partition boundaries.
             Each tuple contains two floats, indicating the minimum and maximum box sizes for that partition.
+            Partitions are ordered from the largest boxes to the smallest ones.
+        partition_names (list[str]): The names of the partitions, in the same order as `partition_ranges`.
+        partition_counts (list[int]): The number of rows in each partition, in the same order as `partition_ranges`.
+        boxes_in_partition (int): Approximate number of boxes in one partition.
+        split_factor (float): A partition is split once it holds more than `split_factor * boxes_in_partition` rows.
+        failed_split_counts (list[int]): The number of rows in each partition at the last failed attempt to split it,
+            or 0 if there was no such attempt, in the same order as `partition_ranges`.
+        next_partition_number (int): The number used in the name of the next created partition.
+        metrics (StorageMetrics): Durations and sizes of flushes, deletions, refills of `max_cache` and partition
+            queries, and the numbers of truncated and split partitions.
+        checkpoint_marker (DatabaseCheckpointMarker): The table storing the number of the latest checkpoint.
+        commit_at_checkpoints (bool): Whether changes are committed only at checkpoints.
+        checkpoint_number (int): The number of the latest checkpoint.
     """
 
     def __init__(self, db_url: str, n0: int, gamma: float, max_placed: int, boxes_in_partition: int = 1000000,
-                 table_name: str = 'boxes', cache_size: int = 1000000):
+                 table_name: str = 'boxes', cache_size: int = 1000000, split_factor: float = 2):
         """
         Initializes the HybridPartitionedBoxStorage with the given database URL, partitioning parameters,
         table name, and cache size.
@@ -43,10 +77,43 @@ class HybridPartitionedBoxStorage(BoxStorage):
         :param boxes_in_partition: Approximate number of boxes in one partition.
         :param table_name: The name of the table to store boxes (default is 'boxes').
         :param cache_size: The maximum size of the in-memory cache.
+        :param split_factor: A partition is split once it holds more than `split_factor * boxes_in_partition` rows
+            (default is 2).
+        """
+        self.db_url = db_url
+        self.table_name = table_name
+        metadata = self._connect()
+        self._drop_existing_table()
+        metadata.create_all(self.engine)
+        self.cache_size = cache_size
+        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.to_delete_cache = []
+        self.max_cache_ids = {}
+        self.boxes_in_partition = boxes_in_partition
+        self.split_factor = split_factor
+        self.partition_ranges = []
+        self._create_partition_ranges(n0, gamma, max_placed, boxes_in_partition)
+        self.partition_names = [f'{self.boxes_table.name}_{i}' for i in range(1, len(self.partition_ranges) + 1)]
+        self.partition_counts = [0] * len(self.partition_ranges)
+        self.failed_split_counts = [0] * len(self.partition_ranges)
+        self.next_partition_number = len(self.partition_ranges) + 1
+        self._negated_lower_bounds = []
+        self._update_partition_bounds()
+        self.metrics = StorageMetrics()
+        self.commit_at_checkpoints = False
+        self.checkpoint_number = 0
+        self._create_partitions()
+
+    def _connect(self) -> MetaData:
+        """
+        Connect to the database and build the table objects without creating any tables.
+
+        :return: The metadata of the tables.
         """
-        self.engine = create_engine(db_url)
+        self.engine = create_engine(self.db_url)
         metadata = MetaData()
-        self.boxes_table = Table(table_name, metadata,
+        self.boxes_table = Table(self.table_name, metadata,
                                  Column('id', Integer, primary_key=True, autoincrement=True),
                                  Column('bottom_left_x', Float),
                                  Column('bottom_left_y', Float),
@@ -57,17 +124,10 @@ class HybridPartitionedBoxStorage(BoxStorage):
                                  Column('detail_type', String),
                                  Index('idx_min_size', 'min_size'),
                                  postgresql_partition_by='RANGE (min_size)')
-        self._drop_existing_table()
-        metadata.create_all(self.engine)
+        self.checkpoint_marker = DatabaseCheckpointMarker(metadata, self.table_name)
         session = sessionmaker(bind=self.engine)
         self.session = session()
-        self.cache_size = cache_size
-        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
-        self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
-        self.to_delete_cache = []
-        self.partition_ranges = []
-        self._create_partition_ranges(n0, gamma, max_placed, boxes_in_partition)
-        self._create_partitions()
+        return metadata
 
     def _drop_existing_table(self) -> None:
         """
@@ -77,6 +137,7 @@ class HybridPartitionedBoxStorage(BoxStorage):
             self.boxes_table.drop(self.engine)
         except ProgrammingError:
             pass
+        self.checkpoint_marker.marker_table.drop(self.engine, checkfirst=True)
 
     def _create_partition_ranges(self, n0: int, gamma: float, max_placed: int, boxes_in_partition: int) -> None:
         """
@@ -104,10 +165,7 @@ class HybridPartitionedBoxStorage(BoxStorage):
         """
         Create partitions based on the defined ranges.
         """
-        i = 1
-        for start, end in self.partition_ranges:
-            partition_name = f'{self.boxes_table.name}_{i}'
-            i += 1
+        for partition_name, (start, end) in zip(self.partition_names, self.partition_ranges):
             ddl = DDL(f'''
                     CREATE TABLE IF NOT EXISTS {partition_name}
                     PARTITION OF {self.boxes_table.name}
@@ -116,6 +174,30 @@ class HybridPartitionedBoxStorage(BoxStorage):
             self.session.execute(ddl)
         self.session.commit()
 
+    def _update_partition_bounds(self) -> None:
+        """
+        Update the lookup list used to find the partition of a box after the partitions have changed.
+        """
+        self._negated_lower_bounds = [-start for start, _ in self.partition_ranges]
+
+    def _find_partition(self, min_size: float) -> int:
+        """
+        Find the partition that stores boxes with the given minimum side.
+
+        :param min_size: The minimum side of a box.
+        :return: The index of the partition in `partition_ranges`.
+        """
+        return bisect_left(self._negated_lower_bounds, -min_size)
+
+    def _partition_table(self, partition_name: str) -> TableClause:
+        """
+        Create a lightweight table construct for querying a partition directly.
+
+        :param partition_name: The name of the partition.
+        :return: The table construct with the columns of the boxes table.
+        """
+        return table(partition_name, *[column(boxes_column.name) for boxes_column in self.boxes_table.columns])
+
     def add_box(self, detail: Detail) -> None:
         """
         Add a box to the hybrid storage.
@@ -142,12 +224,15 @@ class HybridPartitionedBoxStorage(BoxStorage):
         """
         Retrieve and remove the largest box from the hybrid storage.
 
-        :return: The largest box.
+        :return: The largest box, or None if the storage is empty.
         """
         max_from_to_add_cache = self.to_add_cache[0] if len(self.to_add_cache) > 0 else None
         max_from_max_cache = self.max_cache[0] if len(self.max_cache) > 0 else None
+        if max_from_max_cache is None and max_from_to_add_cache is None:
+            return None
         if self._detail_comparator(max_from_to_add_cache, max_from_max_cache) >= 0:
-            self.to_delete_cache.append(self.max_cache.pop(0))
+            detail = self.max_cache.pop(0)
+            self.to_delete_cache.append((self.max_cache_ids.pop(detail), detail.min_size))
             if len(self.max_cache) == 0:
                 self._update_caches()
             return max_from_max_cache
@@ -155,6 +240,118 @@ class HybridPartitionedBoxStorage(BoxStorage):
             self.to_add_cache.pop(0)
             return max_from_to_add_cache
 
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the hybrid storage.
+        The boxes are added to `to_add_cache`, which is flushed at most once after all of them are added.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        add = self.to_add_cache.add
+        for detail in details:
+            add(detail)
+        if len(self.to_add_cache) > self.cache_size:
+            self._update_caches()
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+
+        Matching boxes are removed from both caches with slice deletions. If all boxes of `max_cache` match,
+        the next window is loaded from the database and the removal continues, so the database is queried once
+        per window rather than once per box.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        from_to_add_cache = self._pop_prefix(self.to_add_cache, min_size_threshold)
+        from_max_cache = []
+        while len(self.max_cache) > 0:
+            boxes = self._pop_prefix(self.max_cache, min_size_threshold)
+            for detail in boxes:
+                self.to_delete_cache.append((self.max_cache_ids.pop(detail), detail.min_size))
+            from_max_cache.extend(boxes)
+            if len(self.max_cache) > 0:
+                break
+            self._update_caches()
+        return list(merge(from_max_cache, from_to_add_cache, key=lambda detail: -detail.min_size))
+
+    @staticmethod
+    def _pop_prefix(boxes: SortedSet, min_size_threshold: float) -> list[Detail]:
+        """
+        Remove the largest boxes from a sorted set while their minimum side is not less than the threshold.
+
+        :param boxes: A sorted set of boxes.
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        count = 0
+        for detail in boxes:
+            if detail.min_size < min_size_threshold:
+                break
+            count += 1
+        prefix = boxes[:count]
+        del boxes[:count]
+        return prefix
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current sizes of the caches, the number of partitions and the number of rows in the database.
+
+        :return: A dictionary of sizes by their names.
+        """
+        return {'to_add_cache': len(self.to_add_cache), 'max_cache': len(self.max_cache),
+                'to_delete_cache': len(self.to_delete_cache), 'partitions': len(self.partition_names),
+                'database_rows': sum(self.partition_counts)}
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Commit the current transaction together with the number of the new checkpoint. The caches and
+        the partition layout are saved with the storage, so only the changes made since the previous checkpoint
+        are written. From now on, changes are committed only at checkpoints.
+        """
+        self.commit_at_checkpoints = True
+        self.checkpoint_number += 1
+        self.checkpoint_marker.write(self.session, self.checkpoint_number)
+        self.session.commit()
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the storage for pickling, without the connection to the database.
+
+        :return: The state of the storage.
+        """
+        state = self.__dict__.copy()
+        for name in ('engine', 'session', 'boxes_table', 'checkpoint_marker'):
+            del state[name]
+        state['to_add_cache'] = list(self.to_add_cache)
+        state['max_cache'] = list(self.max_cache)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the storage from a checkpoint and reconnect to the existing tables.
+
+        :param state: The state of the storage.
+        :raises CheckpointException: If the tables have been changed after the checkpoint.
+        """
+        self.__dict__.update(state)
+        self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        for detail in state['to_add_cache']:
+            self.to_add_cache.add(detail)
+        for detail in state['max_cache']:
+            self.max_cache.add(detail)
+        self._connect()
+        self.checkpoint_marker.verify(self.session, self.checkpoint_number)
+
+    def _commit(self) -> None:
+        """
+        Commit the current transaction, unless changes are committed only at checkpoints.
+        """
+        if not self.commit_at_checkpoints:
+            self.session.commit()
+
     def _update_caches(self) -> None:
         """
         Update all caches by syncing the in-memory caches with the database.
@@ -172,55 +369,153 @@ class HybridPartitionedBoxStorage(BoxStorage):
         Update the `to_add_cache` by inserting its contents into the database.
         """
         BATCH_SIZE = 1000000
-        values = [
-            {
-                'bottom_left_x': detail.bottom_left[0],
-                'bottom_left_y': detail.bottom_left[1],
-                'top_right_x': detail.top_right[0],
-                'top_right_y': detail.top_right[1],
-                'min_size': min(detail.width, detail.height),
-                'name': detail.name,
-                'detail_type': detail.detail_type
-            }
-            for detail in self.to_add_cache
-        ]
+        start = perf_counter_ns()
+        values = self._details_to_rows(self.to_add_cache)
+        for value in values:
+            self.partition_counts[self._find_partition(value['min_size'])] += 1
         for i in range(0, len(values), BATCH_SIZE):
             batch = values[i:i + BATCH_SIZE]
             self.session.execute(insert(self.boxes_table), batch)
-            self.session.commit()
+            self._commit()
         self.to_add_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.metrics.record('flush_ns', perf_counter_ns() - start)
+        self.metrics.record('flush_rows', len(values))
+        self._split_large_partitions()
+
+    def _split_large_partitions(self) -> None:
+        """
+        Split every partition that holds more than `split_factor * boxes_in_partition` rows. A partition that could
+        not be split is skipped until it holds `split_factor` times as many rows as at the failed attempt.
+        """
+        max_rows = self.split_factor * self.boxes_in_partition
+        index = 0
+        while index < len(self.partition_ranges):
+            if self.partition_counts[index] > max_rows and \
+                    self.partition_counts[index] >= self.split_factor * self.failed_split_counts[index] and \
+                    self._split_partition(index):
+                continue
+            index += 1
+
+    def _split_partition(self, index: int) -> bool:
+        """
+        Split a partition into two partitions at the median minimum side of its boxes.
+        The partition is detached, two new partitions are created for its halves, and its rows are moved into them.
+
+        :param index: The index of the partition in `partition_ranges`.
+        :return: True if the partition was split, False if all its boxes are too close in size to be split.
+        """
+        partition_name = self.partition_names[index]
+        start, end = self.partition_ranges[index]
+        partition = self._partition_table(partition_name)
+        median = self.session.execute(select(partition.c.min_size).order_by(partition.c.min_size)
+                                      .offset(self.partition_counts[index] // 2).limit(1)).scalar()
+        if median is None or median <= start:
+            self.failed_split_counts[index] = self.partition_counts[index]
+            return False
+        split_start = perf_counter_ns()
+        upper_name = f'{self.boxes_table.name}_{self.next_partition_number}'
+        lower_name = f'{self.boxes_table.name}_{self.next_partition_number + 1}'
+        self.next_partition_number += 2
+        self.session.execute(DDL(f'ALTER TABLE {self.boxes_table.name} DETACH PARTITION {partition_name}'))
+        self.session.execute(DDL(f'''
+                CREATE TABLE {upper_name}
+                PARTITION OF {self.boxes_table.name}
+                FOR VALUES FROM ({median}) TO ({end})
+                '''))
+        self.session.execute(DDL(f'''
+                CREATE TABLE {lower_name}
+                PARTITION OF {self.boxes_table.name}
+                FOR VALUES FROM ({start}) TO ({median})
+                '''))
+        self.session.execute(DDL(f'INSERT INTO {self.boxes_table.name} SELECT * FROM {partition_name}'))
+        self.session.execute(DDL(f'DROP TABLE {partition_name}'))
+        self._commit()
+        upper_count = self.session.execute(
+            select(func.count()).select_from(self._partition_table(upper_name))).scalar()
+        self.partition_ranges[index:index + 1] = [(median, end), (start, median)]
+        self.partition_names[index:index + 1] = [upper_name, lower_name]
+        self.partition_counts[index:index + 1] = [upper_count, self.partition_counts[index] - upper_count]
+        self.failed_split_counts[index:index + 1] = [0, 0]
+        self._update_partition_bounds()
+        self.metrics.record('split_ns', perf_counter_ns() - split_start)
+        return True
 
     def _update_to_delete_cache(self) -> None:
         """
         Update the `to_delete_cache` by deleting its contents from the database.
+        Boxes are deleted by id in chunks of bounded size directly from the partitions containing them.
+        A partition whose rows are all deleted is truncated instead.
         """
-        detail_names = [detail.name for detail in self.to_delete_cache]
-        self.session.query(self.boxes_table).filter(self.boxes_table.c.name.in_(detail_names)).delete(
-            synchronize_session=False)
-        self.session.commit()
+        CHUNK_SIZE = 10000
+        start = perf_counter_ns()
+        deleted_ids_by_partition = {}
+        for box_id, min_size in self.to_delete_cache:
+            deleted_ids_by_partition.setdefault(self._find_partition(min_size), []).append(box_id)
+        for index, box_ids in deleted_ids_by_partition.items():
+            partition_name = self.partition_names[index]
+            if len(box_ids) >= self.partition_counts[index]:
+                self.session.execute(DDL(f'TRUNCATE TABLE {partition_name}'))
+                self.partition_counts[index] = 0
+                self.failed_split_counts[index] = 0
+                self.metrics.increment('truncated_partitions')
+                continue
+            partition = self._partition_table(partition_name)
+            for i in range(0, len(box_ids), CHUNK_SIZE):
+                self.session.execute(delete(partition).where(partition.c.id.in_(box_ids[i:i + CHUNK_SIZE])))
+            self.partition_counts[index] -= len(box_ids)
+        self._commit()
+        self.metrics.record('delete_ns', perf_counter_ns() - start)
+        self.metrics.record('delete_rows', len(self.to_delete_cache))
         self.to_delete_cache = []
 
     def _update_max_cache(self) -> None:
         """
         Update the `max_cache` by retrieving the largest boxes from the partitions in the database.
+        Partitions known to be empty are skipped.
         """
+        start = perf_counter_ns()
         self.max_cache = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.max_cache_ids = {}
         remaining_cache_size = self.cache_size
-        partition_index = 1
-        while remaining_cache_size > 0 and partition_index <= len(self.partition_ranges):
-            partition_name = f'{self.boxes_table.name}_{partition_index}'
-            partition_index += 1
-            ddl = DDL(f'''
-                    SELECT * FROM {partition_name}
-                    ORDER BY min_size DESC
-                    LIMIT {remaining_cache_size}
-                    ''')
-            rows = self.session.execute(ddl).fetchall()
+        for partition_name, partition_count in zip(self.partition_names, self.partition_counts):
+            if remaining_cache_size <= 0:
+                break
+            if partition_count == 0:
+                continue
+            partition = self._partition_table(partition_name)
+            query_start = perf_counter_ns()
+            rows = self.session.execute(select(partition).order_by(partition.c.min_size.desc(), partition.c.id)
+                                        .limit(remaining_cache_size)).fetchall()
+            self.metrics.record('partition_query_ns', perf_counter_ns() - query_start)
+            self.metrics.record('partition_query_rows', len(rows))
             for row in rows:
-                self.max_cache.add(self._row_to_detail(row))
+                detail = self._row_to_detail(row)
+                self.max_cache.add(detail)
+                self.max_cache_ids[detail] = row.id
             remaining_cache_size -= len(rows)
-            if remaining_cache_size <= 0 or partition_index > len(self.partition_ranges):
-                break
+        self.metrics.record('refill_ns', perf_counter_ns() - start)
+        self.metrics.record('refill_rows', self.cache_size - remaining_cache_size)
+
+    @staticmethod
+    def _details_to_rows(details) -> list[dict]:
+        """
+        Convert boxes to rows of the boxes table.
+
+        :param details: An iterable of Detail objects representing the boxes.
+        :return: A list of rows of the boxes table.
+        """
+        return [
+            {
+                'bottom_left_x': detail.bottom_left[0],
+                'bottom_left_y': detail.bottom_left[1],
+                'top_right_x': detail.top_right[0],
+                'top_right_y': detail.top_right[1],
+                'min_size': detail.min_size,
+                'name': detail.name,
+                'detail_type': detail.detail_type
+            }
+            for detail in details
+        ]
 
     @staticmethod
     def _detail_comparator(detail1: Detail, detail2: Detail) -> float:
@@ -237,7 +532,7 @@ class HybridPartitionedBoxStorage(BoxStorage):
             return math.inf
         if detail2 is None:
             return -math.inf
-        return min(detail2.width, detail2.height) - min(detail1.width, detail1.height)
+        return detail2.min_size - detail1.min_size
 
     @staticmethod
     def _row_to_detail(row: Row) -> Detail:
@@ -1,4 +1,5 @@
 from functools import cmp_to_key
+from typing import Iterable
 
 from sortedcontainers import SortedSet
 
@@ -28,6 +29,14 @@ class InMemoryBoxStorage(BoxStorage):
         """
         self.boxes.add(detail)
 
+    def keeps_details(self) -> bool:
+        """
+        Check whether the storage returns the added Detail objects as they are. The in-memory storage keeps the objects.
+
+        :return: True.
+        """
+        return True
+
     def get_max_box(self) -> Detail:
         """
         Retrieve the largest box from the in-memory storage without removing it.
@@ -44,6 +53,59 @@ class InMemoryBoxStorage(BoxStorage):
         """
         return self.boxes.pop(0) if len(self.boxes) > 0 else None
 
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the in-memory storage.
+        Boxes with equal minimum sides are kept in the order they were added.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        add = self.boxes.add
+        for detail in details:
+            add(detail)
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes while their minimum side is not less than the threshold.
+        The boxes are removed from the sorted set with a single slice deletion.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        count = 0
+        for detail in self.boxes:
+            if detail.min_size < min_size_threshold:
+                break
+            count += 1
+        boxes = self.boxes[:count]
+        del self.boxes[:count]
+        return boxes
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current number of boxes in the in-memory storage.
+
+        :return: A dictionary with the number of boxes under 'boxes'.
+        """
+        return {'boxes': len(self.boxes)}
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the storage for pickling. The sorted set is saved as a list, since its key is not picklable.
+
+        :return: The state of the storage.
+        """
+        return {'boxes': list(self.boxes)}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the storage from a checkpoint.
+
+        :param state: The state of the storage.
+        """
+        self.boxes = SortedSet(key=cmp_to_key(self._detail_comparator))
+        self.add_boxes(state['boxes'])
+
     @staticmethod
     def _detail_comparator(detail1: Detail, detail2: Detail) -> float:
         """
@@ -53,4 +115,4 @@ class InMemoryBoxStorage(BoxStorage):
         :param detail2: The second detail for comparison.
         :return: Positive if detail1 is larger, negative if detail2 is larger, 0 if equal.
         """
-        return min(detail2.width, detail2.height) - min(detail1.width, detail1.height)
+        return detail2.min_size - detail1.min_size
@@ -0,0 +1,148 @@
+from time import perf_counter_ns
+from typing import Iterable
+
+from detail.detail import Detail
+from storage.abstract_box_storage import BoxStorage
+from storage.storage_metrics import StorageMetrics
+
+
+class InstrumentedBoxStorage(BoxStorage):
+    """
+    A class representing a storage wrapper that measures the operations of another storage.
+
+    Every operation is counted and its latency is recorded in a histogram named after the operation
+    (for example `pop_max_box_ns`), and the number of boxes passed through bulk operations is recorded
+    in `add_boxes_rows` and `pop_boxes_while_rows`. Each operation adds two `perf_counter_ns` calls and a histogram
+    update, so the wrapper can be left enabled in long runs.
+
+    Attributes:
+        box_storage (BoxStorage): The wrapped storage.
+        metrics (StorageMetrics): The metrics of the operations of the wrapped storage.
+    """
+
+    def __init__(self, box_storage: BoxStorage):
+        """
+        Initializes the InstrumentedBoxStorage.
+
+        :param box_storage: The wrapped storage.
+        """
+        self.box_storage = box_storage
+        self.metrics = StorageMetrics()
+
+    def add_box(self, detail: Detail) -> None:
+        """
+        Add a box to the wrapped storage and measure the operation.
+
+        :param detail: A Detail object representing the box to be added to the storage.
+        """
+        start = perf_counter_ns()
+        self.box_storage.add_box(detail)
+        self.metrics.record('add_box_ns', perf_counter_ns() - start)
+
+    def get_max_box(self) -> Detail:
+        """
+        Retrieve the largest box from the wrapped storage without removing it and measure the operation.
+
+        :return: The largest box.
+        """
+        start = perf_counter_ns()
+        max_box = self.box_storage.get_max_box()
+        self.metrics.record('get_max_box_ns', perf_counter_ns() - start)
+        return max_box
+
+    def pop_max_box(self) -> Detail:
+        """
+        Retrieve and remove the largest box from the wrapped storage and measure the operation.
+
+        :return: The largest box.
+        """
+        start = perf_counter_ns()
+        max_box = self.box_storage.pop_max_box()
+        self.metrics.record('pop_max_box_ns', perf_counter_ns() - start)
+        return max_box
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the wrapped storage and measure the operation.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        details = list(details)
+        start = perf_counter_ns()
+        self.box_storage.add_boxes(details)
+        self.metrics.record('add_boxes_ns', perf_counter_ns() - start)
+        self.metrics.record('add_boxes_rows', len(details))
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes from the wrapped storage while their minimum side is not less than
+        the threshold, and measure the operation.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        start = perf_counter_ns()
+        boxes = self.box_storage.pop_boxes_while(min_size_threshold)
+        self.metrics.record('pop_boxes_while_ns', perf_counter_ns() - start)
+        self.metrics.record('pop_boxes_while_rows', len(boxes))
+        return boxes
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current sizes of the wrapped storage.
+
+        :return: A dictionary of sizes by their names.
+        """
+        return self.box_storage.get_sizes()
+
+    def get_snapshot(self) -> dict[str, dict]:
+        """
+        Get the metrics of the operations, the internal metrics of the wrapped storage, and its current sizes.
+
+        :return: A dictionary with the operation metrics under 'operations', the internal metrics of the wrapped
+            storage under 'storage' (empty if it has none) and its sizes under 'sizes'.
+        """
+        storage_metrics = getattr(self.box_storage, 'metrics', None)
+        return {
+            'operations': self.metrics.get_snapshot(),
+            'storage': storage_metrics.get_snapshot() if storage_metrics is not None else {},
+            'sizes': self.get_sizes()
+        }
+
+    def keeps_details(self) -> bool:
+        """
+        Check whether the wrapped storage returns the added Detail objects as they are.
+
+        :return: True if the wrapped storage keeps the Detail objects, False otherwise.
+        """
+        return self.box_storage.keeps_details()
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Bring the wrapped storage to a state that can be saved in a checkpoint.
+        """
+        self.box_storage.prepare_checkpoint()
+
+    def complete_checkpoint(self) -> None:
+        """
+        Let the wrapped storage release resources that are no longer needed once a checkpoint has been saved.
+        """
+        self.box_storage.complete_checkpoint()
+
+    def flush(self) -> None:
+        """
+        Flush the boxes buffered by the wrapped storage, if it buffers them (for example a batched
+        DatabaseBoxStorage).
+        """
+        flush = getattr(self.box_storage, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def close(self) -> None:
+        """
+        Close the wrapped storage, if it has resources to release (for example the worker thread of a HybridBoxStorage
+        or the runs of an ExternalMemoryBoxStorage).
+        """
+        close = getattr(self.box_storage, 'close', None)
+        if close is not None:
+            close()
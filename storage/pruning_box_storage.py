@@ -0,0 +1,161 @@
+from typing import Iterable
+
+from detail.detail import Detail
+from detail.fixed_point import FixedPoint
+from storage.abstract_box_storage import BoxStorage
+
+
+class PruningBoxStorage(BoxStorage):
+    """
+    A class representing a storage wrapper that discards boxes which can never host a future detail.
+
+    The gamma algorithm uses a box only if its minimum side is at least `detail[1] + (1/i)^gamma`, where `i` is the
+    index of the first detail of the new stripe. Both terms decrease during the run, so a box with a minimum side less
+    than the smallest side of any remaining detail plus `(1/(n0 + max_placed - 1))^gamma` can never be chosen.
+    Such boxes are not passed to the wrapped storage; only their number is kept. The layout produced by the algorithm
+    does not change, since a pruned box could never be the largest box suitable for a stripe.
+
+    In the exact mode of the gamma algorithm the sizes of the boxes are fixed-point numbers, so they are compared
+    with the threshold converted by `FixedPoint.from_float`.
+
+    Attributes:
+        box_storage (BoxStorage): The wrapped storage that receives the usable boxes.
+        min_box_size (float): Boxes with a minimum side less than this value are pruned.
+        fixed_min_box_size (FixedPoint): The same threshold as a fixed-point number, used for exact-mode boxes.
+        pruned_count (int): The number of pruned boxes.
+        pruned_by_type (dict[str, int]): The number of pruned boxes of each detail type.
+    """
+
+    def __init__(self, box_storage: BoxStorage, min_box_size: float):
+        """
+        Initializes the PruningBoxStorage.
+
+        :param box_storage: The wrapped storage that receives the usable boxes.
+        :param min_box_size: Boxes with a minimum side less than this value are pruned.
+            See `get_min_usable_box_size`.
+        """
+        self.box_storage = box_storage
+        self.min_box_size = float(min_box_size)
+        self.fixed_min_box_size = min_box_size if isinstance(min_box_size, FixedPoint) \
+            else FixedPoint.from_float(min_box_size)
+        self.pruned_count = 0
+        self.pruned_by_type = {}
+
+    @staticmethod
+    def get_min_usable_box_size(gamma: float, n0: int, max_placed: int, min_detail_side: float) -> float:
+        """
+        Compute the smallest minimum side of a box that may still host a detail during the run.
+
+        :param gamma: The gamma parameter of gamma algorithm.
+        :param n0: The index of the first detail to be placed.
+        :param max_placed: The maximum number of details to place.
+        :param min_detail_side: The smallest height (the side perpendicular to the side on which the detail is
+            placed) among all details of the run. For harmonic generators, it is the height of the last detail.
+        :return: The smallest minimum side of a usable box.
+        """
+        return min_detail_side + pow(1 / (n0 + max_placed - 1), gamma)
+
+    def _is_unusable(self, detail: Detail) -> bool:
+        """
+        Check whether a box can never host a future detail and count it as pruned if so.
+
+        :param detail: A Detail object representing the box.
+        :return: True if the box is pruned, False otherwise.
+        """
+        min_size = detail.min_size
+        threshold = self.fixed_min_box_size if isinstance(min_size, FixedPoint) else self.min_box_size
+        if min_size < threshold:
+            self.pruned_count += 1
+            self.pruned_by_type[detail.detail_type] = self.pruned_by_type.get(detail.detail_type, 0) + 1
+            return True
+        return False
+
+    def add_box(self, detail: Detail) -> None:
+        """
+        Add a box to the wrapped storage, or prune it if it can never host a future detail.
+
+        :param detail: A Detail object representing the box to be added to the storage.
+        """
+        if not self._is_unusable(detail):
+            self.box_storage.add_box(detail)
+
+    def add_boxes(self, details: Iterable[Detail]) -> None:
+        """
+        Add several boxes to the wrapped storage at once, pruning the boxes that can never host a future detail.
+
+        :param details: An iterable of Detail objects representing the boxes to be added to the storage.
+        """
+        usable_boxes = [detail for detail in details if not self._is_unusable(detail)]
+        self.box_storage.add_boxes(usable_boxes)
+
+    def get_max_box(self) -> Detail:
+        """
+        Retrieve the largest box from the wrapped storage without removing it.
+
+        :return: The largest box.
+        """
+        return self.box_storage.get_max_box()
+
+    def pop_max_box(self) -> Detail:
+        """
+        Retrieve and remove the largest box from the wrapped storage.
+
+        :return: The largest box.
+        """
+        return self.box_storage.pop_max_box()
+
+    def pop_boxes_while(self, min_size_threshold: float) -> list[Detail]:
+        """
+        Retrieve and remove the largest boxes from the wrapped storage while their minimum side is not less than
+        the threshold.
+
+        :param min_size_threshold: The smallest minimum side of the boxes to be removed.
+        :return: The removed boxes, from the largest to the smallest.
+        """
+        return self.box_storage.pop_boxes_while(min_size_threshold)
+
+    def get_sizes(self) -> dict[str, int]:
+        """
+        Get the current sizes of the wrapped storage and the number of pruned boxes.
+
+        :return: A dictionary of the sizes of the wrapped storage with the number of pruned boxes under 'pruned'.
+        """
+        return {**self.box_storage.get_sizes(), 'pruned': self.pruned_count}
+
+    def keeps_details(self) -> bool:
+        """
+        Check whether the wrapped storage returns the added Detail objects as they are.
+
+        :return: True if the wrapped storage keeps the Detail objects, False otherwise.
+        """
+        return self.box_storage.keeps_details()
+
+    def prepare_checkpoint(self) -> None:
+        """
+        Bring the wrapped storage to a state that can be saved in a checkpoint.
+        """
+        self.box_storage.prepare_checkpoint()
+
+    def complete_checkpoint(self) -> None:
+        """
+        Let the wrapped storage release resources that are no longer needed once a checkpoint has been saved.
+        """
+        self.box_storage.complete_checkpoint()
+
+    def flush(self) -> None:
+        """
+        Flush the boxes buffered by the wrapped storage, if it buffers them (for example a batched
+        DatabaseBoxStorage).
+        """
+        flush = getattr(self.box_storage, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def close(self) -> None:
+        """
+        Close the wrapped storage, if it has resources to release (for example the worker thread of a HybridBoxStorage
+        or the runs of an ExternalMemoryBoxStorage).
+        """
+        close = getattr(self.box_storage, 'close', None)
+        if close is not None:
+            close()
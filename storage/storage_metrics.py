@@ -0,0 +1,55 @@
+from statistic.histogram import LogHistogram
+
+
+class StorageMetrics:
+    """
+    A class collecting counters and histograms describing the work done by a box storage.
+
+    Histogram names end with `_ns` for durations in nanoseconds (measured with `time.perf_counter_ns`) and with
+    `_rows` for numbers of rows or boxes. Recording a value takes constant time, so metrics can stay enabled
+    in long runs.
+
+    Attributes:
+        counters (dict[str, int]): Counters by their names.
+        histograms (dict[str, LogHistogram]): Histograms by their names.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty StorageMetrics.
+        """
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """
+        Increase a counter.
+
+        :param name: The name of the counter.
+        :param amount: The amount to add to the counter (default is 1).
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name: str, value: int) -> None:
+        """
+        Record a value in a histogram.
+
+        :param name: The name of the histogram.
+        :param value: The value to be recorded.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = LogHistogram()
+            self.histograms[name] = histogram
+        histogram.record(value)
+
+    def get_snapshot(self) -> dict[str, dict]:
+        """
+        Get the current values of all counters and summaries of all histograms.
+
+        :return: A dictionary with the counters under 'counters' and the histogram summaries under 'histograms'.
+        """
+        return {
+            'counters': dict(self.counters),
+            'histograms': {name: histogram.get_summary() for name, histogram in list(self.histograms.items())}
+        }
@@ -0,0 +1,110 @@
+from algorithm.gamma_algorithm import GammaAlgorithm
+from core.checkpoint import CheckpointManager
+from core.detail_placer import DetailPlacer
+from core.resource_budget import ResourceBudget
+from detail.detail import Detail
+from detail.detail_generator import DetailGenerator, HarmonicRectangleDetailGenerator
+from detail.detail_log import DetailLogWriter
+from statistic.event.gamma_algorithm_events import GammaAlgorithmAfterDetailPlacedEvent
+from statistic.listener.gamma_algorithm_listeners import AfterDetailPlacedListener
+from statistic.listener_cost_tracker import ListenerCostTracker
+from storage.abstract_box_storage import BoxStorage
+from storage.heap_box_storage import HeapBoxStorage
+
+GAMMA = 25 / 17
+N0 = 100
+MAX_PLACED = 3000
+
+
+class CrashListener(AfterDetailPlacedListener):
+    """
+    A listener that raises an exception after a number of placed details, to simulate a crash.
+
+    Attributes:
+        crash_at (int): The index of the placed detail after which to raise, or None to never raise. It is not saved
+            in checkpoints, so a placement resumed from a checkpoint does not crash again.
+    """
+
+    crash_at = None
+
+    def __init__(self, crash_at: int = None):
+        """
+        Initialize a CrashListener object.
+
+        :param crash_at: The index of the placed detail after which to raise (default is None, never raise).
+        """
+        self.crash_at = crash_at
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state of the listener for pickling, without the index at which it raises.
+
+        :return: The state of the listener.
+        """
+        state = self.__dict__.copy()
+        state.pop('crash_at', None)
+        return state
+
+    def handle(self, event: GammaAlgorithmAfterDetailPlacedEvent) -> None:
+        """
+        Raise an exception if the detail with the index `crash_at` has been placed.
+
+        :param event: The event that occurs after a detail is placed.
+        """
+        if event.last_placed_index == self.crash_at:
+            raise RuntimeError('crash')
+
+
+def get_base_detail(detail_generator: DetailGenerator) -> Detail:
+    """
+    Create the sheet for the details of a generator.
+
+    :param detail_generator: The detail generator.
+    :return: The sheet.
+    """
+    width, height = detail_generator.get_base_size()
+    return Detail((0, 0), (width, height), 'LRP', 'lrp')
+
+
+def get_layout(placed_details) -> list[tuple]:
+    """
+    Convert placed details to comparable tuples.
+
+    :param placed_details: The placed details.
+    :return: The layout as a list of tuples with coordinates, names and detail types.
+    """
+    return [(detail.bottom_left, detail.top_right, detail.name, detail.detail_type) for detail in placed_details]
+
+
+def create_placer(box_storage: BoxStorage = None, statistic_listeners: list = None, exact: bool = False,
+                  max_placed: int = MAX_PLACED, listener_cost_tracker: ListenerCostTracker = None,
+                  detail_generator: DetailGenerator = None, batch_size: int = 1,
+                  checkpoint_manager: CheckpointManager = None, checkpoint_interval: int = None,
+                  detail_log: DetailLogWriter = None, resource_budget: ResourceBudget = None) -> DetailPlacer:
+    """
+    Create a placer of the details of a generator, by default harmonic rectangles, with the gamma algorithm
+    for GAMMA and N0.
+
+    :param box_storage: The box storage of the algorithm (default is a new HeapBoxStorage).
+    :param statistic_listeners: The statistic listeners of the algorithm (optional).
+    :param exact: Whether the exact mode is used (default is False).
+    :param max_placed: The number of details to place (default is MAX_PLACED).
+    :param listener_cost_tracker: The tracker measuring the listeners (optional).
+    :param detail_generator: The detail generator (default is a generator of harmonic rectangles).
+    :param batch_size: The number of details passed to the algorithm at once (default is 1).
+    :param checkpoint_manager: The manager used to save checkpoints (optional).
+    :param checkpoint_interval: The number of placed details between checkpoints (optional).
+    :param detail_log: The log to stream the layout to (optional).
+    :param resource_budget: The resource budget of the placement (optional).
+    :return: The placer.
+    """
+    if box_storage is None:
+        box_storage = HeapBoxStorage()
+    if detail_generator is None:
+        detail_generator = HarmonicRectangleDetailGenerator(N0, is_width_smaller=False)
+    algorithm = GammaAlgorithm(GAMMA, N0, max_placed, box_storage, statistic_listeners=statistic_listeners,
+                               exact=exact, listener_cost_tracker=listener_cost_tracker)
+    return DetailPlacer(algorithm, detail_generator, get_base_detail(detail_generator), max_placed,
+                        batch_size=batch_size, checkpoint_manager=checkpoint_manager,
+                        checkpoint_interval=checkpoint_interval, detail_log=detail_log,
+                        resource_budget=resource_budget)
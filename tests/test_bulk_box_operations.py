@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+
+from detail.detail import Detail
+from storage.abstract_box_storage import BoxStorage
+from storage.array_box_storage import ArrayBoxStorage
+from storage.database_box_storage import DatabaseBoxStorage
+from storage.external_memory_box_storage import ExternalMemoryBoxStorage
+from storage.heap_box_storage import HeapBoxStorage
+from storage.hybrid_box_storage import HybridBoxStorage
+from storage.hybrid_partitioned_box_storage import HybridPartitionedBoxStorage
+from storage.in_memory_box_storage import InMemoryBoxStorage
+
+# The URL of a PostgreSQL database for the storages that need it. Tests of these storages are skipped without it.
+POSTGRES_URL = os.environ.get('MOSER_GAMMA_POSTGRES_URL')
+
+BOX_COUNT = 300
+SIDES = [0.25 * side for side in range(1, 9)]
+
+
+def create_boxes() -> list[Detail]:
+    """
+    Create boxes with few different sides, so that many of them have equal minimum sides. All coordinates are exact
+    in binary, so the minimum sides of boxes with equal sides stay equal.
+
+    :return: The boxes, each with a unique name.
+    """
+    generator = random.Random(1)
+    boxes = []
+    for index in range(BOX_COUNT):
+        width, height = generator.choice(SIDES), generator.choice(SIDES)
+        boxes.append(Detail((0.0, float(index)), (width, index + height), f'B{index}', 'box'))
+    return boxes
+
+
+class BulkBoxOperationsTest(unittest.TestCase):
+    """
+    Tests that `add_boxes` and `pop_boxes_while` of every box storage remove exactly the boxes not less than
+    the threshold, from the largest one, with equal boxes in insertion order, and leave the rest in place.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def create_storages(self, directory: str) -> dict[str, BoxStorage]:
+        """
+        Create an empty storage of each backend. Small caches and memory sizes make the storages that keep
+        boxes outside of memory use their database or disk part.
+
+        :param directory: The directory for the runs and the SQLite databases of the storages.
+        :return: The storages by their names.
+        """
+        def sqlite_url(name: str) -> str:
+            return f'sqlite:///{os.path.join(directory, name)}.db'
+
+        storages = {
+            'in memory': InMemoryBoxStorage(),
+            'heap': HeapBoxStorage(),
+            'array': ArrayBoxStorage(),
+            'external memory': ExternalMemoryBoxStorage(memory_size=20, directory=directory),
+            'database': DatabaseBoxStorage(sqlite_url('database')),
+            'batched database': DatabaseBoxStorage(sqlite_url('batched_database'), batch_size=50),
+            'hybrid': HybridBoxStorage(sqlite_url('hybrid'), cache_size=20)
+        }
+        if POSTGRES_URL is not None:
+            storages['hybrid partitioned'] = HybridPartitionedBoxStorage(POSTGRES_URL, 10, 1.0, BOX_COUNT,
+                                                                         boxes_in_partition=50, cache_size=20)
+        return storages
+
+    def test_pop_boxes_while(self):
+        boxes = create_boxes()
+        order = sorted(range(BOX_COUNT), key=lambda index: (-boxes[index].min_size, index))
+        for threshold_index, threshold in enumerate((SIDES[-1] + 1, SIDES[-1], SIDES[3], SIDES[0])):
+            directory = os.path.join(self.directory.name, str(threshold_index))
+            expected_popped = [boxes[index].name for index in order if boxes[index].min_size >= threshold]
+            expected_rest = [boxes[index].name for index in order if boxes[index].min_size < threshold]
+            for name, box_storage in self.create_storages(directory).items():
+                with self.subTest(storage=name, threshold=threshold):
+                    box_storage.add_boxes(boxes[:100])
+                    for box in boxes[100:150]:
+                        box_storage.add_box(box)
+                    box_storage.add_boxes(boxes[150:])
+                    popped = box_storage.pop_boxes_while(threshold)
+                    self.assertEqual(expected_popped, [box.name for box in popped])
+                    rest = []
+                    while (box := box_storage.pop_max_box()) is not None:
+                        rest.append(box.name)
+                    self.assertEqual(expected_rest, rest)
+                if hasattr(box_storage, 'close'):
+                    box_storage.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
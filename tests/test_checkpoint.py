@@ -0,0 +1,62 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from core.checkpoint import CheckpointManager
+from core.detail_placer import DetailPlacer
+from detail.detail import Detail
+from detail.placed_details import CheckpointedPlacedDetails
+from tests.helpers import N0, CrashListener, create_placer
+
+CHECKPOINT_INTERVAL = 700
+
+
+class CheckpointedPlacedDetailsTest(unittest.TestCase):
+    """
+    Checks that placed details are restored from the delta file of a checkpoint.
+    """
+
+    def test_changes_after_checkpoint_are_discarded(self):
+        details = [Detail((0.0, float(index)), (1.0, index + 1.0), f'Box{index}', 'normal_box_1') for index in range(5)]
+        with tempfile.TemporaryDirectory() as directory:
+            placed_details = CheckpointedPlacedDetails(os.path.join(directory, 'checkpoint.pkl.details'),
+                                                       details[:2])
+            placed_details.prepare_checkpoint()
+            placed_details.replace(details[0], details[2])
+            placed_details.prepare_checkpoint()
+            placed_details.append(details[3])
+            state = pickle.dumps(placed_details)
+            placed_details.remove(details[1])
+            placed_details.append(details[4])
+            placed_details.prepare_checkpoint()
+            restored = pickle.loads(state)
+            self.assertEqual(list(restored), [details[1], details[2], details[3]])
+            self.assertEqual(os.path.getsize(restored.path), restored.offset)
+            self.assertNotIn(details[0].name.encode(), state)
+
+
+class DetailPlacerResumeTest(unittest.TestCase):
+    """
+    Checks that a placement resumed from a checkpoint after a crash produces the layout of an uninterrupted run.
+    """
+
+    def test_resumed_layout_matches(self):
+        for batch_size in (1, 64):
+            with self.subTest(batch_size=batch_size), tempfile.TemporaryDirectory() as directory:
+                expected = list(create_placer(batch_size=batch_size).run_algorithm())
+                checkpoint_manager = CheckpointManager(os.path.join(directory, 'checkpoint.pkl'))
+                placer = create_placer(statistic_listeners=[CrashListener(N0 + 2 * CHECKPOINT_INTERVAL + 100)],
+                                       batch_size=batch_size, checkpoint_manager=checkpoint_manager,
+                                       checkpoint_interval=CHECKPOINT_INTERVAL)
+                placer.run_algorithm()
+                self.assertEqual(placer.summary['status'], DetailPlacer.FAILED)
+                placer = DetailPlacer.resume(checkpoint_manager)
+                self.assertEqual(placer.num_placed, 2 * CHECKPOINT_INTERVAL)
+                self.assertEqual(list(placer.run_algorithm()), expected)
+                self.assertLess(os.path.getsize(checkpoint_manager.path),
+                                os.path.getsize(checkpoint_manager.details_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from detail.detail import Detail
+from detail.detail_generator import HarmonicRectangleDetailGenerator, HarmonicSquareDetailGenerator
+from detail.detail_log import DetailLogWriter, read_detail_log
+from tests.helpers import N0, create_placer
+
+GENERATORS = {
+    'harmonic rectangle': lambda n0: HarmonicRectangleDetailGenerator(n0, is_width_smaller=False),
+    'harmonic square': lambda n0: HarmonicSquareDetailGenerator(n0)
+}
+
+
+def get_detail_keys(details) -> list[tuple]:
+    """
+    Get the sorted coordinates, names and types of details as floats, so that layouts can be compared regardless
+    of the order of the details.
+
+    :param details: The details.
+    :return: The sorted tuples of the coordinates, the name and the type of each detail.
+    """
+    return sorted((float(detail.bottom_left[0]), float(detail.bottom_left[1]), float(detail.top_right[0]),
+                   float(detail.top_right[1]), detail.name, detail.detail_type) for detail in details)
+
+
+def run_placement(generator_name: str, batch_size: int, detail_log: DetailLogWriter = None):
+    """
+    Run the gamma algorithm on the details of a generator.
+
+    :param generator_name: The name of the generator in GENERATORS.
+    :param batch_size: The number of details passed to the algorithm at once.
+    :param detail_log: The log to stream the layout to (optional).
+    :return: The placed details, or the closed log.
+    """
+    return create_placer(detail_generator=GENERATORS[generator_name](N0), batch_size=batch_size,
+                         detail_log=detail_log).run_algorithm()
+
+
+class DetailLogTest(unittest.TestCase):
+    """
+    Checks that a layout streamed to a detail log is the layout kept in memory by PlacedDetails.
+    """
+
+    def test_log_matches_placed_details(self):
+        for generator_name in GENERATORS:
+            for batch_size in (1, 64):
+                with self.subTest(generator=generator_name, batch_size=batch_size), \
+                        tempfile.TemporaryDirectory() as directory:
+                    placed_details = run_placement(generator_name, batch_size)
+                    detail_log = run_placement(generator_name, batch_size,
+                                               DetailLogWriter(os.path.join(directory, 'layout.csv')))
+                    details = list(read_detail_log(detail_log.path))
+                    self.assertEqual(len(details), len(placed_details))
+                    self.assertEqual(len(detail_log), len(placed_details))
+                    self.assertEqual(get_detail_keys(details), get_detail_keys(placed_details))
+
+    def test_removed_details_are_skipped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            detail_log = DetailLogWriter(os.path.join(directory, 'layout.csv'))
+            box = Detail((0.0, 0.0), (1.0, 0.5), 'B1', 'normal_box_1')
+            detail_log.extend([Detail((0.0, 0.0), (2.0, 2.0), 'LRP', 'lrp'), box])
+            detail_log.remove(box)
+            detail_log.append(Detail((0.0, 0.0), (0.5, 0.5), 'S1', 'detail'))
+            detail_log.append(box)
+            detail_log.remove(box)
+            state = pickle.dumps(detail_log)
+            detail_log.close()
+            self.assertEqual(len(detail_log), 2)
+            self.assertEqual([detail.name for detail in read_detail_log(detail_log.path)], ['S1', 'LRP'])
+            self.assertLess(len(state), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
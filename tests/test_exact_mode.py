@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+
+from algorithm.gamma_algorithm import GammaAlgorithm
+from detail.detail_functions import serialize_details_to_json, deserialize_details_from_json
+from detail.fixed_point import FixedPoint
+from storage.array_box_storage import ArrayBoxStorage
+from storage.external_memory_box_storage import ExternalMemoryBoxStorage
+from storage.heap_box_storage import HeapBoxStorage
+from storage.in_memory_box_storage import InMemoryBoxStorage
+from storage.instrumented_box_storage import InstrumentedBoxStorage
+from storage.pruning_box_storage import PruningBoxStorage
+from tests.helpers import GAMMA, N0, MAX_PLACED, create_placer
+
+
+class ExactModeStorageTest(unittest.TestCase):
+    """
+    Checks that the exact mode is accepted only with box storages that keep Detail objects as they are.
+    """
+
+    def test_storages_keeping_details_are_accepted(self):
+        for box_storage in (InMemoryBoxStorage(), HeapBoxStorage(), InstrumentedBoxStorage(HeapBoxStorage()),
+                            PruningBoxStorage(HeapBoxStorage(), FixedPoint.from_float(0.0))):
+            with self.subTest(storage=type(box_storage).__name__):
+                algorithm = GammaAlgorithm(GAMMA, N0, MAX_PLACED, box_storage, exact=True)
+                self.assertTrue(algorithm.exact)
+
+    def test_storages_encoding_coordinates_are_rejected(self):
+        with ExternalMemoryBoxStorage() as external_storage:
+            for box_storage in (ArrayBoxStorage(), external_storage, InstrumentedBoxStorage(ArrayBoxStorage())):
+                with self.subTest(storage=type(box_storage).__name__):
+                    with self.assertRaises(ValueError):
+                        GammaAlgorithm(GAMMA, N0, MAX_PLACED, box_storage, exact=True)
+                    GammaAlgorithm(GAMMA, N0, MAX_PLACED, box_storage, exact=False)
+
+
+class ExactModeOutputTest(unittest.TestCase):
+    """
+    Checks that an exact layout is placed completely and serialized with float coordinates.
+    """
+
+    def test_exact_layout_is_serialized_as_floats(self):
+        placer = create_placer(exact=True)
+        algorithm = placer.algorithm
+        width, height = placer.detail_generator.get_base_size()
+        placed_details = list(placer.run_algorithm())
+        self.assertEqual(algorithm.last_placed_index, N0 + MAX_PLACED - 1)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'details.json')
+            serialize_details_to_json(placed_details, filename)
+            with open(filename) as file:
+                coordinates = [value for detail in json.load(file)
+                               for value in detail['bottom_left'] + detail['top_right']]
+            details = deserialize_details_from_json(filename)
+        self.assertTrue(all(-1e-9 <= value <= max(width, height) + 1e-9 for value in coordinates))
+        self.assertEqual(len(details), len(placed_details))
+        for detail, placed_detail in zip(details, placed_details):
+            self.assertEqual(detail.bottom_left, tuple(float(value) for value in placed_detail.bottom_left))
+            self.assertEqual(detail.top_right, tuple(float(value) for value in placed_detail.top_right))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+from detail.detail import Detail
+from storage.abstract_box_storage import BoxStorage
+from storage.external_memory_box_storage import ExternalMemoryBoxStorage
+from storage.in_memory_box_storage import InMemoryBoxStorage
+from tests.helpers import create_placer, get_layout
+
+MEMORY_SIZE = 50
+
+
+def run_gamma_algorithm(box_storage: BoxStorage, batch_size: int) -> list[tuple]:
+    """
+    Run the gamma algorithm on harmonic rectangles with the given box storage.
+
+    :param box_storage: The box storage.
+    :param batch_size: The number of details passed to the algorithm at once.
+    :return: The layout as a list of tuples with coordinates, names and detail types.
+    """
+    return get_layout(create_placer(box_storage, batch_size=batch_size).run_algorithm())
+
+
+def pop_all_boxes(box_storage: BoxStorage) -> list[tuple]:
+    """
+    Remove all the boxes from a storage one by one.
+
+    :param box_storage: The box storage.
+    :return: The removed boxes as tuples with coordinates, names and detail types, from the largest one.
+    """
+    boxes = []
+    while (box := box_storage.pop_max_box()) is not None:
+        boxes.append((box.bottom_left, box.top_right, box.name, box.detail_type))
+    return boxes
+
+
+class ExternalMemoryBoxStorageTest(unittest.TestCase):
+    """
+    Tests that the external memory storage, forced to spill and refill many times, behaves like the in-memory
+    storage, and that its runs are removed on close.
+    """
+
+    def test_layout_matches_in_memory_storage(self):
+        for batch_size in (1, 1000):
+            with self.subTest(batch_size=batch_size):
+                expected_storage = InMemoryBoxStorage()
+                expected_layout = run_gamma_algorithm(expected_storage, batch_size)
+                with ExternalMemoryBoxStorage(memory_size=MEMORY_SIZE) as box_storage:
+                    layout = run_gamma_algorithm(box_storage, batch_size)
+                    self.assertEqual(expected_layout, layout)
+                    histograms = box_storage.metrics.get_snapshot()['histograms']
+                    self.assertGreater(histograms['spill_rows']['count'], 1)
+                    self.assertGreater(histograms['refill_rows']['count'], 1)
+                    self.assertEqual(pop_all_boxes(expected_storage), pop_all_boxes(box_storage))
+
+    def test_close_removes_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for run_directory in (None, os.path.join(directory, 'runs')):
+                with self.subTest(directory=run_directory):
+                    box_storage = ExternalMemoryBoxStorage(memory_size=MEMORY_SIZE, directory=run_directory)
+                    run_gamma_algorithm(box_storage, 1)
+                    paths = [run.path for run in box_storage.runs.values()]
+                    self.assertGreater(len(paths), 0)
+                    self.assertTrue(all(os.path.exists(path) for path in paths))
+                    box_storage.close()
+                    self.assertFalse(any(os.path.exists(path) for path in paths))
+                    if run_directory is None:
+                        self.assertFalse(os.path.exists(box_storage.directory))
+                    else:
+                        self.assertEqual(os.listdir(run_directory), [])
+
+    def test_failed_spill_keeps_boxes(self):
+        with ExternalMemoryBoxStorage(memory_size=600) as box_storage:
+            boxes = [Detail((0.0, 0.0), (1 / (index + 1), 1 / (index + 1)), f'B{index}', f'type{index}')
+                     for index in range(601)]
+            with self.assertRaises(ValueError):
+                box_storage.add_boxes(boxes)
+            self.assertEqual(box_storage.get_sizes(), {'memory': 601, 'disk': 0, 'runs': 0})
+            self.assertEqual([box.name for box in box_storage.pop_boxes_while(0)], [box.name for box in boxes])
+
+    def test_refill_does_not_overflow_memory(self):
+        with ExternalMemoryBoxStorage(memory_size=MEMORY_SIZE, refill_size=MEMORY_SIZE) as box_storage:
+            box_storage.add_boxes([Detail((0.0, 0.0), (1 / (index + 1), 1 / (index + 1)), f'B{index}', 'box')
+                                   for index in range(MEMORY_SIZE + 1)])
+            self.assertEqual(box_storage.get_sizes()['runs'], 1)
+            for _ in range(MEMORY_SIZE // 2):
+                box_storage.pop_max_box()
+            box_storage.add_boxes([Detail((0.0, 0.0), (1e-6 / (index + 1), 1e-6 / (index + 1)), f'S{index}', 'box')
+                                   for index in range(MEMORY_SIZE - 10)])
+            box_storage.pop_max_box()
+            self.assertGreater(box_storage.metrics.get_snapshot()['histograms']['refill_rows']['count'], 0)
+            self.assertLessEqual(len(box_storage.boxes), MEMORY_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
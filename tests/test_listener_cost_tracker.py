@@ -0,0 +1,91 @@
+import pickle
+import time
+import unittest
+import warnings
+
+from statistic.event.gamma_algorithm_events import GammaAlgorithmAfterDetailPlacedEvent
+from statistic.listener.default_gamma_algorithm_listeners import PrintInfoAtEnd
+from statistic.listener.gamma_algorithm_listeners import AfterDetailPlacedListener
+from statistic.listener_cost_tracker import ListenerCostTracker
+from statistic.output import NullOutputHandler
+from tests.helpers import create_placer
+
+MAX_PLACED = 500
+
+
+class SlowListener(AfterDetailPlacedListener):
+    """
+    A listener that waits on every placed detail, so that it takes most of the run time.
+    """
+
+    def handle(self, event: GammaAlgorithmAfterDetailPlacedEvent) -> None:
+        """
+        Wait for a short time.
+
+        :param event: The event that occurs after a detail is placed.
+        """
+        time.sleep(0.0002)
+
+
+def run_with_tracker(listener_cost_tracker: ListenerCostTracker, with_slow_listener: bool = True) -> None:
+    """
+    Run the gamma algorithm with a listener called only at the end and, optionally, a slow listener.
+
+    :param listener_cost_tracker: The tracker measuring the listeners.
+    :param with_slow_listener: Whether the slow listener is added (default is True).
+    """
+    listeners = [PrintInfoAtEnd(NullOutputHandler())]
+    if with_slow_listener:
+        listeners.append(SlowListener())
+    create_placer(statistic_listeners=listeners, max_placed=MAX_PLACED,
+                  listener_cost_tracker=listener_cost_tracker).run_algorithm()
+
+
+class ListenerCostTrackerTest(unittest.TestCase):
+    """
+    Tests that the costs of listeners are related to the time of the whole run.
+    """
+
+    def test_report(self):
+        listener_cost_tracker = ListenerCostTracker()
+        run_with_tracker(listener_cost_tracker)
+        report = {cost['listener']: cost for cost in listener_cost_tracker.get_report()}
+        self.assertEqual(report['SlowListener']['calls'], MAX_PLACED)
+        self.assertEqual(report['PrintInfoAtEnd']['calls'], 1)
+        self.assertGreater(report['SlowListener']['fraction'], 0.5)
+        self.assertLess(report['SlowListener']['fraction'], 1)
+        self.assertLess(report['PrintInfoAtEnd']['fraction'], 0.1)
+        self.assertGreaterEqual(listener_cost_tracker.get_run_time(),
+                                sum(cost['time'] for cost in report.values()))
+
+    def test_budget_warning(self):
+        listener_cost_tracker = ListenerCostTracker(budget=0.5, min_run_time=0)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            run_with_tracker(listener_cost_tracker)
+        messages = [str(warning.message) for warning in caught if warning.category is RuntimeWarning]
+        self.assertEqual(len(messages), 1)
+        self.assertIn('SlowListener', messages[0])
+
+    def test_listener_called_at_end_is_within_budget(self):
+        listener_cost_tracker = ListenerCostTracker(budget=0.5, min_run_time=0)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            run_with_tracker(listener_cost_tracker, with_slow_listener=False)
+        self.assertEqual([warning for warning in caught if warning.category is RuntimeWarning], [])
+        self.assertLess(listener_cost_tracker.get_report()[0]['fraction'], 0.5)
+
+    def test_run_time_survives_pickling(self):
+        listener_cost_tracker = ListenerCostTracker()
+        listener_cost_tracker.start_run()
+        time.sleep(0.01)
+        restored = pickle.loads(pickle.dumps(listener_cost_tracker))
+        self.assertIsNone(restored.run_start_time)
+        self.assertGreaterEqual(restored.run_time, 10 ** 7)
+        restored.start_run()
+        restored.end_run()
+        self.assertGreaterEqual(restored.get_run_time(), 10 ** 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
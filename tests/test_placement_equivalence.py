@@ -0,0 +1,192 @@
+import unittest
+
+from algorithm.gamma_algorithm import GammaAlgorithm
+from algorithm.headless_gamma_algorithm import HeadlessGammaAlgorithm
+from core.detail_placer import DetailPlacer
+from detail.detail_generator import HarmonicRectangleDetailGenerator, HarmonicSquareDetailGenerator, \
+    PowerLawSquareDetailGenerator, PowerLawRectangleDetailGenerator
+from statistic.event.gamma_algorithm_events import GammaAlgorithmDetailsPlacedBatchEvent
+from statistic.listener.default_gamma_algorithm_listeners import NormalBoxMaxRatioTracker, \
+    NormalBoxFinalMaxRatioTracker, LrpOccupancyRatioTracker, PrintEachN, PrintInfoAtEnd, ExecutionTimeTracker
+from statistic.listener.gamma_algorithm_listeners import DetailsPlacedBatchListener
+from statistic.output import OutputHandler
+from storage.heap_box_storage import HeapBoxStorage
+from tests.helpers import get_base_detail
+
+GENERATORS = {
+    'harmonic rectangle': lambda n0: HarmonicRectangleDetailGenerator(n0, is_width_smaller=False),
+    'harmonic rectangle, width smaller': lambda n0: HarmonicRectangleDetailGenerator(n0, is_width_smaller=True),
+    'harmonic square': lambda n0: HarmonicSquareDetailGenerator(n0),
+    'power-law square': lambda n0: PowerLawSquareDetailGenerator(n0, 0.8),
+    'power-law rectangle': lambda n0: PowerLawRectangleDetailGenerator(n0, 0.8, is_width_smaller=False)
+}
+
+PARAMETERS = [(25 / 17, 100, 3000), (1.3, 10, 2000), (1.0, 3, 500)]
+
+
+class ListOutputHandler(OutputHandler):
+    """
+    An output handler that keeps the messages in a list.
+
+    Attributes:
+        messages (list[str]): The written messages.
+    """
+
+    def __init__(self):
+        """
+        Initialize a ListOutputHandler object.
+        """
+        self.messages = []
+
+    def write(self, message: str):
+        """
+        Keep a message.
+
+        :param message: The message.
+        """
+        self.messages.append(message)
+
+
+class BatchEndRecorder(DetailsPlacedBatchListener):
+    """
+    A listener that records the index of the last detail of each batch.
+
+    Attributes:
+        batch_ends (list[int]): The indices of the last details of the batches.
+    """
+
+    def __init__(self):
+        """
+        Initialize a BatchEndRecorder object.
+        """
+        self.batch_ends = []
+
+    def handle(self, event: GammaAlgorithmDetailsPlacedBatchEvent) -> None:
+        """
+        Record the index of the last detail of the batch.
+
+        :param event: The event that occurs after a batch of details is placed.
+        """
+        self.batch_ends.append(int(event.indices[-1]))
+
+
+def run_gamma_algorithm(generator_name: str, gamma: float, n0: int, max_placed: int, batch_size: int,
+                        update_placed_details: bool) -> dict:
+    """
+    Run the gamma algorithm with all the default listeners and collect everything that should not depend
+    on the batch size.
+
+    :return: A dictionary with the layout, the messages of the listeners, the remaining boxes and the final state.
+    """
+    detail_generator = GENERATORS[generator_name](n0)
+    outputs = [ListOutputHandler() for _ in range(5)]
+    listeners = [NormalBoxMaxRatioTracker(outputs[0]), NormalBoxFinalMaxRatioTracker(outputs[1]),
+                 LrpOccupancyRatioTracker(outputs[2]), PrintEachN(100, outputs[3]), PrintInfoAtEnd(outputs[4])]
+    box_storage = HeapBoxStorage()
+    algorithm = GammaAlgorithm(gamma, n0, max_placed, box_storage, statistic_listeners=listeners,
+                               update_placed_details=update_placed_details)
+    placed_details = DetailPlacer(algorithm, detail_generator, get_base_detail(detail_generator), max_placed,
+                                  batch_size=batch_size).run_algorithm()
+    remaining_boxes = []
+    while (box := box_storage.pop_max_box()) is not None:
+        remaining_boxes.append((box.bottom_left, box.top_right, box.name, box.detail_type))
+    return {
+        'layout': [(detail.bottom_left, detail.top_right, detail.name, detail.detail_type)
+                   for detail in placed_details],
+        'messages': [output.messages for output in outputs],
+        'remaining_boxes': remaining_boxes,
+        'state': (algorithm.last_placed_index, algorithm.endpoints_placed, algorithm.free_area,
+                  algorithm.lrp.bottom_left, algorithm.lrp.top_right,
+                  algorithm.stripe and (algorithm.stripe.bottom_left, algorithm.stripe.top_right))
+    }
+
+
+class PlaceBatchTest(unittest.TestCase):
+    """
+    Tests that placing details in batches gives the same layout, statistics and state as placing them one by one.
+    """
+
+    def test_place_batch_matches_place_next(self):
+        for generator_name in GENERATORS:
+            for gamma, n0, max_placed in PARAMETERS:
+                for update_placed_details in (True, False):
+                    expected = run_gamma_algorithm(generator_name, gamma, n0, max_placed, 1, update_placed_details)
+                    for batch_size in (7, 1000):
+                        with self.subTest(generator=generator_name, gamma=gamma, n0=n0, batch_size=batch_size,
+                                          update_placed_details=update_placed_details):
+                            actual = run_gamma_algorithm(generator_name, gamma, n0, max_placed, batch_size,
+                                                         update_placed_details)
+                            self.assertEqual(expected, actual)
+
+
+class ExecutionTimeTrackerTest(unittest.TestCase):
+    """
+    Tests that batches end at every block of the execution time tracker, without changing the layout.
+    """
+
+    def test_batches_end_at_blocks(self):
+        gamma, n0, max_placed = PARAMETERS[0]
+        expected = run_gamma_algorithm('harmonic rectangle', gamma, n0, max_placed, 1, True)['layout']
+        block_ends = list(range(n0, n0 + max_placed, 100))
+        for batch_size in (1, 1000):
+            for update_placed_details in (True, False):
+                with self.subTest(batch_size=batch_size, update_placed_details=update_placed_details):
+                    detail_generator = GENERATORS['harmonic rectangle'](n0)
+                    output = ListOutputHandler()
+                    recorder = BatchEndRecorder()
+                    algorithm = GammaAlgorithm(gamma, n0, max_placed, HeapBoxStorage(),
+                                               statistic_listeners=[ExecutionTimeTracker(100, output), recorder],
+                                               update_placed_details=update_placed_details, listener_batch_size=500)
+                    placed_details = DetailPlacer(algorithm, detail_generator, get_base_detail(detail_generator),
+                                                  max_placed, batch_size=batch_size).run_algorithm()
+                    if update_placed_details:
+                        self.assertEqual(expected, [(detail.bottom_left, detail.top_right, detail.name,
+                                                     detail.detail_type) for detail in placed_details])
+                    self.assertEqual(recorder.batch_ends[0], n0)
+                    self.assertTrue(set(block_ends) <= set(recorder.batch_ends))
+                    self.assertEqual(recorder.batch_ends[-1], n0 + max_placed - 1)
+                    self.assertEqual(len(output.messages), len(block_ends) + 1)
+                    self.assertTrue(all(message.startswith(f'Execution time of block {index + 1} of 100 details')
+                                        for index, message in enumerate(output.messages[:-1])))
+                    self.assertTrue(output.messages[-1].startswith('Full execution time'))
+
+
+class HeadlessGammaAlgorithmTest(unittest.TestCase):
+    """
+    Tests that the headless gamma algorithm gives the same statistics and final state as the gamma algorithm.
+    """
+
+    def test_headless_matches_gamma_algorithm(self):
+        for generator_name in GENERATORS:
+            for gamma, n0, max_placed in PARAMETERS:
+                detail_generator = GENERATORS[generator_name](n0)
+                max_ratio_tracker = NormalBoxFinalMaxRatioTracker(ListOutputHandler())
+                lrp_tracker = LrpOccupancyRatioTracker(ListOutputHandler())
+                box_storage = HeapBoxStorage()
+                algorithm = GammaAlgorithm(gamma, n0, max_placed, box_storage,
+                                           statistic_listeners=[max_ratio_tracker, lrp_tracker],
+                                           update_placed_details=False)
+                DetailPlacer(algorithm, detail_generator, get_base_detail(detail_generator), max_placed).run_algorithm()
+                stripe = algorithm.stripe
+                expected = (algorithm.last_placed_index, algorithm.endpoints_placed, max_ratio_tracker.current_max,
+                            lrp_tracker.min_ratio, lrp_tracker.last_ratio,
+                            (*algorithm.lrp.bottom_left, *algorithm.lrp.top_right),
+                            stripe and (*stripe.bottom_left, *stripe.top_right), algorithm.free_area,
+                            sorted((-box.min_size, *box.bottom_left, *box.top_right)
+                                   for box in box_storage.pop_boxes_while(0)))
+                for batch_size in (1, 1000):
+                    with self.subTest(generator=generator_name, gamma=gamma, n0=n0, batch_size=batch_size):
+                        detail_generator = GENERATORS[generator_name](n0)
+                        headless_algorithm = HeadlessGammaAlgorithm(gamma, n0, max_placed)
+                        DetailPlacer(headless_algorithm, detail_generator, get_base_detail(detail_generator),
+                                     max_placed, batch_size=batch_size).run_algorithm()
+                        actual = (headless_algorithm.last_placed_index, headless_algorithm.endpoints_placed,
+                                  headless_algorithm.max_ratio, headless_algorithm.min_lrp_ratio,
+                                  headless_algorithm.last_lrp_ratio, headless_algorithm.lrp, headless_algorithm.stripe,
+                                  headless_algorithm.free_area,
+                                  sorted((box[0], *box[2:]) for box in headless_algorithm.boxes))
+                        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
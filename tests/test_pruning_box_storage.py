@@ -0,0 +1,39 @@
+import unittest
+
+from storage.in_memory_box_storage import InMemoryBoxStorage
+from storage.pruning_box_storage import PruningBoxStorage
+from tests.helpers import GAMMA, N0, MAX_PLACED, create_placer
+
+
+def run_gamma_algorithm(box_storage, exact: bool) -> list[tuple]:
+    """
+    Run the gamma algorithm on harmonic rectangles with the given box storage.
+
+    :param box_storage: The box storage.
+    :param exact: Whether the exact mode is used.
+    :return: The layout as a list of tuples with float coordinates, names and detail types.
+    """
+    placed_details = create_placer(box_storage, exact=exact).run_algorithm()
+    return [(tuple(map(float, detail.bottom_left)), tuple(map(float, detail.top_right)), detail.name,
+             detail.detail_type) for detail in placed_details]
+
+
+class PruningBoxStorageTest(unittest.TestCase):
+    """
+    Tests that pruning discards boxes without changing the layout, both with float and with exact coordinates.
+    """
+
+    def test_pruning_keeps_layout(self):
+        min_box_size = PruningBoxStorage.get_min_usable_box_size(GAMMA, N0, MAX_PLACED, 1 / (N0 + MAX_PLACED))
+        for exact in (False, True):
+            with self.subTest(exact=exact):
+                expected = run_gamma_algorithm(InMemoryBoxStorage(), exact)
+                box_storage = PruningBoxStorage(InMemoryBoxStorage(), min_box_size)
+                actual = run_gamma_algorithm(box_storage, exact)
+                self.assertEqual(expected, actual)
+                self.assertGreater(box_storage.pruned_count, 0)
+                self.assertEqual(box_storage.pruned_count, sum(box_storage.pruned_by_type.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from core.detail_placer import DetailPlacer
+from core.resource_budget import ResourceBudget
+from storage.external_memory_box_storage import ExternalMemoryBoxStorage
+from storage.heap_box_storage import HeapBoxStorage
+from storage.instrumented_box_storage import InstrumentedBoxStorage
+from tests.helpers import N0, MAX_PLACED, CrashListener, create_placer, get_layout
+
+CHECK_INTERVAL = 500
+
+
+class ResourceBudgetTest(unittest.TestCase):
+    """
+    Tests that the actions of exceeded budgets are taken, escalated and described in the summary of the run.
+    """
+
+    def test_storage_size_budget_spills_storage(self):
+        expected = get_layout(create_placer().run_algorithm())
+        box_storage = InstrumentedBoxStorage(HeapBoxStorage())
+        placer = create_placer(box_storage,
+                               resource_budget=ResourceBudget(max_storage_size=10, check_interval=CHECK_INTERVAL))
+        self.assertEqual(expected, get_layout(placer.run_algorithm()))
+        self.assertIsInstance(box_storage.box_storage, ExternalMemoryBoxStorage)
+        self.assertEqual(box_storage.box_storage.memory_size, 10)
+        self.assertEqual(placer.summary['status'], DetailPlacer.COMPLETED)
+        self.assertEqual([(action['placed'], action['budget'], action['action'])
+                          for action in placer.summary['budget_actions']],
+                         [(CHECK_INTERVAL, ResourceBudget.STORAGE_SIZE, ResourceBudget.SPILL_STORAGE)])
+        box_storage.box_storage.close()
+
+    def test_wall_time_budget_stops_placement(self):
+        placer = create_placer(resource_budget=ResourceBudget(max_wall_time=0, check_interval=CHECK_INTERVAL))
+        placed_details = placer.run_algorithm()
+        expected = create_placer()
+        expected.max_placed = CHECK_INTERVAL
+        self.assertEqual(get_layout(expected.run_algorithm()), get_layout(placed_details))
+        self.assertEqual(placer.summary['status'], DetailPlacer.STOPPED)
+        self.assertEqual(placer.summary['placed'], CHECK_INTERVAL)
+        self.assertEqual([(action['budget'], action['action']) for action in placer.summary['budget_actions']],
+                         [(ResourceBudget.WALL_TIME, ResourceBudget.STOP)])
+
+    def test_actions_escalate(self):
+        with ExternalMemoryBoxStorage() as box_storage:
+            placer = create_placer(box_storage,
+                                   resource_budget=ResourceBudget(max_rss=0, check_interval=CHECK_INTERVAL))
+            placer.run_algorithm()
+            self.assertIs(placer.algorithm.box_storage, box_storage)
+        self.assertEqual([(action['placed'], action['budget'], action['action'])
+                          for action in placer.summary['budget_actions']],
+                         [(CHECK_INTERVAL, ResourceBudget.RSS, ResourceBudget.DISABLE_PLACED_DETAILS),
+                          (2 * CHECK_INTERVAL, ResourceBudget.RSS, ResourceBudget.STOP)])
+        self.assertEqual(placer.summary['status'], DetailPlacer.STOPPED)
+        self.assertEqual(placer.summary['placed'], 2 * CHECK_INTERVAL)
+        self.assertFalse(placer.summary['update_placed_details'])
+
+    def test_spill_is_skipped_in_exact_mode(self):
+        box_storage = HeapBoxStorage()
+        placer = create_placer(box_storage, exact=True,
+                               resource_budget=ResourceBudget(max_storage_size=10, check_interval=CHECK_INTERVAL))
+        placer.run_algorithm()
+        self.assertIs(placer.algorithm.box_storage, box_storage)
+        self.assertEqual([action['action'] for action in placer.summary['budget_actions']], [ResourceBudget.STOP])
+        self.assertEqual(placer.summary['status'], DetailPlacer.STOPPED)
+
+    def test_summary(self):
+        placer = create_placer()
+        placer.run_algorithm()
+        summary = placer.summary
+        self.assertEqual(summary['status'], DetailPlacer.COMPLETED)
+        self.assertIsNone(summary['error'])
+        self.assertEqual(summary['placed'], MAX_PLACED)
+        self.assertEqual(summary['max_placed'], MAX_PLACED)
+        self.assertGreater(summary['elapsed_time'], 0)
+        self.assertGreaterEqual(summary['peak_rss'], 0)
+        self.assertEqual(summary['storage_sizes'], placer.algorithm.box_storage.get_sizes())
+        self.assertTrue(summary['update_placed_details'])
+        self.assertEqual(summary['budget_actions'], [])
+
+    def test_summary_of_failed_run(self):
+        placer = create_placer(statistic_listeners=[CrashListener(N0 + 99)])
+        placed_details = placer.run_algorithm()
+        self.assertEqual(placer.summary['status'], DetailPlacer.FAILED)
+        self.assertEqual(placer.summary['error'], 'crash')
+        self.assertEqual(placer.summary['placed'], 99)
+        self.assertIsNotNone(placed_details)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from detail.detail import Detail
+from storage.database_box_storage import DatabaseBoxStorage
+from storage.external_memory_box_storage import ExternalMemoryBoxStorage
+from storage.heap_box_storage import HeapBoxStorage
+from storage.hybrid_box_storage import HybridBoxStorage
+from storage.instrumented_box_storage import InstrumentedBoxStorage
+from storage.pruning_box_storage import PruningBoxStorage
+
+WRAPPERS = {
+    'instrumented': InstrumentedBoxStorage,
+    'pruning': lambda box_storage: PruningBoxStorage(box_storage, 0.0)
+}
+
+
+def create_boxes(count: int) -> list[Detail]:
+    """
+    Create boxes of decreasing sizes.
+
+    :param count: The number of boxes.
+    :return: The boxes.
+    """
+    return [Detail((0.0, 0.0), (1 / (index + 1), 1 / (index + 2)), f'B{index}', 'box') for index in range(count)]
+
+
+class StorageWrapperTest(unittest.TestCase):
+    """
+    Tests that the storage wrappers forward `flush` and `close` to the wrapped storage.
+    """
+
+    def test_flush_is_forwarded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, wrapper in WRAPPERS.items():
+                with self.subTest(wrapper=name):
+                    box_storage = DatabaseBoxStorage(f'sqlite:///{os.path.join(directory, name)}.db', batch_size=100)
+                    wrapped_storage = wrapper(box_storage)
+                    wrapped_storage.add_boxes(create_boxes(10))
+                    self.assertEqual(len(box_storage.pending_rows), 10)
+                    wrapped_storage.flush()
+                    self.assertEqual(box_storage.pending_rows, [])
+                    box_storage.session.close()
+
+    def test_close_is_forwarded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, wrapper in WRAPPERS.items():
+                with self.subTest(wrapper=name, storage='hybrid'):
+                    box_storage = HybridBoxStorage(f'sqlite:///{os.path.join(directory, name)}.db', cache_size=5,
+                                                   background_flush=True)
+                    wrapped_storage = wrapper(box_storage)
+                    wrapped_storage.add_boxes(create_boxes(20))
+                    wrapped_storage.close()
+                    self.assertIsNone(box_storage.executor)
+                    box_storage.session.close()
+                with self.subTest(wrapper=name, storage='external memory'):
+                    box_storage = ExternalMemoryBoxStorage(memory_size=5)
+                    wrapped_storage = wrapper(box_storage)
+                    wrapped_storage.add_boxes(create_boxes(20))
+                    wrapped_storage.close()
+                    self.assertFalse(os.path.exists(box_storage.directory))
+
+    def test_storages_without_flush_and_close(self):
+        for name, wrapper in WRAPPERS.items():
+            with self.subTest(wrapper=name):
+                wrapped_storage = wrapper(HeapBoxStorage())
+                wrapped_storage.flush()
+                wrapped_storage.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+class DetailArtists:
+    """
+    A class holding the matplotlib artists that represent a detail on the plot.
+    The plotter keeps them in a side table instead of attaching them to Detail objects, so details stay compact.
+
+    Attributes:
+        rectangle (matplotlib.patches.Rectangle): The rectangle representing the detail, or None if it is not drawn.
+        text_name (matplotlib.text.Text): The text with the name of the detail, or None if it is not drawn.
+        text_width (matplotlib.text.Text): The text with the width of the detail, or None if it is not drawn.
+        text_height (matplotlib.text.Text): The text with the height of the detail, or None if it is not drawn.
+    """
+
+    __slots__ = ('rectangle', 'text_name', 'text_width', 'text_height')
+
+    def __init__(self):
+        """
+        Initialize a DetailArtists object with no artists drawn.
+        """
+        self.rectangle = None
+        self.text_name = None
+        self.text_width = None
+        self.text_height = None
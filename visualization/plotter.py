@@ -2,6 +2,8 @@ import matplotlib.pyplot as plt
 from matplotlib.backend_bases import MouseEvent
 from matplotlib.patches import Rectangle
 from detail.detail import Detail
+from detail.detail_functions import convert_detail_to_float, convert_details_to_float
+from visualization.detail_artists import DetailArtists
 from visualization.settings import PlotSettings
 import numpy as np
 
@@ -12,12 +14,14 @@ class Plotter:
     It allows users to add detail, customize plot settings, and interact with the plot.
 
     Attributes:
-        base_detail (Detail): The base detail on which other details will be placed.
-        details (list[Detail]): A list of Detail objects to be placed on the base detail.
+        base_detail (Detail): The base detail on which other details will be placed, with float coordinates.
+        details (list[Detail]): A list of Detail objects to be placed on the base detail, with float coordinates.
         plot_settings (PlotSettings): Plot settings controlling the appearance of the plot.
         fig (matplotlib.figure.Figure): The figure object representing the entire plot.
         ax (matplotlib.axes.Axes): The axes object representing the plot area.
         hovered_detail (Detail): The detail currently being hovered by the mouse, if any.
+        detail_artists (dict[int, DetailArtists]): The artists representing each detail on the plot, by the id
+            of the detail.
     """
 
     def __init__(self, base_detail: Detail, details: list[Detail], plot_settings: PlotSettings = None):
@@ -25,14 +29,16 @@ class Plotter:
         Initialize the plotter.
 
         :param base_detail: The base detail on which the other detail will be placed.
-        :param details: A list of Detail objects to be placed on the base detail.
+        :param details: A list of Detail objects to be placed on the base detail. FixedPoint coordinates of details
+            placed in the exact mode are converted to floats.
         :param plot_settings: Optional plot settings. If not provided, default settings will be used.
         """
-        self.base_detail = base_detail
-        self.details = details
+        self.base_detail = convert_detail_to_float(base_detail)
+        self.details = convert_details_to_float(details)
         self.plot_settings = plot_settings or PlotSettings()
         self.fig, self.ax = plt.subplots()
         self.hovered_detail = None
+        self.detail_artists = {}
         self._setup_plot()
 
     def _setup_plot(self) -> None:
@@ -70,15 +76,21 @@ class Plotter:
 
     def _add_attributes(self) -> None:
         """
-        Add attributes to each detail object necessary for graphical representation.
-        These attributes include the rectangle representing the detail on the plot,
+        Add the artists necessary for graphical representation of each detail to the side table.
+        These artists include the rectangle representing the detail on the plot,
         and the text associated with the detail (name, width and height).
         """
         for detail in self.details:
-            detail.rectangle = None
-            detail.text_name = None
-            detail.text_width = None
-            detail.text_height = None
+            self.detail_artists[id(detail)] = DetailArtists()
+
+    def _get_artists(self, detail: Detail) -> DetailArtists:
+        """
+        Get the artists representing the detail on the plot.
+
+        :param detail: The detail whose artists are requested.
+        :return: The artists of the detail.
+        """
+        return self.detail_artists[id(detail)]
 
     def _add_detail(self, detail: Detail) -> None:
         """
@@ -89,7 +101,7 @@ class Plotter:
         rectangle = Rectangle(detail.bottom_left, detail.width, detail.height,
                               edgecolor=self.plot_settings.detail_edgecolor,
                               facecolor=self.plot_settings.detail_colors[detail.detail_type])
-        detail.rectangle = rectangle
+        self._get_artists(detail).rectangle = rectangle
         self.ax.add_patch(rectangle)
 
     def _add_text_name(self, detail: Detail) -> None:
@@ -102,9 +114,9 @@ class Plotter:
         y = (detail.bottom_left[1] + detail.top_right[1]) / 2
         detail_name = self._convert_digits_to_subscript(detail.name) \
             if self.plot_settings.convert_digits_to_subscript else detail.name
-        detail.text_name = self.ax.text(x, y, f"{detail_name}", ha='center', va='center',
-                                        color=self.plot_settings.text_color,
-                                        fontsize=self.plot_settings.name_fontsize)
+        self._get_artists(detail).text_name = self.ax.text(x, y, f"{detail_name}", ha='center', va='center',
+                                                           color=self.plot_settings.text_color,
+                                                           fontsize=self.plot_settings.name_fontsize)
 
     def _add_text_width_and_text_height(self, detail: Detail) -> None:
         """
@@ -115,12 +127,13 @@ class Plotter:
         """
         x = (detail.bottom_left[0] + detail.top_right[0]) / 2
         y = ((detail.bottom_left[1] + detail.top_right[1]) / 2 + detail.top_right[1]) / 2
-        detail.text_width = self.ax.text(x, detail.bottom_left[1], f"{detail.width}", ha='center',
-                                         va='bottom', color=self.plot_settings.text_color,
-                                         fontsize=self.plot_settings.size_fontsize)
-        detail.text_height = self.ax.text(detail.bottom_left[0], y, f"{detail.height}", ha='right',
-                                          va='center', color=self.plot_settings.text_color,
+        artists = self._get_artists(detail)
+        artists.text_width = self.ax.text(x, detail.bottom_left[1], f"{detail.width}", ha='center',
+                                          va='bottom', color=self.plot_settings.text_color,
                                           fontsize=self.plot_settings.size_fontsize)
+        artists.text_height = self.ax.text(detail.bottom_left[0], y, f"{detail.height}", ha='right',
+                                           va='center', color=self.plot_settings.text_color,
+                                           fontsize=self.plot_settings.size_fontsize)
 
     def _on_hover_highlight_detail(self, event: MouseEvent) -> None:
         """
@@ -134,7 +147,7 @@ class Plotter:
         """
         if event.inaxes == self.ax:
             for detail in self.details:
-                if detail.rectangle is None:
+                if self._get_artists(detail).rectangle is None:
                     continue
                 if detail.bottom_left[0] <= event.xdata <= detail.top_right[0] and \
                         detail.bottom_left[1] <= event.ydata <= detail.top_right[1]:
@@ -161,20 +174,21 @@ class Plotter:
         """
         color = self.plot_settings.hover_detail_color if is_hovered else \
             self.plot_settings.detail_colors[self.hovered_detail.detail_type]
-        if detail.rectangle is not None:
-            detail.rectangle.set_facecolor(color)
+        artists = self._get_artists(detail)
+        if artists.rectangle is not None:
+            artists.rectangle.set_facecolor(color)
         self.ax.figure.canvas.draw_idle()
         if is_hovered:
-            if detail.text_name is None:
+            if artists.text_name is None:
                 self._add_text_name(detail)
-            if detail.text_width is None:
+            if artists.text_width is None:
                 self._add_text_width_and_text_height(detail)
         else:
-            if detail.text_width is not None:
-                detail.text_width.remove()
-                detail.text_width = None
-                detail.text_height.remove()
-                detail.text_height = None
+            if artists.text_width is not None:
+                artists.text_width.remove()
+                artists.text_width = None
+                artists.text_height.remove()
+                artists.text_height = None
 
     def _on_motion_change_details(self, event: MouseEvent) -> None:
         """
@@ -186,12 +200,13 @@ class Plotter:
         :param event: The mouse event that triggered the function.
         """
         for detail in self.details:
+            artists = self._get_artists(detail)
             if self._is_detail_out_of_screen(detail) or self._is_detail_small(detail):
-                if detail.rectangle is not None:
-                    detail.rectangle.remove()
-                    detail.rectangle = None
+                if artists.rectangle is not None:
+                    artists.rectangle.remove()
+                    artists.rectangle = None
             else:
-                if detail.rectangle is None:
+                if artists.rectangle is None:
                     self._add_detail(detail)
 
     def _on_motion_change_text(self, event: MouseEvent) -> None:
@@ -207,11 +222,12 @@ class Plotter:
         for detail in self.details:
             if (self._is_text_out_of_screen(detail) or self._is_text_small(
                     detail)) and not detail == self.hovered_detail:
-                if detail.text_name is not None:
-                    detail.text_name.remove()
-                    detail.text_name = None
+                artists = self._get_artists(detail)
+                if artists.text_name is not None:
+                    artists.text_name.remove()
+                    artists.text_name = None
             else:
-                if detail.text_name is None:
+                if self._get_artists(detail).text_name is None:
                     self._add_text_name(detail)
 
     def _is_detail_out_of_screen(self, detail: Detail) -> bool:
@@ -296,6 +312,7 @@ class Plotter:
 
         :param detail: The Detail object whose position needs to be shown.
         """
+        detail = convert_detail_to_float(detail)
         if detail in self.details:
             margin_x = (detail.top_right[0] - detail.bottom_left[0]) * 0.1
             margin_y = (detail.top_right[1] - detail.bottom_left[1]) * 0.1